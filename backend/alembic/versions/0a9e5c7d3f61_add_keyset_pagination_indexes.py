@@ -0,0 +1,71 @@
+"""Add keyset pagination indexes
+
+Revision ID: 0a9e5c7d3f61
+Revises: f3a8d2c6e914
+Create Date: 2026-10-18 18:03:27.915460
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0a9e5c7d3f61"
+down_revision: str | None = "f3a8d2c6e914"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# List endpoints page in (created_at, id) order
+INDEXES: list[tuple[str, str, list[str]]] = [
+    ("ix_property_created_at_id", "property", ["created_at", "id"]),
+    ("ix_property_user_id_created_at_id", "property", ["user_id", "created_at", "id"]),
+    ("ix_valuation_created_at_id", "valuation", ["created_at", "id"]),
+    (
+        "ix_valuation_valuer_id_created_at_id",
+        "valuation",
+        ["valuer_id", "created_at", "id"],
+    ),
+    ("ix_user_created_at_id", "user", ["created_at", "id"]),
+    ("ix_comparable_created_at_id", "comparable", ["created_at", "id"]),
+]
+
+# Prefixes of the indexes above
+SUPERSEDED: list[tuple[str, str, list[str]]] = [
+    ("ix_property_created_at", "property", ["created_at"]),
+    ("ix_property_user_id_created_at", "property", ["user_id", "created_at"]),
+    ("ix_valuation_valuer_id", "valuation", ["valuer_id"]),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        for name, table, _ in SUPERSEDED:
+            op.drop_index(
+                name, table_name=table, postgresql_concurrently=True, if_exists=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in SUPERSEDED:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table, postgresql_concurrently=True, if_exists=True
+            )
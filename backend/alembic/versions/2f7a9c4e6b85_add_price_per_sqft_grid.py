@@ -0,0 +1,37 @@
+"""Add price per sqft grid
+
+Revision ID: 2f7a9c4e6b85
+Revises: 8e4b2f6a1c37
+Create Date: 2026-10-18 21:42:06.318274
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2f7a9c4e6b85"
+down_revision: str | None = "8e4b2f6a1c37"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Filled by the refresh_price_grids task
+    op.create_table(
+        "pricepersqftcell",
+        sa.Column("cell", sa.String(), nullable=False),
+        sa.Column("comp_count", sa.BigInteger(), nullable=False),
+        sa.Column("ppsf_p25", sa.Float(), nullable=False),
+        sa.Column("ppsf_median", sa.Float(), nullable=False),
+        sa.Column("ppsf_p75", sa.Float(), nullable=False),
+        sa.Column("monthly_trend", sa.Float(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("cell"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("pricepersqftcell")
@@ -0,0 +1,26 @@
+"""Add photo renditions
+
+Revision ID: 3b8d1f2c7a41
+Revises: 162e0f9daf9a
+Create Date: 2026-10-18 09:12:40.118203
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3b8d1f2c7a41"
+down_revision: str | None = "162e0f9daf9a"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("propertyphoto", sa.Column("renditions", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("propertyphoto", "renditions")
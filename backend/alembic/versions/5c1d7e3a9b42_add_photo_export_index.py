@@ -0,0 +1,39 @@
+"""Add photo export index
+
+Revision ID: 5c1d7e3a9b42
+Revises: 0a9e5c7d3f61
+Create Date: 2026-10-18 19:12:45.204318
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5c1d7e3a9b42"
+down_revision: str | None = "0a9e5c7d3f61"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Exports walk all photos in (created_at, id) order
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_propertyphoto_created_at_id",
+            "propertyphoto",
+            ["created_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_propertyphoto_created_at_id",
+            table_name="propertyphoto",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
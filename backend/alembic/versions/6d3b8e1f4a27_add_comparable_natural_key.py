@@ -0,0 +1,76 @@
+"""Add comparable natural key
+
+Revision ID: 6d3b8e1f4a27
+Revises: 2f7a9c4e6b85
+Create Date: 2026-10-18 22:31:47.905316
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6d3b8e1f4a27"
+down_revision: str | None = "2f7a9c4e6b85"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+# Each comparable with the row kept for its (address, sale_date): the
+# most recently written one, as later bulk imports would have upserted it
+KEPT_ROWS = """
+    SELECT id, FIRST_VALUE(id) OVER (
+        PARTITION BY address, sale_date
+        ORDER BY COALESCE(updated_at, created_at) DESC, id
+    ) AS kept_id
+    FROM comparable
+"""
+
+
+def upgrade() -> None:
+    # Bulk imports upsert on it, so the same sale stored twice has to be
+    # merged first. Valuations citing a dropped row move to the kept one.
+    for column in ("comp1_id", "comp2_id", "comp3_id"):
+        op.execute(
+            f"UPDATE valuation SET {column} = kept.kept_id "
+            f"FROM ({KEPT_ROWS}) AS kept "
+            f"WHERE valuation.{column} = kept.id AND kept.id <> kept.kept_id"
+        )
+    op.execute(
+        "DELETE FROM comparable WHERE id IN "
+        f"(SELECT id FROM ({KEPT_ROWS}) AS kept WHERE id <> kept_id)"
+    )
+
+    bind = op.get_bind()
+    with op.get_context().autocommit_block():
+        # A failed CONCURRENTLY build leaves an invalid index behind, which
+        # IF NOT EXISTS would then take for the finished one
+        if bind.dialect.name == "postgresql" and bind.scalar(
+            sa.text(
+                "SELECT NOT indisvalid FROM pg_index "
+                "WHERE indexrelid = to_regclass('ix_comparable_address_sale_date')"
+            )
+        ):
+            op.execute(
+                "DROP INDEX CONCURRENTLY IF EXISTS ix_comparable_address_sale_date"
+            )
+        op.create_index(
+            "ix_comparable_address_sale_date",
+            "comparable",
+            ["address", "sale_date"],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_comparable_address_sale_date",
+            table_name="comparable",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,68 @@
+"""Add photo perceptual hash
+
+Revision ID: 7c2e9a4b5d10
+Revises: 3b8d1f2c7a41
+Create Date: 2026-10-18 11:03:52.604417
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+from app.database import GUID
+
+# revision identifiers, used by Alembic.
+revision: str = "7c2e9a4b5d10"
+down_revision: str | None = "3b8d1f2c7a41"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+HASH_BANDS = 4
+
+
+def upgrade() -> None:
+    op.add_column("propertyphoto", sa.Column("phash", sa.BigInteger(), nullable=True))
+    for band in range(HASH_BANDS):
+        op.add_column(
+            "propertyphoto",
+            sa.Column(f"phash_band_{band}", sa.Integer(), nullable=True),
+        )
+        op.create_index(
+            op.f(f"ix_propertyphoto_phash_band_{band}"),
+            "propertyphoto",
+            [f"phash_band_{band}"],
+            unique=False,
+        )
+    op.add_column("propertyphoto", sa.Column("duplicate_of_id", GUID(), nullable=True))
+    op.create_foreign_key(
+        "fk_propertyphoto_duplicate_of_id",
+        "propertyphoto",
+        "propertyphoto",
+        ["duplicate_of_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+    op.add_column(
+        "propertyphoto",
+        sa.Column(
+            "flagged_for_review",
+            sa.Boolean(),
+            server_default=sa.false(),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("propertyphoto", "flagged_for_review")
+    op.drop_constraint(
+        "fk_propertyphoto_duplicate_of_id", "propertyphoto", type_="foreignkey"
+    )
+    op.drop_column("propertyphoto", "duplicate_of_id")
+    for band in reversed(range(HASH_BANDS)):
+        op.drop_index(
+            op.f(f"ix_propertyphoto_phash_band_{band}"), table_name="propertyphoto"
+        )
+        op.drop_column("propertyphoto", f"phash_band_{band}")
+    op.drop_column("propertyphoto", "phash")
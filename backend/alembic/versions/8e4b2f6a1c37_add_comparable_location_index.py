@@ -0,0 +1,56 @@
+"""Add comparable location index
+
+Revision ID: 8e4b2f6a1c37
+Revises: 5c1d7e3a9b42
+Create Date: 2026-10-18 20:05:11.482093
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8e4b2f6a1c37"
+down_revision: str | None = "5c1d7e3a9b42"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Nearest-comparable search; GiST serves box filters and KNN ordering
+    with op.get_context().autocommit_block():
+        if op.get_bind().dialect.name == "postgresql":
+            op.create_index(
+                "ix_comparable_location",
+                "comparable",
+                [sa.text("point(lng, lat)")],
+                unique=False,
+                postgresql_using="gist",
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        else:
+            op.create_index(
+                "ix_comparable_lat_lng",
+                "comparable",
+                ["lat", "lng", "id"],
+                unique=False,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        if op.get_bind().dialect.name == "postgresql":
+            op.drop_index(
+                "ix_comparable_location",
+                table_name="comparable",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+        else:
+            op.drop_index(
+                "ix_comparable_lat_lng", table_name="comparable", if_exists=True
+            )
@@ -0,0 +1,40 @@
+"""Add KPI counters
+
+Revision ID: 9d4f6b1e8c23
+Revises: 7c2e9a4b5d10
+Create Date: 2026-10-18 13:41:07.352981
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9d4f6b1e8c23"
+down_revision: str | None = "7c2e9a4b5d10"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Filled by the reconcile_kpi_counters task
+    op.create_table(
+        "kpicounter",
+        sa.Column("scope", sa.String(), nullable=False),
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.Column("value_sum", sa.Float(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("(CURRENT_TIMESTAMP)"),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint("scope", "key"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("kpicounter")
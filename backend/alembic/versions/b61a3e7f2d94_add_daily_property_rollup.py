@@ -0,0 +1,71 @@
+"""Add daily property rollup
+
+Revision ID: b61a3e7f2d94
+Revises: 9d4f6b1e8c23
+Create Date: 2026-10-18 15:20:33.815042
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b61a3e7f2d94"
+down_revision: str | None = "9d4f6b1e8c23"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Filled by the refresh_daily_rollups task
+    op.create_table(
+        "dailypropertyrollup",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("city", sa.String(), nullable=False),
+        sa.Column(
+            "property_type",
+            sa.Enum(
+                "APARTMENT",
+                "HOUSE",
+                "VILLA",
+                "COMMERCIAL",
+                "LAND",
+                name="propertytype",
+                create_type=False,
+            ),
+            nullable=False,
+        ),
+        sa.Column(
+            "status",
+            sa.Enum(
+                "DRAFT",
+                "SUBMITTED",
+                "UNDER_REVIEW",
+                "APPROVED",
+                "REJECTED",
+                "FOLLOW_UP",
+                "VALUED",
+                name="propertystatus",
+                create_type=False,
+            ),
+            nullable=False,
+        ),
+        sa.Column("created_count", sa.BigInteger(), nullable=False),
+        sa.Column("located_count", sa.BigInteger(), nullable=False),
+        sa.Column("photographed_count", sa.BigInteger(), nullable=False),
+        sa.Column("submitted_count", sa.BigInteger(), nullable=False),
+        sa.Column("reviewed_count", sa.BigInteger(), nullable=False),
+        sa.Column("reviewed_value_sum", sa.Float(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("day", "city", "property_type", "status"),
+    )
+    op.create_index(
+        op.f("ix_property_updated_at"), "property", ["updated_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_property_updated_at"), table_name="property")
+    op.drop_table("dailypropertyrollup")
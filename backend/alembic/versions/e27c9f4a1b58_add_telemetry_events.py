@@ -0,0 +1,66 @@
+"""Add telemetry events
+
+Revision ID: e27c9f4a1b58
+Revises: b61a3e7f2d94
+Create Date: 2026-10-18 16:05:12.480317
+
+"""
+from collections.abc import Sequence
+from datetime import UTC, date, datetime
+
+import sqlalchemy as sa
+
+from alembic import op
+from app.database import GUID
+
+# revision identifiers, used by Alembic.
+revision: str = "e27c9f4a1b58"
+down_revision: str | None = "b61a3e7f2d94"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    postgresql = op.get_bind().dialect.name == "postgresql"
+    # Append-only, filled in bulk by the API's telemetry flusher
+    op.create_table(
+        "telemetryevent",
+        sa.Column("id", GUID(), nullable=False),
+        sa.Column("occurred_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("session_id", sa.String(), nullable=False),
+        sa.Column("event_type", sa.String(), nullable=False),
+        sa.Column("screen", sa.String(), nullable=False),
+        sa.Column("user_id", GUID(), nullable=True),
+        sa.Column("received_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id", "occurred_at"),
+        postgresql_partition_by="RANGE (occurred_at)",
+    )
+    op.create_index(
+        "ix_telemetryevent_session_id_occurred_at",
+        "telemetryevent",
+        ["session_id", "occurred_at"],
+        unique=False,
+    )
+    if postgresql:
+        # Catches events outside the monthly partitions the
+        # ensure_telemetry_partitions task keeps created ahead of time
+        op.execute(
+            "CREATE TABLE telemetryevent_default PARTITION OF telemetryevent DEFAULT"
+        )
+        today = datetime.now(UTC).date()
+        months = [today.year * 12 + today.month - 1 + offset for offset in range(3)]
+        bounds = [date(month // 12, month % 12 + 1, 1) for month in months]
+        for lower, upper in zip(bounds, bounds[1:], strict=False):
+            op.execute(
+                f"CREATE TABLE telemetryevent_{lower:%Y_%m} "
+                "PARTITION OF telemetryevent "
+                f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+            )
+
+
+def downgrade() -> None:
+    # Partitions are dropped along with the parent table
+    op.drop_index(
+        "ix_telemetryevent_session_id_occurred_at", table_name="telemetryevent"
+    )
+    op.drop_table("telemetryevent")
@@ -0,0 +1,72 @@
+"""Add hot path indexes
+
+Revision ID: f3a8d2c6e914
+Revises: e27c9f4a1b58
+Create Date: 2026-10-18 17:12:44.207193
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f3a8d2c6e914"
+down_revision: str | None = "e27c9f4a1b58"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# (name, table, columns, partial index predicate)
+INDEXES: list[tuple[str, str, list[str], str | None]] = [
+    ("ix_property_user_id_created_at", "property", ["user_id", "created_at"], None),
+    (
+        "ix_property_submitted_queue",
+        "property",
+        ["status", "submitted_at"],
+        "status = 'SUBMITTED'",
+    ),
+    ("ix_property_draft_created_at", "property", ["created_at"], "status = 'DRAFT'"),
+    ("ix_property_created_at", "property", ["created_at"], None),
+    (
+        "ix_property_submitted_at",
+        "property",
+        ["submitted_at"],
+        "submitted_at IS NOT NULL",
+    ),
+    ("ix_property_reviewed_at", "property", ["reviewed_at"], "reviewed_at IS NOT NULL"),
+    ("ix_property_valuer_id", "property", ["valuer_id"], "valuer_id IS NOT NULL"),
+    (
+        "ix_propertyphoto_property_id_qc_status",
+        "propertyphoto",
+        ["property_id", "qc_status"],
+        None,
+    ),
+    ("ix_valuation_property_id", "valuation", ["property_id"], None),
+    ("ix_valuation_valuer_id", "valuation", ["valuer_id"], None),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY keeps property writable while the indexes build, but
+    # cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_where=sa.text(where) if where else None,
+                sqlite_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table, postgresql_concurrently=True, if_exists=True
+            )
@@ -1,6 +1,8 @@
 from collections.abc import Callable, Generator
+from dataclasses import dataclass
+from typing import Any
 
-from fastapi import Depends
+from fastapi import Depends, Query, Response
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from pydantic import ValidationError
@@ -14,6 +16,7 @@ from app.core.exceptions import (
     NotFoundError,
     UnauthorizedError,
 )
+from app.crud.base import next_cursor
 from app.database import SessionLocal
 
 reusable_oauth2 = OAuth2PasswordBearer(
@@ -29,6 +32,14 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def get_session_factory() -> Callable[[], Session]:
+    """
+    For endpoints that open their own sessions, such as streaming
+    responses that outlive the request's get_db session.
+    """
+    return SessionLocal
+
+
 def get_current_user(
     db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)
 ) -> models.User:
@@ -80,3 +91,34 @@ def get_current_active_admin(
     current_user: models.User = Depends(require_role(models.UserRole.ADMIN)),
 ) -> models.User:
     return current_user
+
+
+@dataclass
+class PageParams:
+    cursor: str | None
+    skip: int
+    limit: int
+
+
+def get_page_params(
+    current_user: models.User = Depends(get_current_active_user),
+    cursor: str | None = Query(
+        None, description="X-Next-Cursor header of the previous page"
+    ),
+    skip: int = Query(0, ge=0, le=settings.PAGINATION_MAX_OFFSET),
+    limit: int = Query(100, ge=1, le=settings.PAGINATION_MAX_LIMIT),
+) -> PageParams:
+    if skip and current_user.role != models.UserRole.ADMIN:
+        raise ForbiddenError(
+            detail="Offset pagination is limited to admins, page with cursor",
+            status_code=400,
+            error_type="offset_not_allowed",
+        )
+    return PageParams(cursor=cursor, skip=0 if cursor else skip, limit=limit)
+
+
+def set_next_cursor(response: Response, items: list[Any], page: PageParams) -> None:
+    """Expose the cursor of the following page, if any, as X-Next-Cursor."""
+    cursor = next_cursor(items, page.limit)
+    if cursor is not None:
+        response.headers["X-Next-Cursor"] = cursor
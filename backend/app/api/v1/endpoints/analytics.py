@@ -1,8 +1,14 @@
-from fastapi import APIRouter, Depends
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
+from app import models, schemas
 from app.api import deps
+from app.models.property import PropertyType
 from app.services.analytics_service import AnalyticsService
+from app.services.telemetry_service import telemetry_service
+from app.utils.cache import cache_metrics
 
 router = APIRouter()
 
@@ -16,19 +22,75 @@ def get_kpi_dashboard(
     return analytics.get_kpi_dashboard()
 
 
+@router.get("/counters")
+def get_live_counters(
+    db: Session = Depends(deps.get_db),
+    _: None = Depends(deps.get_current_active_user),
+) -> dict[str, Any]:
+    analytics = AnalyticsService(db)
+    return analytics.get_live_counters()
+
+
+@router.get("/trends")
+def get_daily_trends(
+    db: Session = Depends(deps.get_db),
+    days: int = Query(30, ge=1, le=366),
+    city: str | None = None,
+    property_type: PropertyType | None = None,
+    _: None = Depends(deps.get_current_active_user),
+) -> dict[str, Any]:
+    analytics = AnalyticsService(db)
+    return analytics.get_daily_trends(days, city=city, property_type=property_type)
+
+
 @router.get("/funnel")
 def get_funnel_analysis(
     db: Session = Depends(deps.get_db),
+    days: int | None = Query(None, ge=1, le=366),
+    city: str | None = None,
+    property_type: PropertyType | None = None,
     _: None = Depends(deps.get_current_active_user),
 ):
     analytics = AnalyticsService(db)
-    return analytics.get_funnel_analysis()
+    return analytics.get_funnel_analysis(days, city=city, property_type=property_type)
 
 
 @router.get("/drop-off")
 def get_drop_off_analysis(
     db: Session = Depends(deps.get_db),
+    days: int = Query(7, ge=1, le=90),
     _: None = Depends(deps.get_current_active_user),
 ):
     analytics = AnalyticsService(db)
-    return analytics.get_drop_off_analysis()
+    return analytics.get_drop_off_analysis(days)
+
+
+@router.get("/cache")
+def get_cache_metrics(
+    _: models.User = Depends(deps.get_current_active_admin),
+) -> dict[str, dict[str, Any]]:
+    """Response cache hits, misses, errors and Redis latency of this process."""
+    return cache_metrics.snapshot()
+
+
+@router.post(
+    "/events",
+    response_model=schemas.TelemetryAccepted,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def ingest_events(
+    *,
+    batch_in: schemas.TelemetryBatch,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> dict[str, int]:
+    """
+    Accept a batch of client screen events. They are buffered in memory
+    and written in bulk by a background flusher, never per request.
+    """
+    if not telemetry_service.add(batch_in.events, user_id=current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Telemetry buffer is full, retry later",
+            headers={"Retry-After": "5"},
+        )
+    return {"accepted": len(batch_in.events)}
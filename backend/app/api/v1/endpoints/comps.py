@@ -1,29 +1,83 @@
 import uuid
+from datetime import UTC, datetime, timedelta
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
 from sqlalchemy.orm import Session
 
-from app import models, schemas
+from app import crud, models, schemas
 from app.api import deps
+from app.services.comp_import_service import ImportFormat, comp_import_service
 
 router = APIRouter()
 
 
 @router.get("/", response_model=list[schemas.Comparable])
 def read_comparables(
+    response: Response,
     db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 100,
+    page: deps.PageParams = Depends(deps.get_page_params),
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Retrieve comparables.
+    Retrieve comparables, oldest first.
     """
-    comparables = db.query(models.Comparable).offset(skip).limit(limit).all()
+    comparables = crud.comp.get_multi(
+        db, cursor=page.cursor, skip=page.skip, limit=page.limit
+    )
+    deps.set_next_cursor(response, comparables, page)
     return comparables
 
 
+@router.get("/nearest", response_model=list[schemas.NearbyComparable])
+def read_nearest_comparables(
+    *,
+    db: Session = Depends(deps.get_db),
+    property_id: uuid.UUID,
+    k: int = Query(10, ge=1, le=50),
+    radius_km: float = Query(5.0, gt=0, le=50),
+    area_tolerance: float | None = Query(
+        None, gt=0, le=1, description="Allowed area difference, as a fraction"
+    ),
+    sold_within_days: int | None = Query(None, ge=1, le=3650),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    The k comparables nearest to a property, closest first, optionally
+    only those of similar area or sold recently.
+    """
+    property_obj = crud.property.get(db, id=property_id)
+    if not property_obj:
+        raise HTTPException(status_code=404, detail="Property not found")
+    if property_obj.user_id != current_user.id and current_user.role not in [
+        models.UserRole.ADMIN,
+        models.UserRole.VALUER,
+    ]:
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    if property_obj.lat is None or property_obj.lng is None:
+        raise HTTPException(status_code=400, detail="Property has no location")
+
+    area = property_obj.area_sqft
+    matches = crud.comp.get_nearest(
+        db,
+        lat=property_obj.lat,
+        lng=property_obj.lng,
+        k=k,
+        radius_km=radius_km,
+        min_area_sqft=area * (1 - area_tolerance) if area_tolerance else None,
+        max_area_sqft=area * (1 + area_tolerance) if area_tolerance else None,
+        sold_since=datetime.now(UTC) - timedelta(days=sold_within_days)
+        if sold_within_days
+        else None,
+    )
+    return [
+        schemas.NearbyComparable.model_validate(
+            {**schemas.Comparable.model_validate(comp).model_dump(), "distance_km": km}
+        )
+        for comp, km in matches
+    ]
+
+
 @router.post("/", response_model=schemas.Comparable)
 def create_comparable(
     *,
@@ -36,6 +90,13 @@ def create_comparable(
     """
     if current_user.role not in [models.UserRole.ADMIN, models.UserRole.VALUER]:
         raise HTTPException(status_code=403, detail="Not enough permissions")
+    if crud.comp.get_by_sale(
+        db, address=comparable_in.address, sale_date=comparable_in.sale_date
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail="A comparable with this address and sale date already exists.",
+        )
     comparable_obj = models.Comparable(**comparable_in.model_dump())
     db.add(comparable_obj)
     db.commit()
@@ -43,6 +104,31 @@ def create_comparable(
     return comparable_obj
 
 
+@router.post("/import", response_model=schemas.ComparableImportReport)
+def import_comparables(
+    *,
+    db: Session = Depends(deps.get_db),
+    file: UploadFile = File(...),
+    format: ImportFormat | None = None,
+    _: models.User = Depends(deps.get_current_active_admin),
+) -> Any:
+    """
+    Bulk import comparables from a CSV (with a header row) or NDJSON file,
+    upserting on address and sale date. The format defaults to the file's
+    extension. Invalid rows are skipped and listed in the report.
+    """
+    if format is None:
+        extension = (file.filename or "").rsplit(".", 1)[-1].lower()
+        try:
+            format = ImportFormat(extension)
+        except ValueError:
+            raise HTTPException(
+                status_code=400, detail="Unknown file format, pass format"
+            ) from None
+    lines = comp_import_service.open_lines(file.file)
+    return comp_import_service.import_lines(db, lines, format)
+
+
 @router.put("/{id}", response_model=schemas.Comparable)
 def update_comparable(
     *,
@@ -63,6 +149,16 @@ def update_comparable(
         raise HTTPException(status_code=404, detail="Comparable not found")
 
     update_data = comparable_in.model_dump(exclude_unset=True)
+    duplicate = crud.comp.get_by_sale(
+        db,
+        address=update_data.get("address", comparable_obj.address),
+        sale_date=update_data.get("sale_date", comparable_obj.sale_date),
+    )
+    if duplicate and duplicate.id != comparable_obj.id:
+        raise HTTPException(
+            status_code=400,
+            detail="A comparable with this address and sale date already exists.",
+        )
     for field in update_data:
         setattr(comparable_obj, field, update_data[field])
 
@@ -0,0 +1,52 @@
+from collections.abc import Callable
+from datetime import datetime
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app import models
+from app.api import deps
+from app.models.property import PropertyStatus
+from app.services.export_service import (
+    MEDIA_TYPES,
+    ExportDataset,
+    ExportFormat,
+    export_service,
+)
+
+router = APIRouter()
+
+
+@router.get("/{dataset}")
+def export_dataset(
+    dataset: ExportDataset,
+    format: ExportFormat = ExportFormat.NDJSON,
+    status: PropertyStatus | None = None,
+    city: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    session_factory: Callable[[], Session] = Depends(deps.get_session_factory),
+    _: models.User = Depends(deps.get_current_active_admin),
+) -> StreamingResponse:
+    """
+    Stream a whole dataset, oldest first. Filters on status and city apply
+    to the property, for valuations and photos too.
+    """
+    return StreamingResponse(
+        export_service.stream(
+            dataset,
+            format,
+            session_factory=session_factory,
+            status=status,
+            city=city,
+            created_from=created_from,
+            created_to=created_to,
+        ),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="{dataset.value}.{format.value}"'
+            )
+        },
+    )
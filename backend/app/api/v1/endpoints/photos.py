@@ -1,12 +1,16 @@
 import uuid
+from collections.abc import Sequence
 from typing import Any
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.interfaces import ORMOption
 
-from app import models, schemas
+from app import crud, models, schemas
 from app.api import deps
-from app.core.storage import storage_service
+from app.core.config import settings
+from app.services.storage_service import storage_service
+from app.utils.cache import invalidate_cache
 
 router = APIRouter()
 
@@ -20,14 +24,14 @@ ALLOWED_IMAGE_CONTENT_TYPES = {
 }
 
 
-def _validate_photo_upload(file: UploadFile) -> None:
-    if file.content_type not in ALLOWED_IMAGE_CONTENT_TYPES:
+def _validate_photo_upload(filename: str | None, content_type: str | None) -> None:
+    if content_type not in ALLOWED_IMAGE_CONTENT_TYPES:
         raise HTTPException(
             status_code=400,
             detail="Only camera image uploads are allowed.",
         )
 
-    filename = (file.filename or "").lower()
+    filename = (filename or "").lower()
     if "screenshot" in filename or "screen_shot" in filename:
         raise HTTPException(
             status_code=400,
@@ -35,33 +39,164 @@ def _validate_photo_upload(file: UploadFile) -> None:
         )
 
 
-@router.post("/{property_id}/photos", response_model=schemas.PropertyPhoto)
-async def upload_property_photo(
+def _photo_key(property_id: uuid.UUID, filename: str | None) -> str:
+    extension = filename.rsplit(".", 1)[-1].lower() if filename else ""
+    if not extension.isalnum() or extension == (filename or "").lower():
+        extension = "jpg"
+    return f"properties/{property_id}/{uuid.uuid4()}.{extension}"
+
+
+def _get_owned_property(
+    db: Session,
+    property_id: uuid.UUID,
+    current_user: models.User,
+    options: Sequence[ORMOption] = (),
+) -> models.Property:
+    property_obj = crud.property.get(db, id=property_id, options=options)
+    if not property_obj:
+        raise HTTPException(status_code=404, detail="Property not found")
+    if (
+        property_obj.user_id != current_user.id
+        and current_user.role != models.UserRole.ADMIN
+    ):
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    return property_obj
+
+
+@router.post(
+    "/{property_id}/photos/upload-urls", response_model=schemas.PhotoUploadUrls
+)
+def create_photo_upload_urls(
     *,
     db: Session = Depends(deps.get_db),
     property_id: uuid.UUID,
-    file: UploadFile = File(...),
+    upload_in: schemas.PhotoUploadRequest,
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Upload a photo for a property.
+    Issue presigned PUT URLs so clients upload a photo set straight to storage.
     """
-    property_obj = (
-        db.query(models.Property).filter(models.Property.id == property_id).first()
+    _get_owned_property(db, property_id, current_user)
+
+    if len(upload_in.files) > settings.PHOTO_UPLOAD_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.PHOTO_UPLOAD_MAX_FILES} photos per upload",
+        )
+    for upload_file in upload_in.files:
+        _validate_photo_upload(upload_file.filename, upload_file.content_type)
+
+    uploads = []
+    for upload_file in upload_in.files:
+        presigned = storage_service.get_presigned_upload_url(
+            _photo_key(property_id, upload_file.filename),
+            upload_file.content_type,
+            expires_in=settings.PHOTO_UPLOAD_URL_EXPIRE_SECONDS,
+        )
+        uploads.append(
+            schemas.PhotoUploadTicket(
+                key=presigned["key"],
+                url=presigned["url"],
+                content_type=upload_file.content_type,
+            )
+        )
+
+    return schemas.PhotoUploadUrls(
+        uploads=uploads, expires_in=settings.PHOTO_UPLOAD_URL_EXPIRE_SECONDS
     )
-    if not property_obj:
-        raise HTTPException(status_code=404, detail="Property not found")
+
+
+@router.post(
+    "/{property_id}/photos/finalize", response_model=schemas.PhotoFinalizeResult
+)
+def finalize_photo_uploads(
+    *,
+    db: Session = Depends(deps.get_db),
+    property_id: uuid.UUID,
+    finalize_in: schemas.PhotoFinalizeRequest,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Register photos uploaded through presigned URLs and queue their processing.
+    """
+    property_obj = _get_owned_property(
+        db, property_id, current_user, crud.property.WITH_PHOTO_COUNT
+    )
+
+    keys = [item.key for item in finalize_in.photos]
+    prefix = f"properties/{property_id}/"
+    if len(set(keys)) != len(keys) or any(
+        not key.startswith(prefix) or "/" in key[len(prefix) :] for key in keys
+    ):
+        raise HTTPException(status_code=400, detail="Invalid upload keys")
     if (
-        property_obj.user_id != current_user.id
-        and current_user.role != models.UserRole.ADMIN
+        db.query(models.PropertyPhoto.id)
+        .filter(models.PropertyPhoto.s3_key.in_(keys))
+        .first()
     ):
-        raise HTTPException(status_code=400, detail="Not enough permissions")
+        raise HTTPException(status_code=400, detail="Photo already registered")
+
+    for key in keys:
+        size = storage_service.get_object_size(key)
+        if size is None:
+            raise HTTPException(status_code=400, detail=f"Upload not found: {key}")
+        if size > settings.PHOTO_UPLOAD_MAX_BYTES:
+            storage_service.delete_file(key)
+            raise HTTPException(status_code=400, detail=f"Upload too large: {key}")
+
+    sequence = property_obj.photo_count
+    photos = [
+        models.PropertyPhoto(
+            property_id=property_id,
+            s3_key=item.key,
+            s3_url=storage_service.get_url(item.key),
+            photo_type=item.photo_type,
+            sequence=sequence + index,
+        )
+        for index, item in enumerate(finalize_in.photos, start=1)
+    ]
+    db.add_all(photos)
+    db.commit()
+    # Cached property responses embed their photos
+    invalidate_cache("properties")
+    for photo_obj in photos:
+        db.refresh(photo_obj)
+
+    # Trigger background processing of the whole set as one batch
+    from app.tasks.image_processing import process_photo_batch
+
+    task = process_photo_batch.delay(
+        str(property_id), [str(photo_obj.id) for photo_obj in photos]
+    )
+
+    return schemas.PhotoFinalizeResult(
+        property_id=property_id,
+        task_id=str(task.id),
+        photos=[schemas.PropertyPhoto.model_validate(photo) for photo in photos],
+    )
 
-    _validate_photo_upload(file)
+
+@router.post("/{property_id}/photos", response_model=schemas.PropertyPhoto)
+def upload_property_photo(
+    *,
+    db: Session = Depends(deps.get_db),
+    property_id: uuid.UUID,
+    file: UploadFile = File(...),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Upload a photo for a property through the API.
+    Prefer the upload-urls and finalize flow, which keeps image bytes off
+    the API servers.
+    """
+    property_obj = _get_owned_property(
+        db, property_id, current_user, crud.property.WITH_PHOTO_COUNT
+    )
+
+    _validate_photo_upload(file.filename, file.content_type)
 
     # Upload to storage
-    file_extension = file.filename.split(".")[-1] if file.filename else "jpg"
-    file_key = f"properties/{property_id}/{uuid.uuid4()}.{file_extension}"
+    file_key = _photo_key(property_id, file.filename)
 
     try:
         s3_url = storage_service.upload_file(
@@ -78,19 +213,45 @@ async def upload_property_photo(
         s3_key=file_key,
         s3_url=s3_url,
         photo_type=models.PhotoType.OTHER,
-        sequence=len(property_obj.photos) + 1,
+        sequence=property_obj.photo_count + 1,
     )
     db.add(photo_obj)
     db.commit()
     db.refresh(photo_obj)
+    invalidate_cache("properties")
 
     # Trigger background processing
     from app.tasks.image_processing import process_photo
-    process_photo.delay(str(photo_obj.id), s3_url)
+    process_photo.delay(str(photo_obj.id), file_key)
 
     return photo_obj
 
 
+@router.post("/{property_id}/photos/qc", response_model=schemas.PhotoQCBatch)
+def run_property_photo_qc(
+    *,
+    db: Session = Depends(deps.get_db),
+    property_id: uuid.UUID,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Queue QC for every photo of a property as a single batch task.
+    """
+    _get_owned_property(db, property_id, current_user)
+
+    photos = crud.photo.get_by_property(db, property_id=property_id)
+    if not photos:
+        raise HTTPException(status_code=400, detail="Property has no photos")
+
+    from app.tasks.image_processing import process_photo_batch
+
+    task = process_photo_batch.delay(str(property_id))
+
+    return schemas.PhotoQCBatch(
+        property_id=property_id, task_id=str(task.id), photo_count=len(photos)
+    )
+
+
 @router.get("/{property_id}/photos", response_model=list[schemas.PropertyPhoto])
 def read_property_photos(
     *,
@@ -139,13 +300,15 @@ def delete_property_photo(
     ):
         raise HTTPException(status_code=400, detail="Not enough permissions")
 
-    # Delete from storage
-    try:
-        storage_service.delete_file(photo_obj.s3_key)
-    except Exception:
-        # Log error but continue with DB deletion
-        pass
+    # Delete the original and its renditions from storage
+    for key in crud.photo.storage_keys(db, db_obj=photo_obj):
+        try:
+            storage_service.delete_file(key)
+        except Exception:
+            # Log error but continue with DB deletion
+            pass
 
     db.delete(photo_obj)
     db.commit()
+    invalidate_cache("properties")
     return photo_obj
@@ -1,7 +1,7 @@
 import uuid
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
@@ -11,28 +11,84 @@ from app.utils.cache import cache_response, invalidate_cache
 router = APIRouter()
 
 
+@cache_response(
+    expire=300, key_prefix="properties", response_model=list[schemas.Property]
+)
+def _list_properties(
+    *, db: Session, current_user: models.User, page: deps.PageParams
+) -> list[models.Property]:
+    # Photos are serialized with each property
+    options = crud.property.WITH_PHOTOS
+    if current_user.role == models.UserRole.ADMIN:
+        return crud.property.get_multi(
+            db, cursor=page.cursor, skip=page.skip, limit=page.limit, options=options
+        )
+    if current_user.role == models.UserRole.VALUER:
+        return crud.property.get_pending_review(
+            db, cursor=page.cursor, limit=page.limit, options=options
+        )
+    return crud.property.get_multi_by_owner(
+        db,
+        user_id=current_user.id,
+        cursor=page.cursor,
+        limit=page.limit,
+        options=options,
+    )
+
+
 @router.get("/", response_model=list[schemas.Property])
-@cache_response(expire=300, key_prefix="properties")
 def read_properties(
+    response: Response,
     db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 100,
+    page: deps.PageParams = Depends(deps.get_page_params),
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Retrieve properties.
+    Retrieve properties, oldest first. Pass the X-Next-Cursor header of a
+    page as cursor to fetch the next one.
     """
-    if current_user.role == models.UserRole.ADMIN:
-        properties = crud.property.get_multi(db, skip=skip, limit=limit)
-    elif current_user.role == models.UserRole.VALUER:
-        properties = crud.property.get_pending_review(db, skip=skip, limit=limit)
-    else:
-        properties = crud.property.get_multi_by_owner(
-            db, user_id=current_user.id, skip=skip, limit=limit
-        )
+    properties = _list_properties(db=db, current_user=current_user, page=page)
+    deps.set_next_cursor(response, properties, page)
     return properties
 
 
+@cache_response(
+    expire=300, key_prefix="properties", response_model=list[schemas.PropertySummary]
+)
+def _list_property_summaries(
+    *, db: Session, current_user: models.User, page: deps.PageParams
+) -> list[dict[str, Any]]:
+    # Same visibility as the full list
+    owner_id = (
+        None
+        if current_user.role in (models.UserRole.ADMIN, models.UserRole.VALUER)
+        else current_user.id
+    )
+    return crud.property.get_summaries(
+        db,
+        user_id=owner_id,
+        cursor=page.cursor,
+        skip=page.skip,
+        limit=page.limit,
+    )
+
+
+@router.get("/summary", response_model=list[schemas.PropertySummary])
+def read_property_summaries(
+    response: Response,
+    db: Session = Depends(deps.get_db),
+    page: deps.PageParams = Depends(deps.get_page_params),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Retrieve properties like GET /properties/, but only the columns list
+    views need and without photos. Much smaller and cheaper for big pages.
+    """
+    summaries = _list_property_summaries(db=db, current_user=current_user, page=page)
+    deps.set_next_cursor(response, summaries, page)
+    return summaries
+
+
 @router.post("/", response_model=schemas.Property)
 def create_property(
     *,
@@ -43,10 +99,12 @@ def create_property(
     """
     Create new property.
     """
-    invalidate_cache("properties:*")
-    return crud.property.create_with_owner(
+    property_obj = crud.property.create_with_owner(
         db, obj_in=property_in, user_id=current_user.id
     )
+    # Bump after the commit, or a concurrent read could cache the old row
+    invalidate_cache("properties")
+    return property_obj
 
 
 @router.put("/{id}", response_model=schemas.Property)
@@ -69,12 +127,13 @@ def update_property(
     ):
         raise HTTPException(status_code=400, detail="Not enough permissions")
 
-    invalidate_cache("properties:*")
-    return crud.property.update(db, db_obj=property_obj, obj_in=property_in)
+    property_obj = crud.property.update(db, db_obj=property_obj, obj_in=property_in)
+    invalidate_cache("properties")
+    return property_obj
 
 
 @router.get("/{id}", response_model=schemas.Property)
-@cache_response(expire=300, key_prefix="properties")
+@cache_response(expire=300, key_prefix="properties", response_model=schemas.Property)
 def read_property(
     *,
     db: Session = Depends(deps.get_db),
@@ -87,10 +146,10 @@ def read_property(
     property_obj = crud.property.get(db, id=id)
     if not property_obj:
         raise HTTPException(status_code=404, detail="Property not found")
-    if (
-        property_obj.user_id != current_user.id
-        and current_user.role not in [models.UserRole.ADMIN, models.UserRole.VALUER]
-    ):
+    if property_obj.user_id != current_user.id and current_user.role not in [
+        models.UserRole.ADMIN,
+        models.UserRole.VALUER,
+    ]:
         raise HTTPException(status_code=400, detail="Not enough permissions")
     return property_obj
 
@@ -113,8 +172,9 @@ def delete_property(
         and current_user.role != models.UserRole.ADMIN
     ):
         raise HTTPException(status_code=400, detail="Not enough permissions")
-    invalidate_cache("properties:*")
-    return crud.property.remove(db, id=id)
+    property_obj = crud.property.remove(db, id=id)
+    invalidate_cache("properties")
+    return property_obj
 
 
 @router.post("/{id}/submit", response_model=schemas.Property)
@@ -127,7 +187,7 @@ def submit_property(
     """
     Submit a property for review.
     """
-    property_obj = crud.property.get(db, id=id)
+    property_obj = crud.property.get(db, id=id, options=crud.property.WITH_PHOTO_COUNT)
     if not property_obj:
         raise HTTPException(status_code=404, detail="Property not found")
     if (
@@ -139,10 +199,11 @@ def submit_property(
         raise HTTPException(status_code=400, detail="Property is not in draft status")
 
     # Ensure there are photos before submission
-    if not property_obj.photos:
+    if not property_obj.photo_count:
         raise HTTPException(
             status_code=400, detail="Property must have photos before submission"
         )
 
-    invalidate_cache("properties:*")
-    return crud.property.submit(db, db_obj=property_obj)
+    property_obj = crud.property.submit(db, db_obj=property_obj)
+    invalidate_cache("properties")
+    return property_obj
@@ -1,6 +1,6 @@
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
@@ -49,13 +49,16 @@ def read_user_me(
 
 @router.get("/", response_model=list[schemas.User])
 def read_users(
+    response: Response,
     db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 100,
+    page: deps.PageParams = Depends(deps.get_page_params),
     current_user: models.User = Depends(deps.get_current_active_admin),
 ) -> Any:
     """
-    Retrieve users.
+    Retrieve users, oldest first.
     """
-    users = crud.user.get_multi(db, skip=skip, limit=limit)
+    users = crud.user.get_multi(
+        db, cursor=page.cursor, skip=page.skip, limit=page.limit
+    )
+    deps.set_next_cursor(response, users, page)
     return users
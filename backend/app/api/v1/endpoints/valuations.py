@@ -1,45 +1,41 @@
 import uuid
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
-from app import models, schemas
+from app import crud, models, schemas
 from app.api import deps
+from app.services.valuation_engine import valuation_engine
+from app.utils.cache import ainvalidate_cache
 
 router = APIRouter()
 
 
 @router.get("/", response_model=list[schemas.Valuation])
 def read_valuations(
+    response: Response,
     db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 100,
+    page: deps.PageParams = Depends(deps.get_page_params),
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Retrieve valuations.
+    Retrieve valuations, oldest first.
     """
     if current_user.role == models.UserRole.ADMIN:
-        valuations = db.query(models.Valuation).offset(skip).limit(limit).all()
+        valuations = crud.valuation.get_multi(
+            db, cursor=page.cursor, skip=page.skip, limit=page.limit
+        )
     elif current_user.role == models.UserRole.VALUER:
-        valuations = (
-            db.query(models.Valuation)
-            .filter(models.Valuation.valuer_id == current_user.id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+        valuations = crud.valuation.get_by_valuer(
+            db, valuer_id=current_user.id, cursor=page.cursor, limit=page.limit
         )
     else:
         # Regular users see valuations for their properties
-        valuations = (
-            db.query(models.Valuation)
-            .join(models.Property)
-            .filter(models.Property.user_id == current_user.id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+        valuations = crud.valuation.get_by_owner(
+            db, user_id=current_user.id, cursor=page.cursor, limit=page.limit
         )
+    deps.set_next_cursor(response, valuations, page)
     return valuations
 
 
@@ -64,21 +60,11 @@ async def create_valuation(
     if not property_obj:
         raise HTTPException(status_code=404, detail="Property not found")
 
-    valuation_obj = models.Valuation(
-        **valuation_in.model_dump(),
-        valuer_id=current_user.id,
+    # Also moves the property to VALUED and updates the KPI counters
+    valuation_obj = crud.valuation.create_with_property_update(
+        db, obj_in=valuation_in, valuer_id=current_user.id
     )
-
-    # Update property status and estimated value
-    property_obj.status = models.PropertyStatus.VALUED
-    property_obj.estimated_value = valuation_in.estimated_value
-    property_obj.valuer_id = current_user.id
-    property_obj.reviewed_at = valuation_obj.valuation_date
-
-    db.add(valuation_obj)
-    db.add(property_obj)
-    db.commit()
-    db.refresh(valuation_obj)
+    await ainvalidate_cache("properties")
 
     # Notify property owner via WebSocket
     from app.schemas.valuation import Valuation as ValuationSchema
@@ -102,6 +88,42 @@ async def create_valuation(
     return valuation_obj
 
 
+@router.get("/suggest", response_model=schemas.ValuationSuggestion)
+def suggest_valuation(
+    *,
+    db: Session = Depends(deps.get_db),
+    property_id: uuid.UUID,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Suggested value for a property, from its nearest comparables and the
+    nightly price-per-sqft grids.
+    """
+    if current_user.role not in [models.UserRole.ADMIN, models.UserRole.VALUER]:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    property_obj = crud.property.get(db, id=property_id)
+    if not property_obj:
+        raise HTTPException(status_code=404, detail="Property not found")
+    if property_obj.area_sqft <= 0:
+        raise HTTPException(
+            status_code=422, detail="Property area must be positive to value it"
+        )
+
+    suggestion = valuation_engine.suggest(db, property_obj)
+    if suggestion is None:
+        raise HTTPException(
+            status_code=404, detail="No comparable sales near this property"
+        )
+    suggestion["comps"] = [
+        schemas.NearbyComparable.model_validate(
+            {**schemas.Comparable.model_validate(comp).model_dump(), "distance_km": km}
+        )
+        for comp, km in suggestion["comps"]
+    ]
+    return suggestion
+
+
 @router.get("/{id}", response_model=schemas.Valuation)
 def read_valuation(
     *,
@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.schedules import crontab
 
 from app.core.config import settings
 
@@ -6,6 +7,15 @@ celery_app = Celery(
     "propflow",
     broker=f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/0",
     backend=f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/0",
+    # app.tasks is a namespace package with no tasks module of its own, so
+    # autodiscovery finds nothing; the worker imports these instead
+    include=[
+        "app.tasks.analytics",
+        "app.tasks.cleanup",
+        "app.tasks.image_processing",
+        "app.tasks.notifications",
+        "app.tasks.valuation",
+    ],
 )
 
 celery_app.conf.update(
@@ -15,7 +25,33 @@ celery_app.conf.update(
     timezone="UTC",
     enable_utc=True,
     task_track_started=True,
+    # CPU-heavy image work runs on a dedicated worker so it cannot starve
+    # notification and cleanup tasks
+    task_routes={
+        "process_photo": {"queue": settings.IMAGE_QUEUE},
+        "process_photo_batch": {"queue": settings.IMAGE_QUEUE},
+    },
+    beat_schedule={
+        "reconcile-kpi-counters": {
+            "task": "reconcile_kpi_counters",
+            "schedule": crontab(minute=settings.KPI_RECONCILE_MINUTE),
+        },
+        "refresh-daily-rollups": {
+            "task": "refresh_daily_rollups",
+            "schedule": settings.ROLLUP_REFRESH_SECONDS,
+        },
+        "rebuild-daily-rollups": {
+            "task": "refresh_daily_rollups",
+            "schedule": crontab(hour=settings.ROLLUP_REBUILD_HOUR, minute=0),
+            "kwargs": {"full": True},
+        },
+        "refresh-price-grids": {
+            "task": "refresh_price_grids",
+            "schedule": crontab(hour=settings.PRICE_GRID_REBUILD_HOUR, minute=15),
+        },
+        "ensure-telemetry-partitions": {
+            "task": "ensure_telemetry_partitions",
+            "schedule": crontab(hour=0, minute=30),
+        },
+    },
 )
-
-# Auto-discover tasks in the app
-celery_app.autodiscover_tasks(["app.tasks"])
@@ -1,15 +1,32 @@
 from typing import Any
 
-from pydantic import AnyHttpUrl, PostgresDsn, field_validator
+from pydantic import AnyHttpUrl, BaseModel, PostgresDsn, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class RenditionSpec(BaseModel):
+    """A derivative generated for every uploaded photo."""
+
+    name: str
+    max_size: int  # Longest edge in pixels
+    format: str = "WEBP"  # Any Pillow save format: JPEG, WEBP, AVIF (plugin)
+    quality: int = 80
+
+
 class Settings(BaseSettings):
     PROJECT_NAME: str = "PropFlow"
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str = "change-me-in-env"  # Override in environment
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 1 day
 
+    # List endpoints page by cursor; offset paging is admin-only and shallow
+    PAGINATION_MAX_LIMIT: int = 500
+    PAGINATION_MAX_OFFSET: int = 1_000
+
+    # Streaming exports
+    EXPORT_BATCH_SIZE: int = 2_000  # Rows fetched and encoded per chunk
+    EXPORT_WINDOW_ROWS: int = 100_000  # Rows per query, between connection returns
+
     # BACKEND_CORS_ORIGINS is a JSON-formatted list of strings
     BACKEND_CORS_ORIGINS: list[AnyHttpUrl] = []
 
@@ -58,6 +75,65 @@ class Settings(BaseSettings):
     AWS_REGION: str = "us-east-1"
     S3_BUCKET: str = "propflow-uploads"
     ENVIRONMENT: str = "local"
+    # Direct-to-storage photo uploads
+    PHOTO_UPLOAD_URL_EXPIRE_SECONDS: int = 15 * 60
+    PHOTO_UPLOAD_MAX_FILES: int = 50
+    PHOTO_UPLOAD_MAX_BYTES: int = 25 * 1024 * 1024
+
+    # Image processing
+    IMAGE_QUEUE: str = "images"
+    IMAGE_POOL_ENABLED: bool = False  # Enabled on the dedicated image worker
+    IMAGE_POOL_WORKERS: int | None = None  # None = one per CPU core
+    IMAGE_POOL_MAX_TASKS_PER_CHILD: int = 50
+    IMAGE_POOL_MAX_PIXEL_BYTES: int = 1024 * 1024 * 1024
+    IMAGE_POOL_DEFAULT_PIXEL_BYTES: int = 4000 * 3000 * 3
+    IMAGE_SCRATCH_DIR: str | None = None  # None = <tmpdir>/propflow-scratch
+    IMAGE_SCRATCH_MAX_BYTES: int = 2 * 1024 * 1024 * 1024
+    # Near-duplicate photos reuse prior QC; must stay below the 4 hash bands
+    PHOTO_DUPLICATE_MAX_DISTANCE: int = 3
+    # Oldest band matches compared bit by bit per duplicate lookup
+    PHOTO_DUPLICATE_MAX_CANDIDATES: int = 200
+    # JSON list in the environment; formats Pillow cannot encode are skipped
+    IMAGE_RENDITIONS: list[RenditionSpec] = [
+        RenditionSpec(name="thumb", max_size=320, format="WEBP", quality=70),
+        RenditionSpec(name="medium", max_size=1024, format="WEBP", quality=80),
+        RenditionSpec(name="full", max_size=1920, format="JPEG", quality=85),
+    ]
+
+    # Analytics
+    KPI_RECONCILE_MINUTE: int = 17  # Counters are rebuilt hourly at this minute
+    ROLLUP_REFRESH_SECONDS: int = 5 * 60
+    ROLLUP_REBUILD_HOUR: int = 2  # Nightly full rebuild, UTC
+
+    # Geocoding, through Nominatim
+    NOMINATIM_URL: str = "https://nominatim.openstreetmap.org"
+    GEOCODE_USER_AGENT: str = "PropFlow/1.0"
+    GEOCODE_TIMEOUT_SECONDS: float = 10.0
+    GEOCODE_MIN_INTERVAL_SECONDS: float = 1.0  # Nominatim allows 1 request/s
+    GEOCODE_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    GEOCODE_MISS_TTL_SECONDS: int = 24 * 3600  # Addresses nothing was found for
+    GEOCODE_MEMORY_ENTRIES: int = 10_000  # In-process LRU, per API process
+
+    # Comparable bulk import
+    IMPORT_CHUNK_ROWS: int = 5_000  # Rows validated and upserted per commit
+    IMPORT_MAX_REJECTS: int = 1_000  # Rejected rows listed in an import report
+
+    # Valuation engine
+    PRICE_GRID_REBUILD_HOUR: int = 3  # Nightly price-per-sqft grid rebuild, UTC
+    PRICE_GRID_LOOKBACK_DAYS: int = 730  # Comparable sales the grids are built from
+    PRICE_GRID_MIN_COMPS: int = 5  # Fewer sales and a cell is not used
+    VALUATION_COMPS: int = 8  # Nearest comparables blended into a suggestion
+    VALUATION_COMP_RADIUS_KM: float = 3.0
+
+    # Client telemetry
+    TELEMETRY_MAX_BATCH_EVENTS: int = 500
+    TELEMETRY_BUFFER_MAX_EVENTS: int = 100_000  # Per API process
+    TELEMETRY_FLUSH_EVENTS: int = 5_000
+    TELEMETRY_FLUSH_INTERVAL_SECONDS: float = 2.0
+    TELEMETRY_SESSION_TIMEOUT_MINUTES: int = 30
+    # Accepted occurred_at window around server time, for skewed client clocks
+    TELEMETRY_MAX_EVENT_AGE_DAYS: int = 7
+    TELEMETRY_MAX_CLOCK_AHEAD_SECONDS: int = 300
 
     # Twilio SMS
     TWILIO_ACCOUNT_SID: str = ""
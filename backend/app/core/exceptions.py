@@ -54,6 +54,11 @@ class NotFoundError(AppError):
         super().__init__(detail=detail, status_code=404, error_type="not_found")
 
 
+class InvalidCursorError(AppError):
+    def __init__(self, detail: str = "Invalid pagination cursor") -> None:
+        super().__init__(detail=detail, status_code=400, error_type="invalid_cursor")
+
+
 def _app_error_handler(_: Request, exc: AppError) -> JSONResponse:
     return JSONResponse(
         status_code=exc.status_code,
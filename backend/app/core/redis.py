@@ -1,4 +1,5 @@
 import redis
+import redis.asyncio
 
 from app.core.config import settings
 
@@ -7,3 +8,10 @@ redis_client = redis.Redis(
     port=settings.REDIS_PORT,
     decode_responses=True,
 )
+
+# For async code paths, so they never block the event loop
+async_redis_client = redis.asyncio.Redis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    decode_responses=True,
+)
@@ -1,7 +1,19 @@
 from .crud_comp import comp
+from .crud_daily_rollup import daily_rollup
+from .crud_kpi_counter import kpi_counter
 from .crud_photo import photo
+from .crud_price_grid import price_grid
 from .crud_property import property
 from .crud_user import user
 from .crud_valuation import valuation
 
-__all__ = ["user", "property", "photo", "comp", "valuation"]
+__all__ = [
+    "user",
+    "property",
+    "photo",
+    "comp",
+    "valuation",
+    "kpi_counter",
+    "daily_rollup",
+    "price_grid",
+]
@@ -1,16 +1,53 @@
+import base64
+import binascii
+import json
 import uuid
+from collections.abc import Sequence
+from datetime import datetime
 from typing import Any, Generic, TypeVar
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, func, literal, select, tuple_
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.orm.interfaces import ORMOption
 
-from app.core.exceptions import NotFoundError
+from app.core.exceptions import InvalidCursorError, NotFoundError
 from app.database import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
+# ORM queries, or Core selects of plain columns
+PageableType = TypeVar("PageableType", Query[Any], Select[Any])
+
+
+def encode_cursor(created_at: datetime | str, id: uuid.UUID | str) -> str:
+    """Opaque token for the position just after a row."""
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    raw = json.dumps([created_at, str(id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        return datetime.fromisoformat(created_at), uuid.UUID(id)
+    except (binascii.Error, TypeError, ValueError):
+        raise InvalidCursorError() from None
+
+
+def next_cursor(items: list[Any], limit: int) -> str | None:
+    """Cursor of the page after items, or None if it was the last page."""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    # Rows, or their JSON form when served from the response cache
+    if isinstance(last, dict):
+        return encode_cursor(last["created_at"], last["id"])
+    return encode_cursor(last.created_at, last.id)
 
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
@@ -25,13 +62,68 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         self.model = model
 
-    def get(self, db: Session, id: Any) -> ModelType | None:
-        return db.query(self.model).filter_by(id=id).first()
+    def get(
+        self, db: Session, id: Any, *, options: Sequence[ORMOption] = ()
+    ) -> ModelType | None:
+        return db.query(self.model).options(*options).filter_by(id=id).first()
+
+    def page_query(
+        self,
+        query: PageableType,
+        *,
+        cursor: str | None = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> PageableType:
+        """
+        Restrict query to one page in (created_at, id) order. A cursor seeks
+        straight to the page, so deep pages cost the same as the first;
+        skip is plain offset paging and only meant for small admin views.
+        """
+        model: Any = self.model
+        query = query.order_by(model.created_at, model.id)
+        if cursor is not None:
+            created_at, id = decode_cursor(cursor)
+            # Compare against the stored timestamp, so its precision and
+            # format never shift the boundary. The cursor's own copy only
+            # matters once that row has been deleted.
+            anchor = select(model.created_at).where(model.id == id).scalar_subquery()
+            query = query.filter(
+                tuple_(model.created_at, model.id)
+                > tuple_(
+                    func.coalesce(anchor, literal(created_at, model.created_at.type)),
+                    literal(id, model.id.type),
+                )
+            )
+        elif skip:
+            query = query.offset(skip)
+        return query.limit(limit)
+
+    def paginate(
+        self,
+        query: Query[ModelType],
+        *,
+        cursor: str | None = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> list[ModelType]:
+        return self.page_query(query, cursor=cursor, skip=skip, limit=limit).all()
 
     def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        *,
+        cursor: str | None = None,
+        skip: int = 0,
+        limit: int = 100,
+        options: Sequence[ORMOption] = (),
     ) -> list[ModelType]:
-        return db.query(self.model).offset(skip).limit(limit).all()
+        return self.paginate(
+            db.query(self.model).options(*options),
+            cursor=cursor,
+            skip=skip,
+            limit=limit,
+        )
 
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
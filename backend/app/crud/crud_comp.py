@@ -1,10 +1,163 @@
+import math
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Any
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
 from app.crud.base import CRUDBase
 from app.models.comp import Comparable
 from app.schemas.comp import ComparableCreate, ComparableUpdate
+from app.utils.geo import KM_PER_DEGREE, bounding_box, haversine_many
 
 
 class CRUDComparable(CRUDBase[Comparable, ComparableCreate, ComparableUpdate]):
-    pass
+    # First KNN batch on PostgreSQL, as a multiple of k
+    NEAREST_OVERFETCH = 4
+    # Elsewhere, the first search radius, doubled until k are found
+    NEAREST_START_RADIUS_KM = 0.5
+
+    def get_by_sale(
+        self, db: Session, *, address: str, sale_date: datetime
+    ) -> Comparable | None:
+        """The comparable with this natural key, if any."""
+        return db.scalar(
+            select(Comparable).where(
+                Comparable.address == address, Comparable.sale_date == sale_date
+            )
+        )
+
+    def get_nearest(
+        self,
+        db: Session,
+        *,
+        lat: float,
+        lng: float,
+        k: int = 10,
+        radius_km: float = 5.0,
+        min_area_sqft: float | None = None,
+        max_area_sqft: float | None = None,
+        sold_since: datetime | None = None,
+    ) -> list[tuple[Comparable, float]]:
+        """
+        The k comparables nearest to (lat, lng) within radius_km, closest
+        first, with their great circle distance in km.
+
+        Candidates come from the location index by bounding box. On
+        PostgreSQL the GiST index also returns them in planar (degree)
+        distance order, read in growing batches until no row left could be
+        closer than the k-th found. Elsewhere the points of a small box are
+        ranked here, and the box doubled until it holds k matches.
+        """
+        filters = []
+        if min_area_sqft is not None:
+            filters.append(Comparable.area_sqft >= min_area_sqft)
+        if max_area_sqft is not None:
+            filters.append(Comparable.area_sqft <= max_area_sqft)
+        if sold_since is not None:
+            filters.append(Comparable.sale_date >= sold_since)
+
+        if db.get_bind().dialect.name == "postgresql":
+            return self._nearest_knn(db, lat, lng, k, radius_km, filters)
+        return self._nearest_in_boxes(db, lat, lng, k, radius_km, filters)
+
+    def _nearest_knn(
+        self,
+        db: Session,
+        lat: float,
+        lng: float,
+        k: int,
+        radius_km: float,
+        filters: list[Any],
+    ) -> list[tuple[Comparable, float]]:
+        min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+        location = func.point(Comparable.lng, Comparable.lat)
+        # On the indexed expression, so the GiST index answers both
+        query = (
+            select(Comparable)
+            .where(
+                location.op("<@")(
+                    func.box(func.point(min_lng, min_lat), func.point(max_lng, max_lat))
+                ),
+                *filters,
+            )
+            .order_by(location.op("<->")(func.point(lng, lat)))
+        )
+        # A degree of longitude is shortest at the box's widest latitude,
+        # so planar distance times this is a lower bound in km
+        km_per_planar_degree = KM_PER_DEGREE * math.cos(
+            math.radians(min(90.0, max(abs(min_lat), abs(max_lat))))
+        )
+        limit = k * self.NEAREST_OVERFETCH
+        while True:
+            candidates = list(db.scalars(query.limit(limit)))
+            matches = _closest(
+                ((comp, comp.lat, comp.lng) for comp in candidates),
+                lat,
+                lng,
+                k,
+                radius_km,
+            )
+            if len(candidates) < limit:
+                return matches
+            last = candidates[-1]
+            # Inside the bounding box, so located
+            assert last.lat is not None and last.lng is not None
+            unseen_km = (
+                math.hypot(last.lat - lat, last.lng - lng) * km_per_planar_degree
+            )
+            if len(matches) == k and matches[-1][1] <= unseen_km:
+                return matches
+            limit *= self.NEAREST_OVERFETCH
+
+    def _nearest_in_boxes(
+        self,
+        db: Session,
+        lat: float,
+        lng: float,
+        k: int,
+        radius_km: float,
+        filters: list[Any],
+    ) -> list[tuple[Comparable, float]]:
+        search_km = min(radius_km, self.NEAREST_START_RADIUS_KM)
+        while True:
+            min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, search_km)
+            # Only the indexed columns; rows are loaded for the k winners
+            points = db.execute(
+                select(Comparable.id, Comparable.lat, Comparable.lng).where(
+                    Comparable.lat.between(min_lat, max_lat),
+                    Comparable.lng.between(min_lng, max_lng),
+                    *filters,
+                )
+            )
+            matches = _closest(points, lat, lng, k, search_km)
+            # Anything outside the box is further than search_km
+            if len(matches) == k or search_km >= radius_km:
+                break
+            search_km = min(radius_km, search_km * 2)
+
+        ids = [id for id, _ in matches]
+        comps = {
+            comp.id: comp
+            for comp in db.scalars(select(Comparable).where(Comparable.id.in_(ids)))
+        }
+        return [(comps[id], km) for id, km in matches]
+
+
+def _closest(
+    points: Iterable[Any], lat: float, lng: float, k: int, radius_km: float
+) -> list[tuple[Any, float]]:
+    """The k (key, km) nearest to (lat, lng) of (key, lat, lng) within radius_km."""
+    rows = list(points)
+    if not rows:
+        return []
+    keys, lats, lngs = zip(*rows, strict=True)
+    km = haversine_many(lat, lng, lats, lngs)
+    within = np.flatnonzero(km <= radius_km)
+    nearest = within[np.argsort(km[within], kind="stable")[:k]]
+    return [(keys[i], float(km[i])) for i in nearest]
 
 
 comp = CRUDComparable(Comparable)
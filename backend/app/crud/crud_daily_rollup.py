@@ -0,0 +1,176 @@
+from collections import defaultdict
+from datetime import UTC, date, datetime, time, timedelta
+from typing import Any
+
+from sqlalchemy import ColumnElement, delete, func, insert, or_, select, union
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+from app.models.daily_rollup import DailyPropertyRollup
+from app.models.photo import PropertyPhoto
+from app.models.property import Property
+
+MEASURES = (
+    "created_count",
+    "located_count",
+    "photographed_count",
+    "submitted_count",
+    "reviewed_count",
+    "reviewed_value_sum",
+)
+
+
+def _as_date(value: date | str) -> date:
+    # date() returns a date on PostgreSQL and an ISO string on SQLite
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _start_of(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=UTC)
+
+
+class CRUDDailyRollup:
+    """
+    Maintains DailyPropertyRollup from property and photo.
+
+    An incremental refresh recomputes only the days touched by properties
+    or photos changed since the previous refresh, plus today. The previous
+    refresh time is the newest refreshed_at in the table, so a refresh
+    that writes no rows simply widens the next one. Deletes are only
+    picked up by a full refresh.
+    """
+
+    # Overlap between refreshes, covering transactions still in flight
+    WATERMARK_MARGIN = timedelta(minutes=5)
+
+    def changed_days(self, db: Session, *, since: datetime) -> set[date]:
+        """Days whose rollup rows may differ from the base tables."""
+        changed = or_(Property.created_at >= since, Property.updated_at >= since)
+        columns: tuple[InstrumentedAttribute[Any], ...] = (
+            Property.created_at,
+            Property.submitted_at,
+            Property.reviewed_at,
+        )
+        queries = [
+            select(func.date(column)).where(changed, column.isnot(None))
+            for column in columns
+        ]
+        queries.append(
+            select(func.date(Property.created_at))
+            .join(PropertyPhoto, PropertyPhoto.property_id == Property.id)
+            .where(PropertyPhoto.created_at >= since)
+        )
+        days = {_as_date(day) for day in db.scalars(union(*queries))}
+        days.add(datetime.now(UTC).date())
+        return days
+
+    def _aggregate(
+        self, db: Session, start: datetime | None, end: datetime | None
+    ) -> dict[tuple[Any, ...], dict[str, Any]]:
+        """Rollup rows for events in [start, end), keyed by their dimensions."""
+        has_photos = (
+            select(PropertyPhoto.id)
+            .where(PropertyPhoto.property_id == Property.id)
+            .exists()
+        )
+        sources: list[
+            tuple[InstrumentedAttribute[Any], dict[str, ColumnElement[Any]]]
+        ] = [
+            (
+                Property.created_at,
+                {
+                    "created_count": func.count(),
+                    "located_count": func.count(Property.lat),
+                    "photographed_count": func.count().filter(has_photos),
+                },
+            ),
+            (Property.submitted_at, {"submitted_count": func.count()}),
+            (
+                Property.reviewed_at,
+                {
+                    "reviewed_count": func.count(),
+                    "reviewed_value_sum": func.coalesce(
+                        func.sum(Property.estimated_value), 0.0
+                    ),
+                },
+            ),
+        ]
+
+        rows: dict[tuple[Any, ...], dict[str, Any]] = defaultdict(
+            lambda: dict.fromkeys(MEASURES, 0)
+        )
+        for column, measures in sources:
+            day = func.date(column)
+            query = (
+                select(
+                    day.label("day"),
+                    Property.city,
+                    Property.property_type,
+                    Property.status,
+                    *(measure.label(name) for name, measure in measures.items()),
+                )
+                .where(column.isnot(None))
+                .group_by(day, Property.city, Property.property_type, Property.status)
+            )
+            # Range predicates keep the event timestamp indexes usable
+            if start is not None:
+                query = query.where(column >= start)
+            if end is not None:
+                query = query.where(column < end)
+            for result in db.execute(query).mappings():
+                key = (
+                    _as_date(result["day"]),
+                    result["city"],
+                    result["property_type"],
+                    result["status"],
+                )
+                for name in measures:
+                    rows[key][name] = result[name]
+        return rows
+
+    def refresh(self, db: Session, *, full: bool = False) -> int:
+        """
+        Recompute rollup rows and commit. Returns the number of days
+        refreshed; a full refresh rebuilds every day.
+        """
+        refreshed_at = datetime.now(UTC)
+        last_refresh = db.scalar(select(func.max(DailyPropertyRollup.refreshed_at)))
+
+        if full or last_refresh is None:
+            days = None
+            rows = self._aggregate(db, None, None)
+            db.execute(delete(DailyPropertyRollup))
+        else:
+            if last_refresh.tzinfo is None:
+                last_refresh = last_refresh.replace(tzinfo=UTC)
+            days = self.changed_days(db, since=last_refresh - self.WATERMARK_MARGIN)
+            rows = {
+                key: measures
+                for key, measures in self._aggregate(
+                    db, _start_of(min(days)), _start_of(max(days) + timedelta(days=1))
+                ).items()
+                if key[0] in days
+            }
+            db.execute(
+                delete(DailyPropertyRollup).where(DailyPropertyRollup.day.in_(days))
+            )
+
+        if rows:
+            db.execute(
+                insert(DailyPropertyRollup),
+                [
+                    {
+                        "day": day,
+                        "city": city,
+                        "property_type": property_type,
+                        "status": status,
+                        **measures,
+                        "refreshed_at": refreshed_at,
+                    }
+                    for (day, city, property_type, status), measures in rows.items()
+                ],
+            )
+        db.commit()
+        return len({key[0] for key in rows}) if days is None else len(days)
+
+
+daily_rollup = CRUDDailyRollup()
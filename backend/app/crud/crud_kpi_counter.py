@@ -0,0 +1,171 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import delete, func, insert, literal, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.kpi_counter import KPICounter
+from app.models.property import Property, PropertyStatus
+
+# (scope, key, estimated_value) a property contributes one count to
+Contribution = tuple[str, str, float]
+
+STATUS = "status"
+SUBMITTED_DAY = "submitted_day"
+VALUED_DAY = "valued_day"
+VALUER = "valuer"
+
+
+def _day(value: datetime) -> str:
+    return value.date().isoformat()
+
+
+class CRUDKPICounter:
+    """
+    Dashboard counters kept in step with property state changes.
+
+    Callers snapshot a property before changing it and call record_change
+    before committing, so counter deltas land in the same transaction as
+    the change itself. rebuild recomputes every counter from the base
+    tables.
+    """
+
+    def snapshot(self, property_obj: Property | None) -> list[Contribution]:
+        """Counters the property currently contributes to."""
+        if property_obj is None:
+            return []
+        status = property_obj.status or PropertyStatus.DRAFT
+        value = property_obj.estimated_value or 0.0
+        contributions = [(STATUS, status.value, value)]
+        if property_obj.submitted_at is not None:
+            contributions.append((SUBMITTED_DAY, _day(property_obj.submitted_at), 0.0))
+        if status == PropertyStatus.VALUED and property_obj.reviewed_at is not None:
+            contributions.append((VALUED_DAY, _day(property_obj.reviewed_at), value))
+        if property_obj.valuer_id is not None:
+            contributions.append((VALUER, str(property_obj.valuer_id), value))
+        return contributions
+
+    def record_change(
+        self,
+        db: Session,
+        before: list[Contribution],
+        property_obj: Property | None,
+    ) -> None:
+        """
+        Apply the difference between a snapshot and the property's current
+        state. Pass property_obj=None when the property is being deleted.
+        """
+        deltas: dict[tuple[str, str], list[float]] = defaultdict(lambda: [0, 0.0])
+        for scope, key, value in before:
+            deltas[(scope, key)][0] -= 1
+            deltas[(scope, key)][1] -= value
+        for scope, key, value in self.snapshot(property_obj):
+            deltas[(scope, key)][0] += 1
+            deltas[(scope, key)][1] += value
+
+        rows = [
+            {"scope": scope, "key": key, "count": count, "value_sum": value_sum}
+            for (scope, key), (count, value_sum) in deltas.items()
+            if count or value_sum
+        ]
+        if not rows:
+            return
+
+        # Atomic increments, so concurrent transitions never lose updates
+        stmt: postgresql.Insert | sqlite.Insert
+        if db.get_bind().dialect.name == "postgresql":
+            stmt = postgresql.insert(KPICounter)
+        else:
+            stmt = sqlite.insert(KPICounter)
+        stmt = stmt.values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[KPICounter.scope, KPICounter.key],
+            set_={
+                "count": KPICounter.count + stmt.excluded.count,
+                "value_sum": KPICounter.value_sum + stmt.excluded.value_sum,
+                "updated_at": func.now(),
+            },
+        )
+        db.execute(stmt)
+
+    def get_scopes(
+        self, db: Session, *, since_day: str | None = None
+    ) -> dict[str, dict[str, dict[str, Any]]]:
+        """All counters grouped by scope; day scopes start at since_day."""
+        query = select(KPICounter)
+        if since_day is not None:
+            query = query.where(
+                KPICounter.scope.notin_([SUBMITTED_DAY, VALUED_DAY])
+                | (KPICounter.key >= since_day)
+            )
+        scopes: dict[str, dict[str, dict[str, Any]]] = defaultdict(dict)
+        for counter in db.scalars(query):
+            scopes[counter.scope][counter.key] = {
+                "count": counter.count,
+                "value_sum": counter.value_sum,
+            }
+        return scopes
+
+    def rebuild(self, db: Session) -> int:
+        """Recompute every counter from property and commit."""
+        if db.get_bind().dialect.name == "postgresql":
+            # Transitions wait until the rebuilt counters are committed
+            db.execute(text("LOCK TABLE kpicounter IN SHARE ROW EXCLUSIVE MODE"))
+        value = func.coalesce(func.sum(Property.estimated_value), 0.0)
+        submitted_day = func.date(Property.submitted_at)
+        reviewed_day = func.date(Property.reviewed_at)
+        sources = [
+            (
+                STATUS,
+                select(Property.status, func.count(), value).group_by(Property.status),
+            ),
+            (
+                SUBMITTED_DAY,
+                select(submitted_day, func.count(), literal(0.0))
+                .where(Property.submitted_at.isnot(None))
+                .group_by(submitted_day),
+            ),
+            (
+                VALUED_DAY,
+                select(reviewed_day, func.count(), value)
+                .where(
+                    Property.status == PropertyStatus.VALUED,
+                    Property.reviewed_at.isnot(None),
+                )
+                .group_by(reviewed_day),
+            ),
+            (
+                VALUER,
+                select(Property.valuer_id, func.count(), value)
+                .where(Property.valuer_id.isnot(None))
+                .group_by(Property.valuer_id),
+            ),
+        ]
+
+        rows = []
+        for scope, query in sources:
+            for key, count, value_sum in db.execute(query):
+                if isinstance(key, PropertyStatus):
+                    key = key.value
+                elif not isinstance(key, str):
+                    # Dates from PostgreSQL, UUIDs from the GUID type
+                    key = key.isoformat() if hasattr(key, "isoformat") else str(key)
+                rows.append(
+                    {
+                        "scope": scope,
+                        "key": key,
+                        "count": count,
+                        "value_sum": float(value_sum),
+                    }
+                )
+
+        db.execute(delete(KPICounter))
+        if rows:
+            db.execute(insert(KPICounter), rows)
+        db.commit()
+        return len(rows)
+
+
+kpi_counter = CRUDKPICounter()
@@ -1,10 +1,21 @@
 import uuid
+from typing import Any
 
+from sqlalchemy import case, literal, or_, update
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.crud.base import CRUDBase
 from app.models.photo import PropertyPhoto
 from app.schemas.photo import PropertyPhotoCreate, PropertyPhotoUpdate
+from app.services.image_service import ImageService
+
+HASH_BAND_COLUMNS = [
+    PropertyPhoto.phash_band_0,
+    PropertyPhoto.phash_band_1,
+    PropertyPhoto.phash_band_2,
+    PropertyPhoto.phash_band_3,
+]
 
 
 class CRUDPhoto(CRUDBase[PropertyPhoto, PropertyPhotoCreate, PropertyPhotoUpdate]):
@@ -27,5 +38,89 @@ class CRUDPhoto(CRUDBase[PropertyPhoto, PropertyPhotoCreate, PropertyPhotoUpdate
         db.refresh(db_obj)
         return db_obj
 
+    def update_many(self, db: Session, *, updates: list[dict[str, Any]]) -> None:
+        """
+        Apply per-photo field updates in one bulk UPDATE keyed by primary key.
+        Each dict must contain "id" plus the columns to set.
+        """
+        if not updates:
+            return
+        db.execute(update(self.model), updates)
+        db.commit()
+
+    def storage_keys(self, db: Session, *, db_obj: PropertyPhoto) -> list[str]:
+        """
+        Storage objects only this photo uses: the original upload and every
+        rendition not shared with its near-duplicate original or copies,
+        which reuse each other's renditions.
+        """
+        linked = [PropertyPhoto.duplicate_of_id == db_obj.id]
+        if db_obj.duplicate_of_id is not None:
+            linked.append(PropertyPhoto.id == db_obj.duplicate_of_id)
+        shared = {
+            rendition["key"]
+            for other in db.query(self.model).filter(or_(*linked))
+            for rendition in (other.renditions or {}).values()
+        }
+        return [db_obj.s3_key] + [
+            rendition["key"]
+            for rendition in (db_obj.renditions or {}).values()
+            if rendition["key"] not in shared
+        ]
+
+    @staticmethod
+    def hash_fields(phash: int | None) -> dict[str, int | None]:
+        """Column values storing a perceptual hash and its lookup bands."""
+        if phash is None:
+            return {"phash": None, **{column.key: None for column in HASH_BAND_COLUMNS}}
+        # BIGINT is signed; keep the same 64-bit pattern
+        signed = phash - (1 << 64) if phash >= 1 << 63 else phash
+        fields: dict[str, int | None] = {"phash": signed}
+        for column, band in zip(
+            HASH_BAND_COLUMNS, ImageService.hash_bands(phash), strict=True
+        ):
+            fields[column.key] = band
+        return fields
+
+    def find_duplicate(
+        self,
+        db: Session,
+        *,
+        phash: int,
+        max_distance: int,
+        exclude_ids: list[uuid.UUID] | None = None,
+    ) -> PropertyPhoto | None:
+        """
+        Closest original photo within max_distance bits of the hash.
+        Candidates are narrowed with indexed band equality, so only
+        photos sharing a 16-bit band are compared bit by bit, at most
+        PHOTO_DUPLICATE_MAX_CANDIDATES of them. Those sharing the most bands
+        go first: a close match usually shares several, while flat or dark
+        images often share one by chance.
+        """
+        bands = ImageService.hash_bands(phash)
+        matches = [
+            column == band
+            for column, band in zip(HASH_BAND_COLUMNS, bands, strict=True)
+        ]
+        query = db.query(self.model).filter(
+            or_(*matches), PropertyPhoto.duplicate_of_id.is_(None)
+        )
+        if exclude_ids:
+            query = query.filter(PropertyPhoto.id.notin_(exclude_ids))
+
+        best: tuple[int, PropertyPhoto] | None = None
+        shared_bands = sum((case((match, 1), else_=0) for match in matches), literal(0))
+        candidates = query.order_by(
+            shared_bands.desc(), PropertyPhoto.created_at
+        ).limit(settings.PHOTO_DUPLICATE_MAX_CANDIDATES)
+        for candidate in candidates:
+            if candidate.phash is None:
+                continue
+            distance = ImageService.hamming_distance(phash, candidate.phash)
+            if distance <= max_distance and (best is None or distance < best[0]):
+                best = (distance, candidate)
+        return best[1] if best else None
+
 
 photo = CRUDPhoto(PropertyPhoto)
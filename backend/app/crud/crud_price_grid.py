@@ -0,0 +1,193 @@
+import functools
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.comp import Comparable
+from app.models.price_grid import PricePerSqftCell
+from app.utils.geo import geohash, geohash_codes, geohash_string
+
+DAYS_PER_MONTH = 30.4375
+
+
+def geohash_cell(lat: float, lng: float, precision: int) -> str:
+    return f"gh{precision}:{geohash(lat, lng, precision)}"
+
+
+def geohash_code_cell(precision: int, code: Any) -> str:
+    """geohash_cell() of a geohash_codes() value."""
+    return f"gh{precision}:{geohash_string(int(code), precision)}"
+
+
+def pincode_cell(pincode: str) -> str:
+    return f"pin:{pincode}"
+
+
+def months_since(moment: datetime, now: datetime) -> float:
+    # SQLite hands timestamps back naive
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=UTC)
+    # Sales dated ahead of now (clock skew, bad imports) count as today's
+    return max(0.0, (now - moment).total_seconds() / 86400 / DAYS_PER_MONTH)
+
+
+class CRUDPriceGrid:
+    """
+    Maintains PricePerSqftCell from recent comparable sales.
+
+    Every comparable sold within PRICE_GRID_LOOKBACK_DAYS counts towards its
+    geohash cells at GEOHASH_PRECISIONS and its pincode. Cells with fewer
+    than PRICE_GRID_MIN_COMPS sales are left out, so lookups fall back to
+    the next coarser cell.
+    """
+
+    # ~1.2 km and ~5 km cells
+    GEOHASH_PRECISIONS = (6, 5)
+    # Trends from small cells are shrunk towards flat by n / (n + this)
+    TREND_PRIOR_COMPS = 20
+    # Cap on the monthly log price change, either way
+    MAX_MONTHLY_TREND = 0.03
+    READ_BATCH_SIZE = 10_000
+    WRITE_BATCH_SIZE = 5_000
+
+    def get_cells(self, db: Session, cells: list[str]) -> dict[str, PricePerSqftCell]:
+        rows = db.scalars(
+            select(PricePerSqftCell).where(PricePerSqftCell.cell.in_(cells))
+        )
+        return {row.cell: row for row in rows}
+
+    def _load_sales(
+        self, db: Session, now: datetime
+    ) -> tuple[NDArray[np.float64], ...] | None:
+        """Columns of the lookback window's sales as arrays, streamed in batches."""
+        query = (
+            select(
+                Comparable.lat,
+                Comparable.lng,
+                Comparable.pincode,
+                Comparable.area_sqft,
+                Comparable.sale_price,
+                Comparable.sale_date,
+            )
+            .where(
+                Comparable.sale_date
+                >= now - timedelta(days=settings.PRICE_GRID_LOOKBACK_DAYS),
+                Comparable.area_sqft > 0,
+                Comparable.sale_price > 0,
+            )
+            .execution_options(yield_per=self.READ_BATCH_SIZE)
+        )
+        lats, lngs, pincodes, areas, prices, months = [], [], [], [], [], []
+        for batch in db.execute(query).partitions():
+            for lat, lng, pincode, area, price, sold in batch:
+                lats.append(np.nan if lat is None else lat)
+                lngs.append(np.nan if lng is None else lng)
+                pincodes.append(pincode)
+                areas.append(area)
+                prices.append(price)
+                months.append(months_since(sold, now))
+        if not prices:
+            return None
+        return (
+            np.asarray(lats, dtype=np.float64),
+            np.asarray(lngs, dtype=np.float64),
+            np.asarray(pincodes, dtype=object),
+            np.log(np.asarray(prices) / np.asarray(areas)),
+            np.asarray(months),
+        )
+
+    def _cell_rows(
+        self,
+        cell_name: Callable[[Any], str],
+        keys: NDArray[Any],
+        log_ppsf: NDArray[np.float64],
+        months: NDArray[np.float64],
+    ) -> list[dict[str, Any]]:
+        """Quartiles and trend of log_ppsf per cell, grouped by keys."""
+        if not len(keys):
+            return []
+        groups, inverse = np.unique(keys, return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(groups))
+
+        # Least squares slope of log price on time, per cell
+        time = -months
+        mean_t = np.bincount(inverse, time) / counts
+        mean_y = np.bincount(inverse, log_ppsf) / counts
+        dt = time - mean_t[inverse]
+        var_t = np.bincount(inverse, dt * dt)
+        cov = np.bincount(inverse, dt * (log_ppsf - mean_y[inverse]))
+        slope = np.divide(cov, var_t, out=np.zeros_like(cov), where=var_t > 1e-9)
+        slope *= counts / (counts + self.TREND_PRIOR_COMPS)
+        slope = np.clip(slope, -self.MAX_MONTHLY_TREND, self.MAX_MONTHLY_TREND)
+        # Older sales brought forward along the trend to today's prices
+        current = log_ppsf + slope[inverse] * months
+
+        # Sorted by cell then price: each cell's prices are one sorted run
+        order = np.lexsort((current, inverse))
+        sorted_ppsf = current[order]
+        starts = np.concatenate((np.zeros(1, dtype=np.int64), np.cumsum(counts)[:-1]))
+
+        def quantile(q: float) -> NDArray[np.float64]:
+            position = starts + q * (counts - 1)
+            low = np.floor(position).astype(np.int64)
+            high = np.minimum(low + 1, starts + counts - 1)
+            fraction = position - low
+            values: NDArray[np.float64] = np.exp(
+                sorted_ppsf[low] * (1 - fraction) + sorted_ppsf[high] * fraction
+            )
+            return values
+
+        trend = np.expm1(slope)
+        p25, median, p75 = quantile(0.25), quantile(0.5), quantile(0.75)
+        return [
+            {
+                "cell": cell_name(group),
+                "comp_count": int(counts[i]),
+                "ppsf_p25": float(p25[i]),
+                "ppsf_median": float(median[i]),
+                "ppsf_p75": float(p75[i]),
+                "monthly_trend": float(trend[i]),
+            }
+            for i, group in enumerate(groups)
+            if counts[i] >= settings.PRICE_GRID_MIN_COMPS
+        ]
+
+    def refresh(self, db: Session) -> int:
+        """Rebuild every cell and commit. Returns the number of cells."""
+        refreshed_at = datetime.now(UTC)
+        sales = self._load_sales(db, refreshed_at)
+
+        rows: list[dict[str, Any]] = []
+        if sales is not None:
+            lats, lngs, pincodes, log_ppsf, months = sales
+            rows += self._cell_rows(pincode_cell, pincodes, log_ppsf, months)
+            located = ~(np.isnan(lats) | np.isnan(lngs))
+            for precision in self.GEOHASH_PRECISIONS:
+                codes = geohash_codes(lats[located], lngs[located], precision)
+                rows += self._cell_rows(
+                    functools.partial(geohash_code_cell, precision),
+                    codes,
+                    log_ppsf[located],
+                    months[located],
+                )
+
+        db.execute(delete(PricePerSqftCell))
+        for start in range(0, len(rows), self.WRITE_BATCH_SIZE):
+            db.execute(
+                insert(PricePerSqftCell),
+                [
+                    {**row, "refreshed_at": refreshed_at}
+                    for row in rows[start : start + self.WRITE_BATCH_SIZE]
+                ],
+            )
+        db.commit()
+        return len(rows)
+
+
+price_grid = CRUDPriceGrid()
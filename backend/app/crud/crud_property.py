@@ -1,30 +1,88 @@
 import uuid
+from collections.abc import Sequence
 from datetime import UTC, datetime
+from typing import Any
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload, undefer
+from sqlalchemy.orm.interfaces import ORMOption
 
+from app.core.exceptions import NotFoundError
 from app.crud.base import CRUDBase
+from app.crud.crud_kpi_counter import kpi_counter
 from app.models.property import Property, PropertyStatus
 from app.schemas.property import PropertyCreate, PropertyUpdate
 
 
 class CRUDProperty(CRUDBase[Property, PropertyCreate, PropertyUpdate]):
+    # Loader options for the endpoints: photos in one extra query for
+    # serialized lists, or only their count where nothing else is needed
+    WITH_PHOTOS: tuple[ORMOption, ...] = (selectinload(Property.photos),)
+    WITH_PHOTO_COUNT: tuple[ORMOption, ...] = (undefer(Property.photo_count),)
+    # Columns of schemas.PropertySummary
+    SUMMARY_COLUMNS = (
+        Property.id,
+        Property.property_type,
+        Property.address,
+        Property.city,
+        Property.state,
+        Property.area_sqft,
+        Property.status,
+        Property.estimated_value,
+        Property.submitted_at,
+        Property.created_at,
+    )
+
     def get_multi_by_owner(
-        self, db: Session, *, user_id: uuid.UUID, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        *,
+        user_id: uuid.UUID,
+        cursor: str | None = None,
+        skip: int = 0,
+        limit: int = 100,
+        options: Sequence[ORMOption] = (),
     ) -> list[Property]:
-        return (
-            db.query(self.model)
-            .filter(Property.user_id == user_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+        return self.paginate(
+            db.query(self.model).options(*options).filter(Property.user_id == user_id),
+            cursor=cursor,
+            skip=skip,
+            limit=limit,
         )
 
+    def get_summaries(
+        self,
+        db: Session,
+        *,
+        user_id: uuid.UUID | None = None,
+        cursor: str | None = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> list[dict[str, Any]]:
+        """
+        One page of SUMMARY_COLUMNS as plain dicts, optionally for one owner.
+        Rows never become ORM objects, so there is no identity map or
+        attribute instrumentation to pay for on large pages.
+        """
+        query = select(*self.SUMMARY_COLUMNS)
+        if user_id is not None:
+            query = query.where(Property.user_id == user_id)
+        page = self.page_query(query, cursor=cursor, skip=skip, limit=limit)
+        return [dict(row) for row in db.execute(page).mappings()]
+
     def get_pending_review(
-        self, db: Session, *, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        *,
+        cursor: str | None = None,
+        skip: int = 0,
+        limit: int = 100,
+        options: Sequence[ORMOption] = (),
     ) -> list[Property]:
         # For demo: return all properties regardless of status
-        return db.query(self.model).offset(skip).limit(limit).all()
+        return self.get_multi(
+            db, cursor=cursor, skip=skip, limit=limit, options=options
+        )
 
     def create_with_owner(
         self, db: Session, *, obj_in: PropertyCreate, user_id: uuid.UUID
@@ -32,14 +90,47 @@ class CRUDProperty(CRUDBase[Property, PropertyCreate, PropertyUpdate]):
         obj_in_data = obj_in.model_dump()
         db_obj = self.model(**obj_in_data, user_id=user_id)
         db.add(db_obj)
+        kpi_counter.record_change(db, [], db_obj)
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: Property,
+        obj_in: PropertyUpdate | dict[str, Any],
+    ) -> Property:
+        before = kpi_counter.snapshot(db_obj)
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+        for field, value in update_data.items():
+            if hasattr(db_obj, field):
+                setattr(db_obj, field, value)
+        db.add(db_obj)
+        kpi_counter.record_change(db, before, db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def remove(self, db: Session, *, id: uuid.UUID) -> Property:
+        obj = db.get(self.model, id)
+        if obj is None:
+            raise NotFoundError(detail=f"{self.model.__name__} not found")
+        kpi_counter.record_change(db, kpi_counter.snapshot(obj), None)
+        db.delete(obj)
+        db.commit()
+        return obj
+
     def submit(self, db: Session, *, db_obj: Property) -> Property:
+        before = kpi_counter.snapshot(db_obj)
         db_obj.status = PropertyStatus.SUBMITTED
         db_obj.submitted_at = datetime.now(UTC)
         db.add(db_obj)
+        kpi_counter.record_change(db, before, db_obj)
         db.commit()
         db.refresh(db_obj)
         return db_obj
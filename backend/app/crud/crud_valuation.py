@@ -3,6 +3,7 @@ import uuid
 from sqlalchemy.orm import Session
 
 from app.crud.base import CRUDBase
+from app.crud.crud_kpi_counter import kpi_counter
 from app.models.property import Property, PropertyStatus
 from app.models.valuation import Valuation
 from app.schemas.valuation import ValuationCreate, ValuationUpdate
@@ -24,37 +25,48 @@ class CRUDValuation(CRUDBase[Valuation, ValuationCreate, ValuationUpdate]):
             db.query(Property).filter(Property.id == obj_in.property_id).first()
         )
         if property_obj:
+            before = kpi_counter.snapshot(property_obj)
             property_obj.status = PropertyStatus.VALUED
             property_obj.estimated_value = obj_in.estimated_value
             property_obj.valuer_id = valuer_id
             property_obj.reviewed_at = obj_in.valuation_date
             db.add(property_obj)
+            kpi_counter.record_change(db, before, property_obj)
 
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
     def get_by_valuer(
-        self, db: Session, *, valuer_id: uuid.UUID, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        *,
+        valuer_id: uuid.UUID,
+        cursor: str | None = None,
+        skip: int = 0,
+        limit: int = 100,
     ) -> list[Valuation]:
-        return (
-            db.query(self.model)
-            .filter(Valuation.valuer_id == valuer_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+        return self.paginate(
+            db.query(self.model).filter(Valuation.valuer_id == valuer_id),
+            cursor=cursor,
+            skip=skip,
+            limit=limit,
         )
 
     def get_by_owner(
-        self, db: Session, *, user_id: uuid.UUID, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        *,
+        user_id: uuid.UUID,
+        cursor: str | None = None,
+        skip: int = 0,
+        limit: int = 100,
     ) -> list[Valuation]:
-        return (
-            db.query(self.model)
-            .join(Property)
-            .filter(Property.user_id == user_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+        return self.paginate(
+            db.query(self.model).join(Property).filter(Property.user_id == user_id),
+            cursor=cursor,
+            skip=skip,
+            limit=limit,
         )
 
 
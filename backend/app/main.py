@@ -13,6 +13,8 @@ from app.core.exceptions import register_exception_handlers
 from app.core.logging import LoggingMiddleware
 from app.core.redis import redis_client
 from app.database import engine
+from app.services.geocoding_service import geocoding_service
+from app.services.telemetry_service import telemetry_service
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +23,9 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
 )
 register_exception_handlers(app)
+# Write out buffered client telemetry before the process exits
+app.add_event_handler("shutdown", telemetry_service.close)
+app.add_event_handler("shutdown", geocoding_service.aclose)
 
 
 @app.middleware("http")
@@ -60,6 +65,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
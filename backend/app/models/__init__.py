@@ -1,7 +1,11 @@
 from app.models.audit_log import AuditLog
 from app.models.comp import Comparable
+from app.models.daily_rollup import DailyPropertyRollup
+from app.models.kpi_counter import KPICounter
 from app.models.photo import PhotoType, PropertyPhoto, QCStatus
+from app.models.price_grid import PricePerSqftCell
 from app.models.property import Property, PropertyStatus, PropertyType
+from app.models.telemetry_event import TelemetryEvent
 from app.models.user import User, UserRole
 from app.models.valuation import Valuation
 
@@ -17,4 +21,8 @@ __all__ = [
     "Valuation",
     "Comparable",
     "AuditLog",
+    "KPICounter",
+    "DailyPropertyRollup",
+    "TelemetryEvent",
+    "PricePerSqftCell",
 ]
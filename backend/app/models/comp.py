@@ -1,16 +1,21 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, String, func
+from sqlalchemy import DateTime, Float, Index, String, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import GUID, Base
 
 
 class Comparable(Base):
-    id: Mapped[uuid.UUID] = mapped_column(
-        GUID(), primary_key=True, default=uuid.uuid4
+    __table_args__ = (
+        # Keyset pages of the list endpoint
+        Index("ix_comparable_created_at_id", "created_at", "id"),
+        # A sale's natural key, upserted on by bulk imports
+        Index("ix_comparable_address_sale_date", "address", "sale_date", unique=True),
     )
+
+    id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
     address: Mapped[str] = mapped_column(String, nullable=False)
     city: Mapped[str] = mapped_column(String, nullable=False)
     state: Mapped[str] = mapped_column(String, nullable=False)
@@ -19,9 +24,7 @@ class Comparable(Base):
     lng: Mapped[float | None] = mapped_column(Float, nullable=True)
     area_sqft: Mapped[float] = mapped_column(Float, nullable=False)
     sale_price: Mapped[float] = mapped_column(Float, nullable=False)
-    sale_date: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False
-    )
+    sale_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     distance_km: Mapped[float | None] = mapped_column(Float, nullable=True)
     source_url: Mapped[str | None] = mapped_column(String, nullable=True)
     description: Mapped[str | None] = mapped_column(String, nullable=True)
@@ -32,3 +35,18 @@ class Comparable(Base):
     updated_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True), onupdate=func.now()
     )
+
+
+# Nearest-comparable search: a GiST index on PostgreSQL, serving both
+# bounding box filters and KNN ordering, and elsewhere a B-tree that
+# covers the candidate scan
+Index(
+    "ix_comparable_location",
+    func.point(Comparable.lng, Comparable.lat),
+    postgresql_using="gist",
+).ddl_if(dialect="postgresql")
+Index("ix_comparable_lat_lng", Comparable.lat, Comparable.lng, Comparable.id).ddl_if(
+    callable_=lambda ddl, target, bind, tables=None, state=None, *, dialect, **kw: (
+        dialect.name != "postgresql"
+    )
+)
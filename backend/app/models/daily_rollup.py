@@ -0,0 +1,37 @@
+from datetime import date, datetime
+
+from sqlalchemy import BigInteger, Date, DateTime, Enum, Float, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+from app.models.property import PropertyStatus, PropertyType
+
+
+class DailyPropertyRollup(Base):
+    """
+    Per-day property activity by city, type and current status.
+    Each measure is attributed to the day its own event happened: created
+    counts to created_at, submitted to submitted_at, reviewed to reviewed_at.
+    """
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    city: Mapped[str] = mapped_column(String, primary_key=True)
+    property_type: Mapped[PropertyType] = mapped_column(
+        Enum(PropertyType), primary_key=True
+    )
+    status: Mapped[PropertyStatus] = mapped_column(
+        Enum(PropertyStatus), primary_key=True
+    )
+    created_count: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    located_count: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    photographed_count: Mapped[int] = mapped_column(
+        BigInteger, default=0, nullable=False
+    )
+    submitted_count: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    reviewed_count: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    reviewed_value_sum: Mapped[float] = mapped_column(
+        Float, default=0.0, nullable=False
+    )
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
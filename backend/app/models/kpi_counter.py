@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Float, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class KPICounter(Base):
+    """Running count and estimated_value sum for one dashboard dimension."""
+
+    scope: Mapped[str] = mapped_column(
+        String, primary_key=True
+    )  # e.g., 'status', 'submitted_day', 'valued_day', 'valuer'
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    value_sum: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    updated_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
@@ -1,9 +1,22 @@
 import enum
 import uuid
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import DateTime, Enum, Float, ForeignKey, Integer, String, Text, func
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Boolean,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import GUID, Base
@@ -26,6 +39,13 @@ class QCStatus(str, enum.Enum):
 
 
 class PropertyPhoto(Base):
+    __table_args__ = (
+        # A property's photos and their QC state
+        Index("ix_propertyphoto_property_id_qc_status", "property_id", "qc_status"),
+        # Exports walk all photos in (created_at, id) order
+        Index("ix_propertyphoto_created_at_id", "created_at", "id"),
+    )
+
     id: Mapped[uuid.UUID] = mapped_column(
         GUID(), primary_key=True, default=uuid.uuid4
     )
@@ -48,6 +68,20 @@ class PropertyPhoto(Base):
         Enum(QCStatus), default=QCStatus.PENDING, nullable=False
     )
     qc_notes: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Rendition name -> key, url, format, width, height and size_bytes
+    renditions: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
+    # 64-bit dHash (stored signed) and its 16-bit bands for Hamming lookup
+    phash: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    phash_band_0: Mapped[int | None] = mapped_column(Integer, index=True)
+    phash_band_1: Mapped[int | None] = mapped_column(Integer, index=True)
+    phash_band_2: Mapped[int | None] = mapped_column(Integer, index=True)
+    phash_band_3: Mapped[int | None] = mapped_column(Integer, index=True)
+    duplicate_of_id: Mapped[uuid.UUID | None] = mapped_column(
+        GUID(), ForeignKey("propertyphoto.id", ondelete="SET NULL"), nullable=True
+    )
+    flagged_for_review: Mapped[bool] = mapped_column(
+        Boolean, default=False, nullable=False
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
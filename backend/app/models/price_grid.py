@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Float, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class PricePerSqftCell(Base):
+    """
+    Comparable sale prices per sqft in one area: a geohash cell
+    ("gh6:te7ud2", "gh5:te7ud") or a pincode ("pin:400001"). Rebuilt
+    nightly from recent comparable sales, with older sales brought forward
+    along the cell's trend to prices as of refreshed_at.
+    """
+
+    cell: Mapped[str] = mapped_column(String, primary_key=True)
+    comp_count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    ppsf_p25: Mapped[float] = mapped_column(Float, nullable=False)
+    ppsf_median: Mapped[float] = mapped_column(Float, nullable=False)
+    ppsf_p75: Mapped[float] = mapped_column(Float, nullable=False)
+    # Fractional change in price per sqft per month
+    monthly_trend: Mapped[float] = mapped_column(Float, nullable=False)
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
@@ -1,15 +1,28 @@
 import enum
 import uuid
 from datetime import datetime
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
-from sqlalchemy import DateTime, Enum, Float, ForeignKey, Integer, String, Text, func
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import (
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+    select,
+    text,
+)
+from sqlalchemy.orm import Mapped, column_property, mapped_column, relationship
 
 from app.database import GUID, Base
 
+from .photo import PropertyPhoto
+
 if TYPE_CHECKING:
-    from .photo import PropertyPhoto
     from .user import User
 
 
@@ -31,7 +44,45 @@ class PropertyType(str, enum.Enum):
     LAND = "LAND"
 
 
+def _partial(condition: str) -> dict[str, Any]:
+    return {
+        "postgresql_where": text(condition),
+        "sqlite_where": text(condition),
+    }
+
+
 class Property(Base):
+    __table_args__ = (
+        # Owner's property list, in keyset page order
+        Index("ix_property_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Valuer queue and its age buckets
+        Index(
+            "ix_property_submitted_queue",
+            "status",
+            "submitted_at",
+            **_partial("status = 'SUBMITTED'"),
+        ),
+        # Stale draft cleanup
+        Index(
+            "ix_property_draft_created_at", "created_at", **_partial("status = 'DRAFT'")
+        ),
+        # Keyset pages, and date-range scans of the daily rollup and analytics
+        Index("ix_property_created_at_id", "created_at", "id"),
+        Index(
+            "ix_property_submitted_at",
+            "submitted_at",
+            **_partial("submitted_at IS NOT NULL"),
+        ),
+        Index(
+            "ix_property_reviewed_at",
+            "reviewed_at",
+            **_partial("reviewed_at IS NOT NULL"),
+        ),
+        Index(
+            "ix_property_valuer_id", "valuer_id", **_partial("valuer_id IS NOT NULL")
+        ),
+    )
+
     id: Mapped[uuid.UUID] = mapped_column(
         GUID(), primary_key=True, default=uuid.uuid4
     )
@@ -74,8 +125,9 @@ class Property(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
+    # Indexed so the daily rollup refresh can find recently changed rows
     updated_at: Mapped[datetime | None] = mapped_column(
-        DateTime(timezone=True), onupdate=func.now()
+        DateTime(timezone=True), onupdate=func.now(), index=True
     )
 
     owner: Mapped["User"] = relationship("User", foreign_keys=[user_id])
@@ -83,3 +135,11 @@ class Property(Base):
     photos: Mapped[list["PropertyPhoto"]] = relationship(
         "PropertyPhoto", back_populates="property", cascade="all, delete-orphan"
     )
+    # Deferred; undefer it where photos are only counted, not loaded
+    photo_count: Mapped[int] = column_property(
+        select(func.count(PropertyPhoto.id))
+        .where(PropertyPhoto.property_id == id)
+        .correlate_except(PropertyPhoto)
+        .scalar_subquery(),
+        deferred=True,
+    )
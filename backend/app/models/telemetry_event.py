@@ -0,0 +1,35 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import GUID, Base
+
+
+class TelemetryEvent(Base):
+    """
+    Client screen event. Append-only; on PostgreSQL the table is
+    range-partitioned by month on occurred_at.
+    """
+
+    __table_args__ = (
+        # Drop-off analysis streams each session's events in order
+        Index("ix_telemetryevent_session_id_occurred_at", "session_id", "occurred_at"),
+        {"postgresql_partition_by": "RANGE (occurred_at)"},
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
+    # Partitioned tables need the partition key in the primary key
+    occurred_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True
+    )
+    session_id: Mapped[str] = mapped_column(String, nullable=False)
+    event_type: Mapped[str] = mapped_column(
+        String, nullable=False
+    )  # 'screen_view', 'screen_exit' or 'complete'
+    screen: Mapped[str] = mapped_column(String, nullable=False)
+    user_id: Mapped[uuid.UUID | None] = mapped_column(GUID(), nullable=True)
+    received_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
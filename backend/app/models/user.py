@@ -2,7 +2,7 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, Enum, String, func
+from sqlalchemy import Boolean, DateTime, Enum, Index, String, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import GUID, Base
@@ -15,6 +15,9 @@ class UserRole(str, enum.Enum):
 
 
 class User(Base):
+    # Keyset pages of the list endpoint
+    __table_args__ = (Index("ix_user_created_at_id", "created_at", "id"),)
+
     id: Mapped[uuid.UUID] = mapped_column(
         GUID(), primary_key=True, default=uuid.uuid4
     )
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import DateTime, Float, ForeignKey, String, Text, func
+from sqlalchemy import DateTime, Float, ForeignKey, Index, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import GUID, Base
@@ -14,11 +14,17 @@ if TYPE_CHECKING:
 
 
 class Valuation(Base):
+    __table_args__ = (
+        # Keyset pages, overall and per valuer
+        Index("ix_valuation_created_at_id", "created_at", "id"),
+        Index("ix_valuation_valuer_id_created_at_id", "valuer_id", "created_at", "id"),
+    )
+
     id: Mapped[uuid.UUID] = mapped_column(
         GUID(), primary_key=True, default=uuid.uuid4
     )
     property_id: Mapped[uuid.UUID] = mapped_column(
-        GUID(), ForeignKey("property.id"), nullable=False
+        GUID(), ForeignKey("property.id"), nullable=False, index=True
     )
     valuer_id: Mapped[uuid.UUID] = mapped_column(
         GUID(), ForeignKey("user.id"), nullable=False
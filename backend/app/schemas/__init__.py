@@ -5,12 +5,38 @@ from .auth import (
     RefreshRequest,
     TokenResponse,
 )
-from .comp import Comparable, ComparableCreate, ComparableUpdate
-from .photo import PropertyPhoto, PropertyPhotoCreate, PropertyPhotoUpdate
-from .property import Property, PropertyCreate, PropertyUpdate
+from .comp import (
+    Comparable,
+    ComparableCreate,
+    ComparableImportReject,
+    ComparableImportReport,
+    ComparableUpdate,
+    NearbyComparable,
+)
+from .photo import (
+    PhotoFinalizeItem,
+    PhotoFinalizeRequest,
+    PhotoFinalizeResult,
+    PhotoQCBatch,
+    PhotoRendition,
+    PhotoUploadFile,
+    PhotoUploadRequest,
+    PhotoUploadTicket,
+    PhotoUploadUrls,
+    PropertyPhoto,
+    PropertyPhotoCreate,
+    PropertyPhotoUpdate,
+)
+from .property import Property, PropertyCreate, PropertySummary, PropertyUpdate
+from .telemetry import TelemetryAccepted, TelemetryBatch, TelemetryEventIn
 from .token import Token, TokenPayload
 from .user import User, UserCreate, UserUpdate
-from .valuation import Valuation, ValuationCreate, ValuationUpdate
+from .valuation import (
+    Valuation,
+    ValuationCreate,
+    ValuationSuggestion,
+    ValuationUpdate,
+)
 
 __all__ = [
     "Token",
@@ -21,18 +47,35 @@ __all__ = [
     "Property",
     "PropertyCreate",
     "PropertyUpdate",
+    "PropertySummary",
     "PropertyPhoto",
+    "PhotoRendition",
+    "PhotoUploadFile",
+    "PhotoUploadRequest",
+    "PhotoUploadTicket",
+    "PhotoUploadUrls",
+    "PhotoFinalizeItem",
+    "PhotoFinalizeRequest",
+    "PhotoFinalizeResult",
     "PropertyPhotoCreate",
     "PropertyPhotoUpdate",
+    "PhotoQCBatch",
     "Comparable",
     "ComparableCreate",
     "ComparableUpdate",
+    "NearbyComparable",
+    "ComparableImportReject",
+    "ComparableImportReport",
     "Valuation",
     "ValuationCreate",
     "ValuationUpdate",
+    "ValuationSuggestion",
     "PhoneLoginRequest",
     "OTPVerifyRequest",
     "OTPVerifyResponse",
     "RefreshRequest",
     "TokenResponse",
+    "TelemetryEventIn",
+    "TelemetryBatch",
+    "TelemetryAccepted",
 ]
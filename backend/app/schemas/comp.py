@@ -43,3 +43,28 @@ class Comparable(ComparableBase):
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class NearbyComparable(Comparable):
+    """A comparable with its distance from the property searched around."""
+
+    distance_km: float
+
+
+class ComparableImportReject(BaseModel):
+    line: int
+    errors: list[str]
+
+
+class ComparableImportReport(BaseModel):
+    """
+    Outcome of a bulk import. rejects lists the first rejected rows only;
+    rejected counts them all.
+    """
+
+    rows: int
+    written: int
+    rejected: int
+    rejects: list[ComparableImportReject]
+    seconds: float
+    rows_per_second: float
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 from app.models.photo import PhotoType, QCStatus
 
@@ -28,6 +28,15 @@ class PropertyPhotoUpdate(BaseModel):
     qc_notes: str | None = None
 
 
+class PhotoRendition(BaseModel):
+    key: str
+    url: str
+    format: str
+    width: int
+    height: int
+    size_bytes: int
+
+
 class PropertyPhoto(PropertyPhotoBase):
     id: uuid.UUID
     property_id: uuid.UUID
@@ -35,6 +44,50 @@ class PropertyPhoto(PropertyPhotoBase):
     s3_url: str
     qc_status: QCStatus
     qc_notes: str | None = None
+    renditions: dict[str, PhotoRendition] | None = None
+    duplicate_of_id: uuid.UUID | None = None
+    flagged_for_review: bool = False
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class PhotoQCBatch(BaseModel):
+    property_id: uuid.UUID
+    task_id: str
+    photo_count: int
+
+
+class PhotoUploadFile(BaseModel):
+    filename: str
+    content_type: str
+
+
+class PhotoUploadRequest(BaseModel):
+    files: list[PhotoUploadFile] = Field(min_length=1)
+
+
+class PhotoUploadTicket(BaseModel):
+    key: str
+    url: str
+    content_type: str
+
+
+class PhotoUploadUrls(BaseModel):
+    uploads: list[PhotoUploadTicket]
+    expires_in: int
+
+
+class PhotoFinalizeItem(BaseModel):
+    key: str
+    photo_type: PhotoType = PhotoType.OTHER
+
+
+class PhotoFinalizeRequest(BaseModel):
+    photos: list[PhotoFinalizeItem] = Field(min_length=1)
+
+
+class PhotoFinalizeResult(BaseModel):
+    property_id: uuid.UUID
+    task_id: str
+    photos: list[PropertyPhoto]
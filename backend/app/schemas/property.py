@@ -60,3 +60,18 @@ class Property(PropertyBase):
     photos: list[PropertyPhoto] = []
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class PropertySummary(BaseModel):
+    """List row with just what dashboards show, see /properties/summary."""
+
+    id: uuid.UUID
+    property_type: PropertyType
+    address: str
+    city: str
+    state: str
+    area_sqft: float
+    status: PropertyStatus
+    estimated_value: float | None = None
+    submitted_at: datetime | None = None
+    created_at: datetime
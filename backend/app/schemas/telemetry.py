@@ -0,0 +1,38 @@
+from datetime import UTC, datetime, timedelta
+from typing import Literal
+
+from pydantic import BaseModel, Field, field_validator
+
+from app.core.config import settings
+
+
+class TelemetryEventIn(BaseModel):
+    session_id: str = Field(min_length=1, max_length=64)
+    event_type: Literal["screen_view", "screen_exit", "complete"]
+    screen: str = Field(min_length=1, max_length=64)
+    occurred_at: datetime
+
+    @field_validator("occurred_at")
+    @classmethod
+    def within_recent_window(cls, v: datetime) -> datetime:
+        # Events far off server time would land in the default partition
+        # and block the monthly partition for their range from being created
+        occurred_at = v.replace(tzinfo=UTC) if v.tzinfo is None else v
+        now = datetime.now(UTC)
+        if occurred_at < now - timedelta(days=settings.TELEMETRY_MAX_EVENT_AGE_DAYS):
+            raise ValueError("occurred_at is too far in the past")
+        if occurred_at > now + timedelta(
+            seconds=settings.TELEMETRY_MAX_CLOCK_AHEAD_SECONDS
+        ):
+            raise ValueError("occurred_at is in the future")
+        return v
+
+
+class TelemetryBatch(BaseModel):
+    events: list[TelemetryEventIn] = Field(
+        min_length=1, max_length=settings.TELEMETRY_MAX_BATCH_EVENTS
+    )
+
+
+class TelemetryAccepted(BaseModel):
+    accepted: int
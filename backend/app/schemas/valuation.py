@@ -3,7 +3,7 @@ from datetime import datetime
 
 from pydantic import BaseModel, ConfigDict
 
-from app.schemas.comp import Comparable
+from app.schemas.comp import Comparable, NearbyComparable
 
 
 class ValuationBase(BaseModel):
@@ -41,3 +41,21 @@ class Valuation(ValuationBase):
     comp3: Comparable | None = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ValuationSuggestion(BaseModel):
+    """
+    Engine-suggested value of a property. The heaviest three comparables
+    can be passed on as comp1_id..comp3_id when creating the valuation.
+    """
+
+    property_id: uuid.UUID
+    estimated_value: float
+    value_low: float
+    value_high: float
+    confidence_score: float
+    price_per_sqft: float
+    grid_cell: str | None = None
+    grid_comp_count: int = 0
+    grid_refreshed_at: datetime | None = None
+    comps: list[NearbyComparable] = []
@@ -3,292 +3,313 @@ PropFlow Analytics Service
 Tracks KPIs and business metrics
 """
 
-from datetime import datetime, timedelta
+from datetime import UTC, date, datetime, timedelta
 from typing import Any
 
-from sqlalchemy import and_, func
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.models.property import Property, PropertyStatus
+from app.core.config import settings
+from app.crud.crud_kpi_counter import (
+    STATUS,
+    SUBMITTED_DAY,
+    VALUED_DAY,
+    VALUER,
+    kpi_counter,
+)
+from app.models.daily_rollup import DailyPropertyRollup
+from app.models.photo import PropertyPhoto, QCStatus
+from app.models.property import Property, PropertyStatus, PropertyType
+from app.models.telemetry_event import TelemetryEvent
 from app.models.valuation import Valuation
+from app.services.telemetry_service import DropOffAggregator
 
 
 class AnalyticsService:
+    TREND_DAYS = 7
+    EVENT_BATCH_SIZE = 10_000
+
     def __init__(self, db: Session):
         self.db = db
 
-    def get_kpi_dashboard(self) -> dict[str, Any]:
-        return {
-            "submission_metrics": self._get_submission_metrics(),
-            "review_metrics": self._get_review_metrics(),
-            "valuation_metrics": self._get_valuation_metrics(),
-            "quality_metrics": self._get_quality_metrics(),
-            "trends": self._get_trends(),
-        }
-
-    def _get_submission_metrics(self) -> dict[str, Any]:
-        today = datetime.utcnow().date()
-        week_ago = today - timedelta(days=7)
-        month_ago = today - timedelta(days=30)
-
-        total_submissions = (
-            self.db.query(Property)
-            .filter(Property.status != PropertyStatus.DRAFT)
-            .count()
-        )
-
-        submissions_today = (
-            self.db.query(Property).filter(Property.submitted_at >= today).count()
-        )
+    def _seconds_between(self, end: Any, start: Any) -> Any:
+        """Portable SQL expression for the seconds between two timestamps."""
+        if self.db.get_bind().dialect.name == "sqlite":
+            return (func.julianday(end) - func.julianday(start)) * 86400
+        return func.extract("epoch", end - start)
 
-        submissions_week = (
-            self.db.query(Property).filter(Property.submitted_at >= week_ago).count()
-        )
-
-        submissions_month = (
-            self.db.query(Property).filter(Property.submitted_at >= month_ago).count()
-        )
-
-        avg_completion_time = self._calculate_avg_completion_time()
-
-        return {
-            "total": total_submissions,
-            "today": submissions_today,
-            "week": submissions_week,
-            "month": submissions_month,
-            "avg_completion_time_minutes": avg_completion_time,
-        }
-
-    def _get_review_metrics(self) -> dict[str, Any]:
-        pending = (
-            self.db.query(Property)
-            .filter(Property.status == PropertyStatus.SUBMITTED)
-            .count()
-        )
-
-        in_review = (
-            self.db.query(Property)
-            .filter(Property.status == PropertyStatus.UNDER_REVIEW)
-            .count()
-        )
-
-        avg_review_time = self._calculate_avg_review_time()
-
-        return {
-            "pending_queue": pending,
-            "in_review": in_review,
-            "avg_review_time_hours": avg_review_time,
-            "queue_age_distribution": self._get_queue_age_distribution(),
-        }
-
-    def _get_valuation_metrics(self) -> dict[str, Any]:
-        total_valued = (
-            self.db.query(Property)
-            .filter(Property.status == PropertyStatus.VALUED)
-            .count()
-        )
-
-        approved = (
-            self.db.query(Property)
-            .filter(Property.status == PropertyStatus.APPROVED)
-            .count()
-        )
-
-        follow_ups = (
-            self.db.query(Property)
-            .filter(Property.status == PropertyStatus.FOLLOW_UP)
-            .count()
-        )
-
-        rejected = (
-            self.db.query(Property)
-            .filter(Property.status == PropertyStatus.REJECTED)
-            .count()
-        )
-
-        total_value = (
-            self.db.query(func.sum(Property.estimated_value))
-            .filter(Property.estimated_value.isnot(None))
-            .scalar()
-            or 0
-        )
-
-        avg_confidence = (
-            self.db.query(func.avg(Valuation.confidence_score)).scalar() or 0
-        )
+    def get_kpi_dashboard(self) -> dict[str, Any]:
+        now = datetime.now(UTC)
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        status = Property.status
+        submitted_at = Property.submitted_at
+        pending = status == PropertyStatus.SUBMITTED
+
+        # One pass over property for every count, sum and average
+        totals = self.db.execute(
+            select(
+                func.count().filter(status != PropertyStatus.DRAFT).label("total"),
+                func.count().filter(submitted_at >= today).label("today"),
+                func.count()
+                .filter(submitted_at >= today - timedelta(days=7))
+                .label("week"),
+                func.count()
+                .filter(submitted_at >= today - timedelta(days=30))
+                .label("month"),
+                func.count().filter(pending).label("pending"),
+                func.count()
+                .filter(status == PropertyStatus.UNDER_REVIEW)
+                .label("in_review"),
+                func.count().filter(status == PropertyStatus.VALUED).label("valued"),
+                func.count()
+                .filter(status == PropertyStatus.APPROVED)
+                .label("approved"),
+                func.count()
+                .filter(status == PropertyStatus.FOLLOW_UP)
+                .label("follow_ups"),
+                func.count()
+                .filter(status == PropertyStatus.REJECTED)
+                .label("rejected"),
+                func.count()
+                .filter(pending, submitted_at >= now - timedelta(hours=1))
+                .label("under_1_hour"),
+                func.count()
+                .filter(
+                    pending,
+                    submitted_at >= now - timedelta(hours=3),
+                    submitted_at < now - timedelta(hours=1),
+                )
+                .label("1_to_3_hours"),
+                func.count()
+                .filter(
+                    pending,
+                    submitted_at >= now - timedelta(hours=24),
+                    submitted_at < now - timedelta(hours=3),
+                )
+                .label("3_to_24_hours"),
+                func.count()
+                .filter(pending, submitted_at < now - timedelta(hours=24))
+                .label("over_24_hours"),
+                func.sum(Property.estimated_value).label("total_value"),
+                func.avg(
+                    self._seconds_between(submitted_at, Property.created_at)
+                ).label("avg_completion_seconds"),
+                func.avg(
+                    self._seconds_between(Property.reviewed_at, submitted_at)
+                ).label("avg_review_seconds"),
+                select(func.avg(Valuation.confidence_score))
+                .scalar_subquery()
+                .label("avg_confidence"),
+                select(func.count())
+                .select_from(PropertyPhoto)
+                .scalar_subquery()
+                .label("total_photos"),
+                select(func.count())
+                .where(PropertyPhoto.qc_status == QCStatus.APPROVED)
+                .scalar_subquery()
+                .label("photos_approved"),
+                select(func.count())
+                .where(PropertyPhoto.qc_status == QCStatus.REJECTED)
+                .scalar_subquery()
+                .label("photos_rejected"),
+            )
+        ).one()
 
         return {
-            "total_valued": total_valued,
-            "approved": approved,
-            "follow_ups": follow_ups,
-            "rejected": rejected,
-            "total_portfolio_value": float(total_value),
-            "avg_confidence_score": float(avg_confidence),
-            "approval_rate": round(approved / max(total_valued, 1) * 100, 1),
+            "submission_metrics": {
+                "total": totals.total,
+                "today": totals.today,
+                "week": totals.week,
+                "month": totals.month,
+                "avg_completion_time_minutes": round(
+                    float(totals.avg_completion_seconds or 0) / 60, 1
+                ),
+            },
+            "review_metrics": {
+                "pending_queue": totals.pending,
+                "in_review": totals.in_review,
+                "avg_review_time_hours": round(
+                    float(totals.avg_review_seconds or 0) / 3600, 1
+                ),
+                "queue_age_distribution": {
+                    bucket: getattr(totals, bucket)
+                    for bucket in (
+                        "under_1_hour",
+                        "1_to_3_hours",
+                        "3_to_24_hours",
+                        "over_24_hours",
+                    )
+                },
+            },
+            "valuation_metrics": {
+                "total_valued": totals.valued,
+                "approved": totals.approved,
+                "follow_ups": totals.follow_ups,
+                "rejected": totals.rejected,
+                "total_portfolio_value": float(totals.total_value or 0),
+                "avg_confidence_score": float(totals.avg_confidence or 0),
+                "approval_rate": round(
+                    totals.approved / max(totals.valued, 1) * 100, 1
+                ),
+            },
+            "quality_metrics": {
+                "total_photos": totals.total_photos,
+                "photos_approved": totals.photos_approved,
+                "photos_rejected": totals.photos_rejected,
+                "photo_approval_rate": round(
+                    totals.photos_approved / max(totals.total_photos, 1) * 100, 1
+                ),
+            },
+            "trends": self.get_daily_trends(self.TREND_DAYS),
         }
 
-    def _get_quality_metrics(self) -> dict[str, Any]:
-        total_photos = (
-            self.db.query(func.count()).select_from(Property.photos).scalar() or 0
-        )
-
-        photos_approved = (
-            self.db.execute(
-                """
-            SELECT COUNT(*) FROM property_photos
-            WHERE qc_status = 'APPROVED'
+    def get_live_counters(self, days: int = TREND_DAYS) -> dict[str, Any]:
         """
-            ).scalar()
-            or 0
-        )
-
-        photos_rejected = (
-            self.db.execute(
-                """
-            SELECT COUNT(*) FROM property_photos
-            WHERE qc_status = 'REJECTED'
+        Status, daily and per-valuer totals read from the incrementally
+        maintained KPI counters instead of scanning property.
         """
-            ).scalar()
-            or 0
-        )
-
-        return {
-            "total_photos": total_photos,
-            "photos_approved": photos_approved,
-            "photos_rejected": photos_rejected,
-            "photo_approval_rate": round(
-                photos_approved / max(total_photos, 1) * 100, 1
-            ),
-        }
+        today = datetime.now(UTC).date()
+        day_keys = [
+            (today - timedelta(days=offset)).isoformat()
+            for offset in reversed(range(days))
+        ]
+        scopes = kpi_counter.get_scopes(self.db, since_day=day_keys[0])
+        statuses = scopes.get(STATUS, {})
 
-    def _get_trends(self) -> dict[str, Any]:
-        daily_submissions = self._get_daily_submissions(7)
-        daily_valuations = self._get_daily_valuations(7)
+        def daily(scope: str) -> list[dict[str, Any]]:
+            counters = scopes.get(scope, {})
+            return [
+                {"date": day, "count": counters.get(day, {}).get("count", 0)}
+                for day in day_keys
+            ]
 
         return {
-            "daily_submissions": daily_submissions,
-            "daily_valuations": daily_valuations,
+            "status_counts": {
+                status.value: statuses.get(status.value, {}).get("count", 0)
+                for status in PropertyStatus
+            },
+            "status_value_sums": {
+                status.value: statuses.get(status.value, {}).get("value_sum", 0.0)
+                for status in PropertyStatus
+            },
+            "daily_submissions": daily(SUBMITTED_DAY),
+            "daily_valuations": daily(VALUED_DAY),
+            "valuers": scopes.get(VALUER, {}),
         }
 
-    def _calculate_avg_completion_time(self) -> float:
-        result = self.db.execute(
-            """
-            SELECT AVG(
-                EXTRACT(EPOCH FROM (submitted_at - created_at)) / 60
-            ) as avg_minutes
-            FROM properties
-            WHERE submitted_at IS NOT NULL
-            AND created_at IS NOT NULL
+    def _rollup_filters(
+        self,
+        since: date | None,
+        city: str | None,
+        property_type: PropertyType | None,
+    ) -> list[Any]:
+        filters = []
+        if since is not None:
+            filters.append(DailyPropertyRollup.day >= since)
+        if city is not None:
+            filters.append(DailyPropertyRollup.city == city)
+        if property_type is not None:
+            filters.append(DailyPropertyRollup.property_type == property_type)
+        return filters
+
+    def get_daily_trends(
+        self,
+        days: int = TREND_DAYS,
+        *,
+        city: str | None = None,
+        property_type: PropertyType | None = None,
+    ) -> dict[str, Any]:
         """
-        ).scalar()
-        return round(float(result or 0), 1)
-
-    def _calculate_avg_review_time(self) -> float:
-        result = self.db.execute(
-            """
-            SELECT AVG(
-                EXTRACT(EPOCH FROM (reviewed_at - submitted_at)) / 3600
-            ) as avg_hours
-            FROM properties
-            WHERE reviewed_at IS NOT NULL
-            AND submitted_at IS NOT NULL
+        Daily submissions and valuations over the last ``days`` days, read
+        from the daily rollup. Rollups are refreshed every few minutes, so
+        today's figures can briefly lag the property table.
         """
-        ).scalar()
-        return round(float(result or 0), 1)
-
-    def _get_queue_age_distribution(self) -> dict[str, int]:
-        now = datetime.utcnow()
+        since = datetime.now(UTC).date() - timedelta(days=days - 1)
+        rows = self.db.execute(
+            select(
+                DailyPropertyRollup.day,
+                func.sum(DailyPropertyRollup.submitted_count).label("submissions"),
+                func.coalesce(
+                    func.sum(DailyPropertyRollup.reviewed_count).filter(
+                        DailyPropertyRollup.status == PropertyStatus.VALUED
+                    ),
+                    0,
+                ).label("valuations"),
+            )
+            .where(*self._rollup_filters(since, city, property_type))
+            .group_by(DailyPropertyRollup.day)
+        ).all()
 
+        by_day = {row.day: row for row in rows}
+        day_range = [since + timedelta(days=offset) for offset in range(days)]
         return {
-            "under_1_hour": self.db.query(Property)
-            .filter(
-                and_(
-                    Property.status == PropertyStatus.SUBMITTED,
-                    Property.submitted_at >= now - timedelta(hours=1),
-                )
-            )
-            .count(),
-            "1_to_3_hours": self.db.query(Property)
-            .filter(
-                and_(
-                    Property.status == PropertyStatus.SUBMITTED,
-                    Property.submitted_at >= now - timedelta(hours=3),
-                    Property.submitted_at < now - timedelta(hours=1),
-                )
-            )
-            .count(),
-            "3_to_24_hours": self.db.query(Property)
-            .filter(
-                and_(
-                    Property.status == PropertyStatus.SUBMITTED,
-                    Property.submitted_at >= now - timedelta(hours=24),
-                    Property.submitted_at < now - timedelta(hours=3),
-                )
-            )
-            .count(),
-            "over_24_hours": self.db.query(Property)
-            .filter(
-                and_(
-                    Property.status == PropertyStatus.SUBMITTED,
-                    Property.submitted_at < now - timedelta(hours=24),
-                )
-            )
-            .count(),
+            "daily_submissions": [
+                {
+                    "date": day.isoformat(),
+                    "count": int(by_day[day].submissions) if day in by_day else 0,
+                }
+                for day in day_range
+            ],
+            "daily_valuations": [
+                {
+                    "date": day.isoformat(),
+                    "count": int(by_day[day].valuations) if day in by_day else 0,
+                }
+                for day in day_range
+            ],
         }
 
-    def _get_daily_submissions(self, days: int) -> list[dict]:
-        result = []
-        for i in range(days):
-            date = datetime.utcnow().date() - timedelta(days=i)
-            count = (
-                self.db.query(Property)
-                .filter(func.date(Property.submitted_at) == date)
-                .count()
-            )
-            result.append({"date": date.isoformat(), "count": count})
-        return list(reversed(result))
-
-    def _get_daily_valuations(self, days: int) -> list[dict]:
-        result = []
-        for i in range(days):
-            date = datetime.utcnow().date() - timedelta(days=i)
-            count = (
-                self.db.query(Property)
-                .filter(
-                    and_(
-                        Property.status == PropertyStatus.VALUED,
-                        func.date(Property.reviewed_at) == date,
-                    )
-                )
-                .count()
-            )
-            result.append({"date": date.isoformat(), "count": count})
-        return list(reversed(result))
-
-    def get_funnel_analysis(self) -> dict[str, Any]:
+    def get_funnel_analysis(
+        self,
+        days: int | None = None,
+        *,
+        city: str | None = None,
+        property_type: PropertyType | None = None,
+    ) -> dict[str, Any]:
+        """
+        Conversion through the submission flow for properties created in
+        the last ``days`` days (all time by default), from the daily rollup.
+        """
+        since = (
+            datetime.now(UTC).date() - timedelta(days=days - 1)
+            if days is not None
+            else None
+        )
+        created = func.coalesce(func.sum(DailyPropertyRollup.created_count), 0)
+        totals = self.db.execute(
+            select(
+                created.label("started"),
+                func.coalesce(func.sum(DailyPropertyRollup.located_count), 0).label(
+                    "location_captured"
+                ),
+                func.coalesce(
+                    func.sum(DailyPropertyRollup.photographed_count), 0
+                ).label("photos_uploaded"),
+                func.coalesce(
+                    func.sum(DailyPropertyRollup.created_count).filter(
+                        DailyPropertyRollup.status != PropertyStatus.DRAFT
+                    ),
+                    0,
+                ).label("submitted"),
+                func.coalesce(
+                    func.sum(DailyPropertyRollup.created_count).filter(
+                        DailyPropertyRollup.status == PropertyStatus.VALUED
+                    ),
+                    0,
+                ).label("valued"),
+            ).where(*self._rollup_filters(since, city, property_type))
+        ).one()
+
+        # Type and area are required on create, so every started
+        # property has completed both of those steps
         stages = {
-            "started": self.db.query(Property).count(),
-            "type_selected": self.db.query(Property)
-            .filter(Property.property_type.isnot(None))
-            .count(),
-            "details_filled": self.db.query(Property)
-            .filter(Property.area_sqft.isnot(None))
-            .count(),
-            "location_captured": self.db.query(Property)
-            .filter(Property.lat.isnot(None))
-            .count(),
-            "photos_uploaded": self.db.execute(
-                """
-                SELECT COUNT(DISTINCT property_id) FROM property_photos
-            """
-            ).scalar()
-            or 0,
-            "submitted": self.db.query(Property)
-            .filter(Property.status != PropertyStatus.DRAFT)
-            .count(),
-            "valued": self.db.query(Property)
-            .filter(Property.status == PropertyStatus.VALUED)
-            .count(),
+            "started": int(totals.started),
+            "type_selected": int(totals.started),
+            "details_filled": int(totals.started),
+            "location_captured": int(totals.location_captured),
+            "photos_uploaded": int(totals.photos_uploaded),
+            "submitted": int(totals.submitted),
+            "valued": int(totals.valued),
         }
 
         return {
@@ -312,41 +333,25 @@ class AnalyticsService:
             },
         }
 
-    def get_drop_off_analysis(self) -> list[dict[str, Any]]:
-        return [
-            {
-                "screen": "PropertyType",
-                "visitors": 1000,
-                "drop_offs": 50,
-                "drop_off_rate": 5.0,
-                "avg_time_seconds": 45,
-            },
-            {
-                "screen": "PropertyDetails",
-                "visitors": 950,
-                "drop_offs": 95,
-                "drop_off_rate": 10.0,
-                "avg_time_seconds": 120,
-            },
-            {
-                "screen": "Location",
-                "visitors": 855,
-                "drop_offs": 85,
-                "drop_off_rate": 10.0,
-                "avg_time_seconds": 60,
-            },
-            {
-                "screen": "PhotoCapture",
-                "visitors": 770,
-                "drop_offs": 154,
-                "drop_off_rate": 20.0,
-                "avg_time_seconds": 180,
-            },
-            {
-                "screen": "Submit",
-                "visitors": 616,
-                "drop_offs": 62,
-                "drop_off_rate": 10.0,
-                "avg_time_seconds": 30,
-            },
-        ]
+    def get_drop_off_analysis(self, days: int = TREND_DAYS) -> list[dict[str, Any]]:
+        """
+        Per-screen visitors, drop-offs and median dwell time from client
+        telemetry, streamed session by session rather than loaded at once.
+        """
+        now = datetime.now(UTC)
+        timeout = timedelta(minutes=settings.TELEMETRY_SESSION_TIMEOUT_MINUTES)
+        aggregator = DropOffAggregator(active_since=now - timeout, max_dwell=timeout)
+        events = self.db.execute(
+            select(
+                TelemetryEvent.session_id,
+                TelemetryEvent.event_type,
+                TelemetryEvent.screen,
+                TelemetryEvent.occurred_at,
+            )
+            .where(TelemetryEvent.occurred_at >= now - timedelta(days=days))
+            .order_by(TelemetryEvent.session_id, TelemetryEvent.occurred_at)
+            .execution_options(yield_per=self.EVENT_BATCH_SIZE)
+        )
+        for session_id, event_type, screen, occurred_at in events:
+            aggregator.add(session_id, event_type, screen, occurred_at)
+        return aggregator.result()
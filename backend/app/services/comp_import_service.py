@@ -0,0 +1,234 @@
+"""
+PropFlow Comparable Import Service
+Bulk loads comparable sales from CSV or NDJSON, upserting on address and
+sale date
+"""
+
+import csv
+import enum
+import io
+import json
+import time
+import uuid
+from collections.abc import Callable, Iterable, Iterator
+from datetime import UTC
+from typing import IO, Any
+
+from pydantic import ValidationError
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.comp import Comparable
+from app.schemas.comp import ComparableCreate
+
+# Natural key of a sale
+KEY_COLUMNS = ("address", "sale_date")
+COLUMNS = tuple(ComparableCreate.model_fields)
+UPDATE_COLUMNS = tuple(column for column in COLUMNS if column not in KEY_COLUMNS)
+# COPY's NULL marker, so empty strings stay empty strings
+NULL = "\\N"
+
+
+class ImportFormat(str, enum.Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+def _is_utf8(text: str) -> bool:
+    # open_lines() decodes invalid bytes to lone surrogates, which cannot
+    # be encoded back
+    try:
+        text.encode()
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def _errors(error: ValidationError) -> list[str]:
+    return [
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    ]
+
+
+class ComparableImportService:
+    """
+    Streams rows in chunks of IMPORT_CHUNK_ROWS: each row is validated with
+    ComparableCreate, and the valid ones of a chunk are upserted on
+    (address, sale_date) and committed together. Re-running an import
+    therefore updates rows rather than duplicating them.
+
+    On PostgreSQL a chunk is COPYed into a temporary staging table and
+    merged with a single INSERT ... ON CONFLICT; on SQLite the chunk goes
+    straight to an executemany INSERT ... ON CONFLICT.
+    """
+
+    STAGING_TABLE = "comparable_import"
+
+    @staticmethod
+    def open_lines(binary: IO[bytes]) -> IO[str]:
+        """
+        Text lines of an uploaded file for read(). Bytes that are not UTF-8
+        are kept, so read() can reject just the records holding them.
+        """
+        return io.TextIOWrapper(
+            binary, encoding="utf-8-sig", errors="surrogateescape", newline=""
+        )
+
+    def read(
+        self, lines: Iterable[str], format: ImportFormat
+    ) -> Iterator[tuple[int, dict[str, Any] | None, str | None]]:
+        """(line number, raw row, parse error) for each record of lines."""
+        if format == ImportFormat.CSV:
+            reader = csv.DictReader(lines)
+            while True:
+                try:
+                    raw = next(reader)
+                except StopIteration:
+                    return
+                except csv.Error as e:
+                    # The reader carries on from the next line
+                    yield reader.reader.line_num, None, f"invalid CSV: {e}"
+                    continue
+                # Empty cells are missing values; cells past the header dropped
+                row = {k: v or None for k, v in raw.items() if k is not None}
+                if not all(_is_utf8(v) for v in row.values() if v):
+                    yield reader.line_num, None, "invalid UTF-8"
+                    continue
+                yield reader.line_num, row, None
+
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            if not _is_utf8(line):
+                yield number, None, "invalid UTF-8"
+                continue
+            try:
+                raw = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield number, None, f"invalid JSON: {e.msg}"
+                continue
+            if not isinstance(raw, dict):
+                yield number, None, "expected a JSON object"
+                continue
+            yield number, raw, None
+
+    def import_lines(
+        self,
+        db: Session,
+        lines: Iterable[str],
+        format: ImportFormat,
+        *,
+        max_rejects: int | None = None,
+        progress: Callable[[dict[str, Any]], None] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Import every record of lines. Returns a report of rows read,
+        written and rejected, throughput, and the first max_rejects
+        (default IMPORT_MAX_REJECTS) rejects with their line and errors.
+        progress, if given, gets the report so far after each chunk.
+        """
+        if max_rejects is None:
+            max_rejects = settings.IMPORT_MAX_REJECTS
+        report: dict[str, Any] = {
+            "rows": 0,
+            "written": 0,
+            "rejected": 0,
+            "rejects": [],
+            "seconds": 0.0,
+            "rows_per_second": 0.0,
+        }
+        start = time.perf_counter()
+
+        def reject(line: int, errors: list[str]) -> None:
+            report["rejected"] += 1
+            if len(report["rejects"]) < max_rejects:
+                report["rejects"].append({"line": line, "errors": errors})
+
+        def flush(chunk: dict[tuple[Any, ...], dict[str, Any]]) -> None:
+            if chunk:
+                self._upsert(db, list(chunk.values()))
+                db.commit()
+                report["written"] += len(chunk)
+                chunk.clear()
+            report["seconds"] = round(time.perf_counter() - start, 3)
+            report["rows_per_second"] = round(
+                report["rows"] / max(report["seconds"], 1e-9), 1
+            )
+            if progress is not None:
+                progress(report)
+
+        # Keyed so a sale repeated within a chunk is written once, last wins
+        chunk: dict[tuple[Any, ...], dict[str, Any]] = {}
+        for line, raw, error in self.read(lines, format):
+            report["rows"] += 1
+            if error is not None:
+                reject(line, [error])
+                continue
+            try:
+                row = ComparableCreate.model_validate(raw).model_dump()
+            except ValidationError as e:
+                reject(line, _errors(e))
+                continue
+            if row["sale_date"].tzinfo is None:
+                row["sale_date"] = row["sale_date"].replace(tzinfo=UTC)
+            chunk[tuple(row[column] for column in KEY_COLUMNS)] = row
+            if len(chunk) >= settings.IMPORT_CHUNK_ROWS:
+                flush(chunk)
+        flush(chunk)
+        return report
+
+    def _upsert(self, db: Session, rows: list[dict[str, Any]]) -> None:
+        if db.get_bind().dialect.name == "postgresql":
+            self._copy_upsert(db, rows)
+            return
+        statement = sqlite_insert(Comparable)
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=list(KEY_COLUMNS),
+                set_={
+                    **{column: statement.excluded[column] for column in UPDATE_COLUMNS},
+                    "updated_at": func.now(),
+                },
+            ),
+            [{"id": uuid.uuid4(), **row} for row in rows],
+        )
+
+    def _copy_upsert(self, db: Session, rows: list[dict[str, Any]]) -> None:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(
+                [uuid.uuid4(), *(NULL if row[c] is None else row[c] for c in COLUMNS)]
+            )
+        buffer.seek(0)
+
+        columns = ", ".join(COLUMNS)
+        updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in UPDATE_COLUMNS)
+        driver_connection = db.connection().connection.driver_connection
+        assert driver_connection is not None
+        cursor = driver_connection.cursor()
+        try:
+            # Emptied at each commit, so every chunk starts from a clean table
+            cursor.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS {self.STAGING_TABLE} "
+                "(LIKE comparable INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+            )
+            cursor.copy_expert(
+                f"COPY {self.STAGING_TABLE} (id, {columns}) "
+                f"FROM STDIN WITH (FORMAT csv, NULL '{NULL}')",
+                buffer,
+            )
+            cursor.execute(
+                f"INSERT INTO comparable (id, {columns}) "
+                f"SELECT id, {columns} FROM {self.STAGING_TABLE} "
+                f"ON CONFLICT ({', '.join(KEY_COLUMNS)}) "
+                f"DO UPDATE SET {updates}, updated_at = now()"
+            )
+        finally:
+            cursor.close()
+
+
+comp_import_service = ComparableImportService()
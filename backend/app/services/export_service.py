@@ -0,0 +1,169 @@
+import csv
+import enum
+import io
+import json
+from collections.abc import Callable, Iterator, Sequence
+from datetime import date, datetime
+from typing import Any
+
+from sqlalchemy import Row, Select, select
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.config import settings
+from app.crud.base import CRUDBase, encode_cursor
+from app.database import SessionLocal
+from app.models.property import Property, PropertyStatus
+
+
+class ExportDataset(str, enum.Enum):
+    PROPERTIES = "properties"
+    VALUATIONS = "valuations"
+    PHOTOS = "photos"
+
+
+class ExportFormat(str, enum.Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+DATASETS: dict[ExportDataset, CRUDBase[Any, Any, Any]] = {
+    ExportDataset.PROPERTIES: crud.property,
+    ExportDataset.VALUATIONS: crud.valuation,
+    ExportDataset.PHOTOS: crud.photo,
+}
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    if isinstance(value, dict | list):
+        return json.dumps(value, default=_json_default)
+    return value
+
+
+class ExportService:
+    """
+    Streams whole tables as NDJSON or CSV in constant memory.
+
+    Rows are read in (created_at, id) order, one window of
+    EXPORT_WINDOW_ROWS per query. Each window is fetched from a server-side
+    cursor EXPORT_BATCH_SIZE rows at a time, and the connection goes back
+    to the pool between windows, so a slow client never pins one for the
+    whole export. Windows are separate snapshots: rows changed during an
+    export may show up in their old or new state.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal) -> None:
+        self.session_factory = session_factory
+
+    def query(
+        self,
+        dataset: ExportDataset,
+        *,
+        status: PropertyStatus | None = None,
+        city: str | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+    ) -> Select[Any]:
+        """
+        All columns of the dataset's table. status and city are those of
+        the property, for valuations and photos too; the created range
+        applies to the exported rows themselves.
+        """
+        model: Any = DATASETS[dataset].model
+        query = select(*model.__table__.columns)
+        if model is not Property and (status is not None or city is not None):
+            query = query.join(Property, Property.id == model.property_id)
+        if status is not None:
+            query = query.where(Property.status == status)
+        if city is not None:
+            query = query.where(Property.city == city)
+        if created_from is not None:
+            query = query.where(model.created_at >= created_from)
+        if created_to is not None:
+            query = query.where(model.created_at < created_to)
+        return query
+
+    def batches(
+        self,
+        dataset: ExportDataset,
+        query: Select[Any],
+        session_factory: Callable[[], Session] | None = None,
+    ) -> Iterator[Sequence[Row[Any]]]:
+        crud_obj = DATASETS[dataset]
+        cursor: str | None = None
+        db = (session_factory or self.session_factory)()
+        try:
+            while True:
+                window = crud_obj.page_query(
+                    query, cursor=cursor, limit=settings.EXPORT_WINDOW_ROWS
+                ).execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+                rows = 0
+                last: Row[Any] | None = None
+                for batch in db.execute(window).partitions():
+                    rows += len(batch)
+                    last = batch[-1]
+                    yield batch
+                # Hand the connection back before the next window
+                db.close()
+                if last is None or rows < settings.EXPORT_WINDOW_ROWS:
+                    return
+                cursor = encode_cursor(last.created_at, last.id)
+        finally:
+            db.close()
+
+    def stream(
+        self,
+        dataset: ExportDataset,
+        format: ExportFormat = ExportFormat.NDJSON,
+        *,
+        session_factory: Callable[[], Session] | None = None,
+        **filters: Any,
+    ) -> Iterator[bytes]:
+        """
+        Encoded chunks of the export, one per batch of rows. Sessions come
+        from session_factory if given, else the service's own.
+        """
+        query = self.query(dataset, **filters)
+        columns = list(query.selected_columns.keys())
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if format is ExportFormat.CSV:
+            writer.writerow(columns)
+
+        for batch in self.batches(dataset, query, session_factory):
+            if format is ExportFormat.CSV:
+                writer.writerows([_csv_cell(value) for value in row] for row in batch)
+            else:
+                for row in batch:
+                    buffer.write(
+                        json.dumps(
+                            dict(zip(columns, row, strict=True)), default=_json_default
+                        )
+                    )
+                    buffer.write("\n")
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+
+export_service = ExportService()
@@ -0,0 +1,209 @@
+"""
+PropFlow Geocoding Service
+Forward and reverse geocoding through Nominatim, cached in memory and
+Redis
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, cast
+
+import httpx
+
+from app.core.config import settings
+from app.core.redis import async_redis_client
+from app.utils.cache import cache_metrics
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "geocode"
+RATE_LIMIT_KEY = "geocode:next-request"
+_MISSING = object()
+
+
+def normalize_address(address: str) -> str:
+    """Case and spacing folded, so trivial variants share a cache entry."""
+    parts = (" ".join(part.split()) for part in address.casefold().split(","))
+    return ", ".join(part for part in parts if part)
+
+
+def _ttl(result: dict[str, Any] | None) -> int:
+    # Misses expire sooner, in case the place is added upstream
+    if result is None:
+        return settings.GEOCODE_MISS_TTL_SECONDS
+    return settings.GEOCODE_CACHE_TTL_SECONDS
+
+
+class GeocodingService:
+    """
+    Nominatim client shared by the whole process.
+
+    Lookups go through an in-process LRU, then Redis, then Nominatim;
+    results, including "nothing found", are written back to both caches.
+    Concurrent lookups of the same key share one upstream request, and
+    upstream requests are spaced GEOCODE_MIN_INTERVAL_SECONDS apart across
+    every worker, per Nominatim's usage policy, with a Redis slot (and
+    within this process alone if Redis is down).
+
+    The HTTP client, lock and in-flight requests belong to an event loop;
+    they are rebuilt if the service is used from a new one.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport | None = None) -> None:
+        self._transport = transport
+        self._memory: OrderedDict[
+            str, tuple[float, dict[str, Any] | None]
+        ] = OrderedDict()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._client: httpx.AsyncClient | None = None
+        self._throttle_lock: asyncio.Lock | None = None
+        self._in_flight: dict[str, asyncio.Task[dict[str, Any] | None]] = {}
+        self._next_request = 0.0
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        self._loop = loop
+        # Connections of a previous loop cannot be reused; drop them
+        self._client = httpx.AsyncClient(
+            base_url=settings.NOMINATIM_URL,
+            timeout=settings.GEOCODE_TIMEOUT_SECONDS,
+            headers={
+                "User-Agent": settings.GEOCODE_USER_AGENT,
+                "Accept-Language": "en-US,en;q=0.9",
+            },
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=2),
+            transport=self._transport,
+        )
+        self._throttle_lock = asyncio.Lock()
+        self._in_flight = {}
+
+    async def geocode(self, address: str) -> dict[str, Any] | None:
+        """{"lat", "lng"} of the best match for an address, or None."""
+        normalized = normalize_address(address)
+        digest = hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+        return await self._lookup(
+            f"{CACHE_PREFIX}:search:{digest}",
+            "/search",
+            {"format": "json", "q": normalized, "limit": 1},
+        )
+
+    async def reverse(self, lat: float, lng: float) -> dict[str, Any] | None:
+        """{"lat", "lng"} of the place at a location, or None."""
+        # 4 decimals is about 11 m, finer than a street address
+        lat, lng = round(lat, 4), round(lng, 4)
+        return await self._lookup(
+            f"{CACHE_PREFIX}:reverse:{lat:.4f},{lng:.4f}",
+            "/reverse",
+            {"format": "json", "lat": lat, "lon": lng, "addressdetails": 1},
+        )
+
+    async def _lookup(
+        self, key: str, path: str, params: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        result = self._memory_get(key)
+        if result is not _MISSING:
+            cache_metrics.record(f"{CACHE_PREFIX}:memory", "hits")
+            return cast(dict[str, Any] | None, result)
+        cache_metrics.record(f"{CACHE_PREFIX}:memory", "misses")
+
+        self._bind_loop()
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fill(key, path, params))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # A cancelled caller must not cancel the lookup others are waiting on
+        return await asyncio.shield(task)
+
+    async def _fill(
+        self, key: str, path: str, params: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        start = time.perf_counter()
+        try:
+            cached = await async_redis_client.get(key)
+        except Exception as e:
+            logger.warning(f"Redis get error: {e}")
+            cache_metrics.record(CACHE_PREFIX, "errors")
+            cached = None
+        if cached is not None:
+            cache_metrics.record(CACHE_PREFIX, "hits", time.perf_counter() - start)
+            result: dict[str, Any] | None = json.loads(cached)
+            self._memory_set(key, result)
+            return result
+        cache_metrics.record(CACHE_PREFIX, "misses", time.perf_counter() - start)
+
+        result = await self._request(path, params)
+        self._memory_set(key, result)
+        try:
+            await async_redis_client.setex(key, _ttl(result), json.dumps(result))
+        except Exception as e:
+            logger.warning(f"Redis set error: {e}")
+            cache_metrics.record(CACHE_PREFIX, "errors")
+        return result
+
+    async def _request(
+        self, path: str, params: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        assert self._client is not None
+        await self._throttle()
+        response = await self._client.get(path, params=params)
+        response.raise_for_status()
+        data = response.json()
+        # /search answers with a list of matches, /reverse with one place
+        place = data[0] if isinstance(data, list) and data else data
+        if not isinstance(place, dict) or "lat" not in place:
+            return None
+        return {"lat": float(place["lat"]), "lng": float(place["lon"])}
+
+    async def _throttle(self) -> None:
+        """Wait for this process's, then every worker's, next request slot."""
+        assert self._throttle_lock is not None
+        interval = settings.GEOCODE_MIN_INTERVAL_SECONDS
+        async with self._throttle_lock:
+            delay = self._next_request - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            while True:
+                try:
+                    if await async_redis_client.set(
+                        RATE_LIMIT_KEY, 1, px=max(1, int(interval * 1000)), nx=True
+                    ):
+                        break
+                    wait_ms = await async_redis_client.pttl(RATE_LIMIT_KEY)
+                except Exception as e:
+                    logger.warning(f"Redis rate limit error: {e}")
+                    break
+                await asyncio.sleep(max(wait_ms, 10) / 1000)
+            self._next_request = time.monotonic() + interval
+
+    def _memory_get(self, key: str) -> Any:
+        entry = self._memory.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del self._memory[key]
+            return _MISSING
+        self._memory.move_to_end(key)
+        return result
+
+    def _memory_set(self, key: str, result: dict[str, Any] | None) -> None:
+        self._memory[key] = (time.monotonic() + _ttl(result), result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > settings.GEOCODE_MEMORY_ENTRIES:
+            self._memory.popitem(last=False)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
+
+
+geocoding_service = GeocodingService()
@@ -0,0 +1,128 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import IO, Any
+
+from PIL import Image
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class StageTimer:
+    """Collects wall-clock milliseconds per named processing stage."""
+
+    def __init__(self) -> None:
+        self.timings: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.timings[name] = round(self.timings.get(name, 0.0) + elapsed_ms, 2)
+
+
+class ImagePoolService:
+    """
+    Process pool for CPU-heavy image work (decode, resize, QC).
+
+    Worker processes are recycled after IMAGE_POOL_MAX_TASKS_PER_CHILD images
+    so allocator fragmentation cannot grow RSS without bound, and submissions
+    block while the estimated decoded pixel memory of in-flight images would
+    exceed IMAGE_POOL_MAX_PIXEL_BYTES. When the pool is disabled, work runs
+    inline in the calling process.
+    """
+
+    def __init__(self) -> None:
+        self._executor: ProcessPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+        self._budget = threading.Condition()
+        self._in_flight_bytes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.IMAGE_POOL_ENABLED
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                workers = settings.IMAGE_POOL_WORKERS or os.cpu_count() or 1
+                # Recycling workers requires a non-fork start method
+                self._executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    max_tasks_per_child=settings.IMAGE_POOL_MAX_TASKS_PER_CHILD,
+                )
+                logger.info("Started image process pool with %d workers", workers)
+            return self._executor
+
+    @staticmethod
+    def estimate_pixel_bytes(image_data: str | IO[bytes]) -> int:
+        """Decoded size of an image, read from its header without decoding."""
+        try:
+            with Image.open(image_data) as img:
+                return int(img.width * img.height * len(img.getbands()))
+        except Exception:
+            return settings.IMAGE_POOL_DEFAULT_PIXEL_BYTES
+
+    def _reserve(self, pixel_bytes: int) -> None:
+        with self._budget:
+            # An image larger than the whole budget still runs, but alone
+            self._budget.wait_for(
+                lambda: self._in_flight_bytes == 0
+                or self._in_flight_bytes + pixel_bytes
+                <= settings.IMAGE_POOL_MAX_PIXEL_BYTES
+            )
+            self._in_flight_bytes += pixel_bytes
+
+    def _release(self, pixel_bytes: int) -> None:
+        with self._budget:
+            self._in_flight_bytes -= pixel_bytes
+            self._budget.notify_all()
+
+    def submit(
+        self, fn: Callable[..., Any], *args: Any, pixel_bytes: int
+    ) -> "Future[Any]":
+        """Submit work to the pool once its pixel memory fits the budget."""
+        self._reserve(pixel_bytes)
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._release(pixel_bytes)
+            raise
+        future.add_done_callback(lambda _: self._release(pixel_bytes))
+        return future
+
+    def map(
+        self,
+        fn: Callable[..., Any],
+        jobs: list[tuple[Any, ...]],
+        pixel_bytes: list[int],
+    ) -> list[Any]:
+        """Run ``fn(*job)`` for every job and return results in order."""
+        if not self.enabled:
+            return [fn(*job) for job in jobs]
+
+        futures = [
+            self.submit(fn, *job, pixel_bytes=cost)
+            for job, cost in zip(jobs, pixel_bytes, strict=True)
+        ]
+        return [future.result() for future in futures]
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+image_pool_service = ImagePoolService()
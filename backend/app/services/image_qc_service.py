@@ -1,11 +1,17 @@
 import io
 import logging
-from typing import Any
+from collections.abc import Callable
+from typing import Any, TypeAlias
 
-from PIL import Image, ImageStat
+from PIL import Image, ImageFilter
+
+from app.services.image_service import ImageService
 
 logger = logging.getLogger(__name__)
 
+ImageSource: TypeAlias = bytes | str | io.BytesIO | Image.Image
+QCCheck = Callable[[Image.Image], dict[str, Any]]
+
 
 class ImageQCService:
     """Service for performing quality control checks on images."""
@@ -14,45 +20,91 @@ class ImageQCService:
     BRIGHTNESS_MIN = 40
     BRIGHTNESS_MAX = 220
     GLARE_THRESHOLD = 70
+    # Longest side of the grayscale raster the checks analyse;
+    # None keeps full resolution
+    ANALYSIS_MAX_DIMENSION: int | None = None
+    # Brightness and glare statistics need far less detail than blur
+    STATS_MAX_DIMENSION = 256
+    # Luminance levels for histogram-based exposure metrics
+    GLARE_LEVEL = 240
+    HIGHLIGHT_CLIP_LEVEL = 250
+    SHADOW_CRUSH_LEVEL = 5
+    # Key under which histogram stats are cached on a shared raster's info
+    _HISTOGRAM_INFO_KEY = "qc_histogram_stats"
 
     def __init__(self) -> None:
         self.blur_threshold = self.BLUR_THRESHOLD
+        self.analysis_max_dimension = self.ANALYSIS_MAX_DIMENSION
         self.brightness_min = self.BRIGHTNESS_MIN
         self.brightness_max = self.BRIGHTNESS_MAX
         self.glare_threshold = self.GLARE_THRESHOLD
+        self._checks: dict[str, QCCheck] = {
+            "blur": self.check_blur,
+            "brightness": self.check_brightness,
+            "glare": self.check_glare,
+        }
 
-    def check_blur(self, image_data: bytes | str | io.BytesIO) -> dict[str, Any]:
+    def register_check(self, name: str, check: QCCheck) -> None:
+        """
+        Register an extra check for run_qc_checks.
+        The check receives the shared grayscale raster and returns a result
+        dict, which may carry "issues" and "warnings" lists of its own.
+        """
+        self._checks[name] = check
+
+    def load_raster(
+        self, image_data: ImageSource, max_dimension: int | None = None
+    ) -> Image.Image:
+        """
+        Decode an image once into a grayscale raster at analysis resolution.
+        The result can be passed to every check in place of the encoded image.
+        """
+        if max_dimension is None:
+            max_dimension = self.analysis_max_dimension
+        img = self._open_image(image_data)
+        if max_dimension:
+            ImageService.draft_decode(img, (max_dimension, max_dimension), "L")
+        return self._to_raster(img, max_dimension)
+
+    @staticmethod
+    def _to_raster(img: Image.Image, max_dimension: int | None) -> Image.Image:
+        """Convert to grayscale and downscale without touching the input."""
+        raster = img if img.mode == "L" else img.convert("L")
+        if max_dimension and max(raster.size) > max_dimension:
+            scale = max_dimension / max(raster.size)
+            size = (
+                max(1, round(raster.width * scale)),
+                max(1, round(raster.height * scale)),
+            )
+            raster = raster.resize(size, Image.Resampling.BILINEAR)
+        return raster
+
+    def check_blur(
+        self,
+        image_data: ImageSource,
+        max_dimension: int | None = None,
+    ) -> dict[str, Any]:
         """
         Check if image is blurry using Laplacian variance.
         Lower variance = more blurry.
+
+        When ``max_dimension`` is given the grayscale image is downscaled so its
+        longest side fits before the Laplacian is computed.
         """
         result = {"is_blurry": False, "score": 0.0, "threshold": self.blur_threshold}
 
         try:
-            img = self._open_image(image_data)
-            img_gray = img.convert("L")
+            img_gray = self.load_raster(image_data, max_dimension)
 
             import numpy as np
 
-            img_array = np.array(img_gray)
-
-            laplacian_kernel = np.array([[0, 1, 0], [1, -4, 1], [0, 1, 0]])
-
-            rows, cols = img_array.shape
-            laplacian = np.zeros_like(img_array, dtype=np.float64)
-
-            for i in range(1, rows - 1):
-                for j in range(1, cols - 1):
-                    region = img_array[i - 1 : i + 2, j - 1 : j + 2]
-                    laplacian[i, j] = np.sum(region * laplacian_kernel)
-
-            variance = laplacian.var()
-            result["score"] = float(variance)
+            variance = self._laplacian_variance(np.asarray(img_gray))
+            result["score"] = variance
             result["is_blurry"] = variance < self.blur_threshold
 
         except ImportError:
             result["error"] = "numpy not available, using fallback"
-            result["score"] = self._fallback_blur_check(image_data)
+            result["score"] = self._fallback_blur_check(img_gray)
             result["is_blurry"] = result["score"] < self.blur_threshold
         except Exception as e:
             logger.error("Error checking blur: %s", e)
@@ -60,8 +112,31 @@ class ImageQCService:
 
         return result
 
-    def _open_image(self, image_data: bytes | str | io.BytesIO) -> Image.Image:
+    @staticmethod
+    def _laplacian_variance(img_array: Any) -> float:
+        """
+        Variance of the 4-neighbour Laplacian of a 2-D grayscale array.
+
+        The kernel is applied with whole-array slicing; border pixels are left
+        at zero so the score matches a per-pixel convolution loop.
+        """
+        import numpy as np
+
+        pixels = img_array.astype(np.int32)
+        laplacian = np.zeros(pixels.shape, dtype=np.float64)
+        laplacian[1:-1, 1:-1] = (
+            pixels[:-2, 1:-1]
+            + pixels[2:, 1:-1]
+            + pixels[1:-1, :-2]
+            + pixels[1:-1, 2:]
+            - 4 * pixels[1:-1, 1:-1]
+        )
+        return float(laplacian.var())
+
+    def _open_image(self, image_data: ImageSource) -> Image.Image:
         """Helper to open image from various sources."""
+        if isinstance(image_data, Image.Image):
+            return image_data
         if isinstance(image_data, str):
             with open(image_data, "rb") as f:
                 image_data = io.BytesIO(f.read())
@@ -69,36 +144,75 @@ class ImageQCService:
             image_data = io.BytesIO(image_data)
         return Image.open(image_data)
 
-    def _fallback_blur_check(self, image_data: bytes | str | io.BytesIO) -> float:
-        """Fallback blur check without numpy."""
+    def _fallback_blur_check(self, image_data: ImageSource) -> float:
+        """
+        Fallback blur check without numpy.
+        Counts interior pixels of a 100x100 thumbnail that differ from the mean
+        of their 4 neighbours by more than 10 levels, read off the histogram of
+        a Laplacian-filtered image (offset so 128 means no edge).
+        """
         try:
-            img = Image.open(image_data).convert("L")
+            img = self._open_image(image_data).convert("L")
             img = img.resize((100, 100))
-            pixels = list(img.getdata())
-
-            edges = 0
-            for i in range(1, 99):
-                for j in range(1, 99):
-                    idx = i * 100 + j
-                    neighbors = [
-                        pixels[idx - 1],
-                        pixels[idx + 1],
-                        pixels[idx - 100],
-                        pixels[idx + 100],
-                    ]
-                    if abs(pixels[idx] - sum(neighbors) / 4) > 10:
-                        edges += 1
+            laplacian = img.filter(
+                ImageFilter.Kernel((3, 3), [0, 1, 0, 1, -4, 1, 0, 1, 0], 1, 128)
+            ).crop((1, 1, 99, 99))
+            histogram = laplacian.histogram()
 
+            # |pixel - neighbours / 4| > 10  <=>  |laplacian| > 40
+            edges = sum(histogram[: 128 - 40]) + sum(histogram[128 + 41 :])
             return float(edges)
         except Exception:
             return 100.0
 
-    def check_brightness(self, image_data: bytes | str | io.BytesIO) -> dict[str, Any]:
+    def histogram_stats(self, image_data: ImageSource) -> dict[str, Any]:
+        """
+        Exposure statistics from a single 256-bin luminance histogram.
+        When given a decoded raster the stats are cached on it, so checks
+        sharing the raster in run_qc_checks compute the histogram once.
+        """
+        if isinstance(image_data, Image.Image):
+            cached: dict[str, Any] | None = image_data.info.get(
+                self._HISTOGRAM_INFO_KEY
+            )
+            if cached is not None:
+                return cached
+
+        raster = self.load_raster(image_data, self.STATS_MAX_DIMENSION)
+        histogram = raster.histogram()
+        total = sum(histogram) or 1
+
+        def percentile(fraction: float) -> int:
+            target = fraction * total
+            cumulative = 0
+            for level, count in enumerate(histogram):
+                cumulative += count
+                if cumulative >= target:
+                    return level
+            return 255
+
+        stats = {
+            "mean": sum(level * count for level, count in enumerate(histogram)) / total,
+            "p5": percentile(0.05),
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "glare_ratio": sum(histogram[self.GLARE_LEVEL + 1 :]) / total,
+            "clipped_highlight_ratio": sum(histogram[self.HIGHLIGHT_CLIP_LEVEL :])
+            / total,
+            "crushed_shadow_ratio": sum(histogram[: self.SHADOW_CRUSH_LEVEL + 1])
+            / total,
+        }
+
+        if isinstance(image_data, Image.Image):
+            image_data.info[self._HISTOGRAM_INFO_KEY] = stats
+        return stats
+
+    def check_brightness(self, image_data: ImageSource) -> dict[str, Any]:
         """
         Check image brightness.
         Returns mean brightness score and whether it's too dark/bright.
         """
-        result = {
+        result: dict[str, Any] = {
             "is_too_dark": False,
             "is_too_bright": False,
             "score": 0.0,
@@ -107,15 +221,17 @@ class ImageQCService:
         }
 
         try:
-            if isinstance(image_data, str):
-                with open(image_data, "rb") as f:
-                    image_data = io.BytesIO(f.read())
-
-            img = Image.open(image_data).convert("L")
-            stat = ImageStat.Stat(img)
-            brightness = stat.mean[0]
+            stats = self.histogram_stats(image_data)
+            brightness = stats["mean"]
 
             result["score"] = float(brightness)
+            result["percentiles"] = {
+                "p5": stats["p5"],
+                "p50": stats["p50"],
+                "p95": stats["p95"],
+            }
+            result["clipped_highlight_ratio"] = stats["clipped_highlight_ratio"]
+            result["crushed_shadow_ratio"] = stats["crushed_shadow_ratio"]
             result["is_too_dark"] = brightness < self.brightness_min
             result["is_too_bright"] = brightness > self.brightness_max
 
@@ -124,7 +240,7 @@ class ImageQCService:
 
         return result
 
-    def check_glare(self, image_data: bytes | str | io.BytesIO) -> dict[str, Any]:
+    def check_glare(self, image_data: ImageSource) -> dict[str, Any]:
         """
         Check for glare/overexposed areas in the image.
         """
@@ -135,17 +251,7 @@ class ImageQCService:
         }
 
         try:
-            if isinstance(image_data, str):
-                with open(image_data, "rb") as f:
-                    image_data = io.BytesIO(f.read())
-
-            img = Image.open(image_data).convert("L")
-            img = img.resize((200, 200))
-            pixels = list(img.getdata())
-
-            bright_pixels = sum(1 for p in pixels if p > 240)
-            total_pixels = len(pixels)
-            glare_percentage = (bright_pixels / total_pixels) * 100
+            glare_percentage = self.histogram_stats(image_data)["glare_ratio"] * 100
 
             result["percentage"] = float(glare_percentage)
             result["has_glare"] = glare_percentage > self.glare_threshold
@@ -155,16 +261,28 @@ class ImageQCService:
 
         return result
 
-    def run_qc_checks(self, image_data: bytes | str | io.BytesIO) -> dict[str, Any]:
+    def run_qc_checks(
+        self, image_data: ImageSource, max_dimension: int | None = None
+    ) -> dict[str, Any]:
         """
-        Run all QC checks and return combined results.
+        Run all registered QC checks and return combined results.
+        The image is decoded once and every check shares the same raster.
         """
-        blur_result = self.check_blur(image_data)
-        brightness_result = self.check_brightness(image_data)
-        glare_result = self.check_glare(image_data)
+        raster: ImageSource
+        try:
+            raster = self.load_raster(image_data, max_dimension)
+        except Exception as e:
+            # Let each check report the decode failure in its own result
+            logger.error("Error decoding image for QC: %s", e)
+            raster = image_data
 
-        issues = []
-        warnings = []
+        results = {name: check(raster) for name, check in self._checks.items()}
+        blur_result = results["blur"]
+        brightness_result = results["brightness"]
+        glare_result = results["glare"]
+
+        issues: list[str] = []
+        warnings: list[str] = []
 
         if blur_result.get("is_blurry"):
             issues.append("Image is blurry")
@@ -181,13 +299,16 @@ class ImageQCService:
         elif glare_result.get("percentage", 0) > self.glare_threshold / 2:
             warnings.append("Image may have some glare")
 
+        for name, result in results.items():
+            if name not in ("blur", "brightness", "glare"):
+                issues.extend(result.get("issues", []))
+                warnings.extend(result.get("warnings", []))
+
         return {
+            **results,
             "passed": len(issues) == 0,
             "issues": issues,
             "warnings": warnings,
-            "blur": blur_result,
-            "brightness": brightness_result,
-            "glare": glare_result,
             "recommendation": "reject"
             if issues
             else ("review" if warnings else "approve"),
@@ -1,20 +1,65 @@
-import math
+import io
+import mmap
 from datetime import datetime
-from typing import Any
+from typing import IO, Any
 
 import piexif
 from PIL import Image, ImageStat
 
+from app.core.config import RenditionSpec, settings
+from app.utils import geo
+
+try:
+    # Registers the AVIF codec with Pillow when installed
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pass
+
+# A local path, an open binary file or a memory-mapped file
+ImageInput = str | IO[bytes] | mmap.mmap
+
 
 class ImageService:
+    # Grid the QC metrics are computed on; JPEGs are DCT-scaled towards it
+    QC_ANALYSIS_SIZE = (256, 256)
+
+    # dHash grid: 8 rows of 8 horizontal gradients give a 64-bit hash
+    HASH_SIZE = 8
+    HASH_BANDS = 4
+    HASH_BAND_BITS = 16
+
+    RENDITION_CONTENT_TYPES = {
+        "JPEG": "image/jpeg",
+        "WEBP": "image/webp",
+        "AVIF": "image/avif",
+        "PNG": "image/png",
+    }
+
+    @staticmethod
+    def draft_decode(
+        img: Image.Image, size: tuple[int, int], mode: str | None = None
+    ) -> Image.Image:
+        """
+        Configure a lazily opened image to decode at reduced resolution.
+        For JPEGs this uses Pillow's draft() DCT scaling, picking the
+        largest 1/2, 1/4 or 1/8 reduction that still covers ``size``;
+        other formats are left to decode at full resolution.
+        """
+        img.draft(mode, size)
+        return img
+
     @staticmethod
-    def get_exif_data(image_path: str) -> dict[str, Any]:
-        """Extract EXIF data from an image file."""
+    def get_exif_data(image_path: ImageInput) -> dict[str, Any]:
+        """
+        Extract EXIF data from an image file.
+        Only the header is parsed; pixel data is never decoded.
+        """
         exif_data: dict[str, Any] = {}
         try:
-            img = Image.open(image_path)
-            if "exif" in img.info:
-                exif_dict = piexif.load(img.info["exif"])
+            with Image.open(image_path) as img:
+                exif_bytes = img.info.get("exif")
+            if exif_bytes:
+                exif_dict = piexif.load(exif_bytes)
 
                 # Extract capture time
                 if piexif.ExifIFD.DateTimeOriginal in exif_dict["Exif"]:
@@ -58,19 +103,126 @@ class ImageService:
     @staticmethod
     def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """Calculate the great circle distance between two points on Earth in km."""
-        r_earth = 6371  # Earth radius in km
+        return geo.haversine_km(lat1, lon1, lat2, lon2)
+
+    @staticmethod
+    def dhash(image_data: ImageInput) -> int | None:
+        """
+        64-bit difference hash of an image, stable across re-encoding,
+        resizing and small exposure changes. Returns None if the image
+        cannot be decoded.
+        """
+        size = ImageService.HASH_SIZE
+        try:
+            img = ImageService.draft_decode(
+                Image.open(image_data), (size * 8, size * 8), "L"
+            )
+            pixels = list(
+                img.convert("L")
+                .resize((size + 1, size), Image.Resampling.LANCZOS)
+                .getdata()
+            )
+        except Exception as e:
+            print(f"Error hashing image: {e}")
+            return None
+
+        value = 0
+        for row in range(size):
+            offset = row * (size + 1)
+            for col in range(size):
+                value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+        return value
 
-        phi1, phi2 = math.radians(lat1), math.radians(lat2)
-        dphi = math.radians(lat2 - lat1)
-        dlambda = math.radians(lon2 - lon1)
+    @staticmethod
+    def hash_bands(value: int) -> list[int]:
+        """
+        Split a 64-bit hash into 16-bit bands. Two hashes within
+        HASH_BANDS - 1 bits of each other share at least one band exactly,
+        so indexed band equality finds every near-duplicate candidate.
+        """
+        mask = (1 << ImageService.HASH_BAND_BITS) - 1
+        return [
+            (value >> (band * ImageService.HASH_BAND_BITS)) & mask
+            for band in range(ImageService.HASH_BANDS)
+        ]
+
+    @staticmethod
+    def hamming_distance(a: int, b: int) -> int:
+        """Number of differing bits between two 64-bit hashes."""
+        return ((a ^ b) & 0xFFFF_FFFF_FFFF_FFFF).bit_count()
+
+    @staticmethod
+    def can_encode(image_format: str) -> bool:
+        """Whether Pillow has an encoder registered for the format."""
+        Image.init()
+        return image_format.upper() in Image.SAVE
+
+    @staticmethod
+    def render_renditions(
+        image_data: ImageInput, specs: list[RenditionSpec] | None = None
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Decode an image once and encode every configured rendition from it.
+        JPEGs are DCT-scaled towards the largest rendition, then each smaller
+        rendition is downscaled from the previous one rather than from the
+        original. Returns the encoded bytes, content type and dimensions
+        keyed by rendition name.
+        """
+        specs = settings.IMAGE_RENDITIONS if specs is None else specs
+        renditions: dict[str, dict[str, Any]] = {}
+        try:
+            supported = []
+            for spec in specs:
+                if ImageService.can_encode(spec.format):
+                    supported.append(spec)
+                else:
+                    print(f"Skipping rendition {spec.name}: no {spec.format} encoder")
+            if not supported:
+                return renditions
+
+            supported.sort(key=lambda spec: spec.max_size, reverse=True)
+            largest = supported[0].max_size
+            img = ImageService.draft_decode(
+                Image.open(image_data), (largest, largest), "RGB"
+            )
+            current = img.convert("RGB")
 
-        a = (
-            math.sin(dphi / 2) ** 2
-            + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
-        )
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+            for spec in supported:
+                if max(current.size) > spec.max_size:
+                    scale = spec.max_size / max(current.size)
+                    size = (
+                        max(1, round(current.width * scale)),
+                        max(1, round(current.height * scale)),
+                    )
+                    current = current.resize(
+                        size, Image.Resampling.LANCZOS, reducing_gap=3.0
+                    )
 
-        return r_earth * c
+                image_format = spec.format.upper()
+                output = io.BytesIO()
+                if image_format == "JPEG":
+                    current.save(
+                        output,
+                        image_format,
+                        quality=spec.quality,
+                        optimize=True,
+                        progressive=True,
+                    )
+                else:
+                    current.save(output, image_format, quality=spec.quality)
+
+                renditions[spec.name] = {
+                    "data": output.getvalue(),
+                    "format": image_format,
+                    "content_type": ImageService.RENDITION_CONTENT_TYPES.get(
+                        image_format, f"image/{image_format.lower()}"
+                    ),
+                    "width": current.width,
+                    "height": current.height,
+                }
+        except Exception as e:
+            print(f"Error rendering renditions: {e}")
+        return renditions
 
     @staticmethod
     def optimize_image(
@@ -96,7 +248,7 @@ class ImageService:
             return image_path
 
     @staticmethod
-    def perform_qc_checks(image_path: str) -> dict[str, Any]:
+    def perform_qc_checks(image_path: ImageInput) -> dict[str, Any]:
         """Perform quality control checks on the image."""
         qc_results = {
             "is_blurry": False,
@@ -107,7 +259,9 @@ class ImageService:
         }
 
         try:
-            img = Image.open(image_path).convert("L")  # Convert to grayscale
+            img = ImageService.draft_decode(
+                Image.open(image_path), ImageService.QC_ANALYSIS_SIZE, "L"
+            ).convert("L")  # Convert to grayscale
 
             # Brightness check
             stat = ImageStat.Stat(img)
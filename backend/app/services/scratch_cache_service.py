@@ -0,0 +1,94 @@
+import hashlib
+import logging
+import os
+import tempfile
+from collections.abc import Collection
+
+from app.core.config import settings
+from app.services.storage_service import storage_service
+
+logger = logging.getLogger(__name__)
+
+
+class ScratchCacheService:
+    """
+    Size-bounded local disk cache of storage objects, keyed by S3 key.
+
+    Objects are streamed to disk once and then opened (or memory-mapped) by
+    every processing stage. Least recently used files are evicted once the
+    cache grows past IMAGE_SCRATCH_MAX_BYTES.
+    """
+
+    PARTIAL_SUFFIX = ".part"
+
+    def __init__(self, directory: str | None = None, max_bytes: int | None = None):
+        self.directory = (
+            directory
+            or settings.IMAGE_SCRATCH_DIR
+            or os.path.join(tempfile.gettempdir(), "propflow-scratch")
+        )
+        self.max_bytes = max_bytes or settings.IMAGE_SCRATCH_MAX_BYTES
+
+    def path_for(self, s3_key: str) -> str:
+        digest = hashlib.sha256(s3_key.encode()).hexdigest()
+        extension = os.path.splitext(s3_key)[1].lower()
+        return os.path.join(self.directory, f"{digest}{extension}")
+
+    def fetch(self, s3_key: str, pinned: Collection[str] = ()) -> str:
+        """
+        Return a local path for the object, downloading it on a miss.
+        Paths in pinned, such as the rest of a batch still to be processed,
+        are never evicted to make room for it.
+        """
+        path = self.path_for(s3_key)
+        if os.path.exists(path):
+            # Refresh recency for LRU eviction
+            os.utime(path)
+            return path
+
+        os.makedirs(self.directory, exist_ok=True)
+        fd, partial_path = tempfile.mkstemp(
+            dir=self.directory, suffix=self.PARTIAL_SUFFIX
+        )
+        os.close(fd)
+        try:
+            storage_service.download_to_file(s3_key, partial_path)
+            # Atomic so concurrent readers never see a half-written file
+            os.replace(partial_path, path)
+        except Exception:
+            os.remove(partial_path)
+            raise
+
+        self._evict(keep={path, *pinned})
+        return path
+
+    def _evict(self, keep: Collection[str]) -> None:
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.PARTIAL_SUFFIX) or not entry.is_file():
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path in keep:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                # Already evicted by another worker
+                total -= size
+        if total > self.max_bytes:
+            logger.warning(
+                "Scratch cache %s holds %d bytes, over its %d byte limit",
+                self.directory,
+                total,
+                self.max_bytes,
+            )
+
+
+scratch_cache_service = ScratchCacheService()
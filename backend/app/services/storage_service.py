@@ -4,6 +4,7 @@ from typing import Any
 
 import boto3
 from botocore.client import Config
+from botocore.exceptions import ClientError
 from PIL import Image
 
 from app.core.config import settings
@@ -107,6 +108,10 @@ class StorageService:
             logger.error("Error generating thumbnail: %s", e)
             raise
 
+    def download_to_file(self, file_key: str, file_path: str) -> None:
+        """Stream an object to a local file in chunks."""
+        self.s3.download_file(self.bucket, file_key, file_path)
+
     def get_url(self, file_key: str) -> str:
         if settings.ENVIRONMENT == "local":
             return f"{settings.S3_ENDPOINT_URL}/{self.bucket}/{file_key}"
@@ -137,6 +142,16 @@ class StorageService:
         )
         return {"url": presigned_url, "key": file_key}
 
+    def get_object_size(self, file_key: str) -> int | None:
+        """Size in bytes of a stored object, or None if it does not exist."""
+        try:
+            response = self.s3.head_object(Bucket=self.bucket, Key=file_key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                return None
+            raise
+        return int(response["ContentLength"])
+
     def delete_file(self, file_key: str) -> None:
         self.s3.delete_object(Bucket=self.bucket, Key=file_key)
 
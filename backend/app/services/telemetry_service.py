@@ -0,0 +1,308 @@
+import csv
+import io
+import logging
+import threading
+import uuid
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from datetime import UTC, date, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import insert, text
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.database import engine
+from app.models.telemetry_event import TelemetryEvent
+from app.schemas.telemetry import TelemetryEventIn
+
+logger = logging.getLogger(__name__)
+
+# Customer journey screens, in flow order
+FLOW_SCREENS = (
+    "property_type",
+    "property_details",
+    "location",
+    "photo_capture",
+    "photo_review",
+    "submit",
+)
+
+COLUMNS = (
+    "id",
+    "occurred_at",
+    "session_id",
+    "event_type",
+    "screen",
+    "user_id",
+    "received_at",
+)
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=UTC) if value.tzinfo is None else value
+
+
+def _month_start(day: date, months: int = 0) -> date:
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+class TelemetryService:
+    """
+    In-process buffer for client telemetry events.
+
+    Requests only append to the buffer; a background thread writes it out
+    in bulk (COPY on PostgreSQL, a multi-row INSERT elsewhere) every
+    TELEMETRY_FLUSH_INTERVAL_SECONDS, or as soon as TELEMETRY_FLUSH_EVENTS
+    are waiting. Once TELEMETRY_BUFFER_MAX_EVENTS are buffered, new batches
+    are refused so clients back off and retry instead of the process
+    growing without bound.
+    """
+
+    def __init__(self, bind: Engine | None = None) -> None:
+        self.bind = bind or engine
+        self._buffer: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def add(
+        self, events: Iterable[TelemetryEventIn], user_id: uuid.UUID | None = None
+    ) -> bool:
+        """Buffer a batch of events. Returns False if the buffer is full."""
+        received_at = datetime.now(UTC)
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "occurred_at": _as_utc(event.occurred_at),
+                "session_id": event.session_id,
+                "event_type": event.event_type,
+                "screen": event.screen,
+                "user_id": user_id,
+                "received_at": received_at,
+            }
+            for event in events
+        ]
+        with self._lock:
+            if len(self._buffer) + len(rows) > settings.TELEMETRY_BUFFER_MAX_EVENTS:
+                return False
+            self._buffer.extend(rows)
+            full = len(self._buffer) >= settings.TELEMETRY_FLUSH_EVENTS
+        self._ensure_flusher()
+        if full:
+            self._wake.set()
+        return True
+
+    def flush(self, bind: Engine | None = None) -> int:
+        """Write out everything buffered so far. Returns the events written."""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return 0
+            try:
+                self._write(bind or self.bind, rows)
+            except Exception:
+                logger.exception("Failed to flush %d telemetry events", len(rows))
+                with self._lock:
+                    # Keep them for the next flush while there is room
+                    room = settings.TELEMETRY_BUFFER_MAX_EVENTS - len(self._buffer)
+                    if room < len(rows):
+                        logger.warning(
+                            "Dropped %d telemetry events", len(rows) - max(room, 0)
+                        )
+                    self._buffer[:0] = rows[: max(room, 0)]
+                return 0
+            return len(rows)
+
+    def _write(self, bind: Engine, rows: list[dict[str, Any]]) -> None:
+        with bind.begin() as conn:
+            if conn.dialect.name != "postgresql":
+                conn.execute(insert(TelemetryEvent), rows)
+                return
+
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                writer.writerow(
+                    "" if row[column] is None else row[column] for column in COLUMNS
+                )
+            buffer.seek(0)
+            driver_connection = conn.connection.driver_connection
+            assert driver_connection is not None
+            cursor = driver_connection.cursor()
+            try:
+                cursor.copy_expert(
+                    f"COPY telemetryevent ({', '.join(COLUMNS)}) "
+                    "FROM STDIN WITH (FORMAT csv)",
+                    buffer,
+                )
+            finally:
+                cursor.close()
+
+    def _ensure_flusher(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None and not self._stopping:
+                self._thread = threading.Thread(
+                    target=self._run, name="telemetry-flusher", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wake.wait(settings.TELEMETRY_FLUSH_INTERVAL_SECONDS)
+            self._wake.clear()
+            self.flush()
+
+    def close(self) -> None:
+        """
+        Stop the flusher and write out what is left. Events added later
+        start a new flusher, as when the app is started again in-process.
+        """
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            self._thread = None
+            self._stopping = False
+        self._wake.clear()
+        self.flush()
+
+    def ensure_partitions(self, today: date | None = None, months: int = 2) -> int:
+        """
+        Create the monthly partitions from this month on (PostgreSQL only),
+        each in its own transaction so one failure does not undo the rest.
+        Returns the number that could not be created.
+        """
+        if self.bind.dialect.name != "postgresql":
+            return 0
+        start = _month_start(today or datetime.now(UTC).date())
+        failed = 0
+        for offset in range(months):
+            lower = _month_start(start, offset)
+            upper = _month_start(start, offset + 1)
+            try:
+                with self.bind.begin() as conn:
+                    conn.execute(
+                        text(
+                            f"CREATE TABLE IF NOT EXISTS "
+                            f"telemetryevent_{lower:%Y_%m} "
+                            "PARTITION OF telemetryevent "
+                            f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+                        )
+                    )
+            except Exception:
+                # Typically rows for this month already sit in the default
+                # partition; they have to be moved out by hand
+                logger.exception("Failed to create telemetry partition %s", lower)
+                failed += 1
+        return failed
+
+
+class DropOffAggregator:
+    """
+    Per-screen visitors, drop-offs and dwell time in a single pass over
+    events ordered by session and time.
+
+    Only the current session is held in memory. A session drops off at its
+    last viewed screen unless it sent a 'complete' event; sessions active
+    after active_since may still continue and are not counted. Dwell time
+    is the gap between a screen view and the session's next event, kept as
+    a per-second histogram so the median needs no list of samples.
+    """
+
+    def __init__(self, *, active_since: datetime, max_dwell: timedelta) -> None:
+        self.active_since = _as_utc(active_since)
+        self.max_dwell = max_dwell
+        self.visitors: Counter[str] = Counter()
+        self.drop_offs: Counter[str] = Counter()
+        self.dwell: defaultdict[str, Counter[int]] = defaultdict(Counter)
+        self._reset(None)
+
+    def _reset(self, session_id: str | None) -> None:
+        self._session_id = session_id
+        self._seen: set[str] = set()
+        self._view: tuple[str, datetime] | None = None
+        self._last_screen: str | None = None
+        self._last_at: datetime | None = None
+        self._completed = False
+
+    def _end_session(self) -> None:
+        if (
+            self._last_screen is not None
+            and not self._completed
+            and self._last_at is not None
+            and self._last_at < self.active_since
+        ):
+            self.drop_offs[self._last_screen] += 1
+
+    def add(
+        self, session_id: str, event_type: str, screen: str, occurred_at: datetime
+    ) -> None:
+        occurred_at = _as_utc(occurred_at)
+        if session_id != self._session_id:
+            self._end_session()
+            self._reset(session_id)
+
+        if self._view is not None:
+            viewed, viewed_at = self._view
+            dwell = occurred_at - viewed_at
+            if timedelta(0) <= dwell <= self.max_dwell:
+                self.dwell[viewed][int(dwell.total_seconds())] += 1
+            self._view = None
+
+        if event_type == "screen_view":
+            if screen not in self._seen:
+                self._seen.add(screen)
+                self.visitors[screen] += 1
+            self._view = (screen, occurred_at)
+            self._last_screen = screen
+        elif event_type == "complete":
+            self._completed = True
+        self._last_at = occurred_at
+
+    @staticmethod
+    def _median(histogram: Counter[int]) -> float | None:
+        total = sum(histogram.values())
+        if not total:
+            return None
+        ranks = {(total - 1) // 2, total // 2}
+        values = []
+        seen = 0
+        for seconds in sorted(histogram):
+            seen += histogram[seconds]
+            while ranks and min(ranks) < seen:
+                ranks.remove(min(ranks))
+                values.append(seconds)
+        return sum(values) / len(values)
+
+    def result(self) -> list[dict[str, Any]]:
+        self._end_session()
+        self._reset(None)
+        screens = [screen for screen in FLOW_SCREENS if screen in self.visitors]
+        screens += sorted(set(self.visitors) - set(FLOW_SCREENS))
+        return [
+            {
+                "screen": screen,
+                "visitors": self.visitors[screen],
+                "drop_offs": self.drop_offs[screen],
+                "drop_off_rate": round(
+                    self.drop_offs[screen] / self.visitors[screen] * 100, 1
+                ),
+                "median_time_seconds": self._median(self.dwell[screen]),
+            }
+            for screen in screens
+        ]
+
+
+telemetry_service = TelemetryService()
@@ -0,0 +1,167 @@
+"""
+PropFlow Valuation Engine
+Suggests a value for a property from nearby comparable sales and the
+precomputed price-per-sqft grids
+"""
+
+import math
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.crud_comp import comp as crud_comp
+from app.crud.crud_price_grid import (
+    geohash_cell,
+    months_since,
+    pincode_cell,
+    price_grid,
+)
+from app.models.price_grid import PricePerSqftCell
+from app.models.property import Property, PropertyType
+
+
+class ValuationEngine:
+    """
+    Blends the price per sqft of the nearest comparables, each adjusted to
+    the subject's area and to today's prices along the local trend, with
+    the median of the finest grid cell holding enough sales. The subject's
+    age and floor are then priced in; comparables carry neither, so they
+    are taken to be typical of the area.
+    """
+
+    # Comparables from half to one and a half times the subject's area
+    AREA_BAND = 0.5
+    # Price per sqft goes as area ** AREA_ELASTICITY, 7% less per doubling
+    AREA_ELASTICITY = -0.1
+    # A comparable this far away counts half as much as one next door
+    DISTANCE_SCALE_KM = 1.0
+    # A comparable sold this long ago counts half as much as one sold today
+    RECENCY_HALF_LIFE_MONTHS = 12.0
+    # Weight of the grid median, in comparables next door sold today
+    GRID_PRIOR_WEIGHT = 2.0
+    # Log price per sqft spread assumed where no grid cell gives one
+    DEFAULT_LOG_SPREAD = 0.25
+    DEPRECIATION_PER_YEAR = 0.01
+    REFERENCE_AGE = 10
+    MAX_AGE = 40
+    FLOOR_PREMIUM = 0.005
+    REFERENCE_FLOOR = 2
+    MAX_FLOOR = 30
+    # Two-sided 80% interval
+    INTERVAL_Z = 1.2816
+
+    def grid_cell(self, db: Session, property_obj: Property) -> PricePerSqftCell | None:
+        """The finest cell around the property with enough sales, if any."""
+        names = []
+        if property_obj.lat is not None and property_obj.lng is not None:
+            names += [
+                geohash_cell(property_obj.lat, property_obj.lng, precision)
+                for precision in price_grid.GEOHASH_PRECISIONS
+            ]
+        names.append(pincode_cell(property_obj.pincode))
+        cells = price_grid.get_cells(db, names)
+        return next((cells[name] for name in names if name in cells), None)
+
+    def subject_factor(self, property_obj: Property) -> float:
+        """Multiplier for the subject's age and floor against typical stock."""
+        factor = 1.0
+        if property_obj.age is not None:
+            age = min(max(property_obj.age, 0), self.MAX_AGE)
+            factor *= (1 - self.DEPRECIATION_PER_YEAR) ** (age - self.REFERENCE_AGE)
+        if (
+            property_obj.property_type == PropertyType.APARTMENT
+            and property_obj.floor is not None
+        ):
+            floor = min(max(property_obj.floor, 0), self.MAX_FLOOR)
+            factor *= 1 + self.FLOOR_PREMIUM * (floor - self.REFERENCE_FLOOR)
+        return factor
+
+    def suggest(self, db: Session, property_obj: Property) -> dict[str, Any] | None:
+        """
+        Suggested value with an 80% interval, a 0-1 confidence and the
+        comparables used as (comparable, km), heaviest first. None when
+        there are neither comparables nor a grid cell to go on, or no
+        positive area to scale a price per sqft by.
+        """
+        now = datetime.now(UTC)
+        area = property_obj.area_sqft
+        if area <= 0:
+            return None
+        cell = self.grid_cell(db, property_obj)
+        log_trend = math.log1p(cell.monthly_trend) if cell else 0.0
+
+        nearest = []
+        if property_obj.lat is not None and property_obj.lng is not None:
+            nearest = crud_comp.get_nearest(
+                db,
+                lat=property_obj.lat,
+                lng=property_obj.lng,
+                k=settings.VALUATION_COMPS,
+                radius_km=settings.VALUATION_COMP_RADIUS_KM,
+                min_area_sqft=area * (1 - self.AREA_BAND),
+                max_area_sqft=area * (1 + self.AREA_BAND),
+                sold_since=now - timedelta(days=settings.PRICE_GRID_LOOKBACK_DAYS),
+            )
+        if not nearest and cell is None:
+            return None
+
+        comp_values, comp_weights = np.empty(0), np.empty(0)
+        if nearest:
+            comps, km = zip(*nearest, strict=True)
+            comp_areas = np.array([c.area_sqft for c in comps])
+            months = np.array([months_since(c.sale_date, now) for c in comps])
+            comp_values = (
+                np.log(np.array([c.sale_price for c in comps]) / comp_areas)
+                + months * log_trend
+                + self.AREA_ELASTICITY * np.log(area / comp_areas)
+            )
+            comp_weights = 0.5 ** (months / self.RECENCY_HALF_LIFE_MONTHS) / (
+                1 + (np.array(km) / self.DISTANCE_SCALE_KM) ** 2
+            )
+
+        values, weights = comp_values, comp_weights
+        prior_spread = self.DEFAULT_LOG_SPREAD
+        if cell is not None:
+            if cell.ppsf_p75 > cell.ppsf_p25:
+                # The interquartile range of a normal distribution is 1.349 sigma
+                prior_spread = math.log(cell.ppsf_p75 / cell.ppsf_p25) / 1.349
+            values = np.append(values, math.log(cell.ppsf_median))
+            weights = np.append(weights, self.GRID_PRIOR_WEIGHT)
+        log_ppsf = float(np.average(values, weights=weights))
+
+        # The comparables' scatter, steadied by the prior spread
+        comp_weight = float(comp_weights.sum())
+        scatter = float(np.sum(comp_weights * (comp_values - log_ppsf) ** 2))
+        spread = math.sqrt(
+            (scatter + self.GRID_PRIOR_WEIGHT * prior_spread**2)
+            / (comp_weight + self.GRID_PRIOR_WEIGHT)
+        )
+        effective_n = weights.sum() ** 2 / (weights**2).sum()
+        sigma = spread * math.sqrt(1 + 1 / effective_n)
+
+        value = math.exp(log_ppsf) * area * self.subject_factor(property_obj)
+        low = value * math.exp(-self.INTERVAL_Z * sigma)
+        high = value * math.exp(self.INTERVAL_Z * sigma)
+
+        ranked = sorted(
+            zip(nearest, comp_weights, strict=True),
+            key=lambda pair: -pair[1],
+        )
+        return {
+            "property_id": property_obj.id,
+            "estimated_value": round(value, -3),
+            "value_low": round(low, -3),
+            "value_high": round(high, -3),
+            "confidence_score": round(max(0.0, 1 - (high - low) / (2 * value)), 2),
+            "price_per_sqft": round(value / area, 2),
+            "grid_cell": cell.cell if cell else None,
+            "grid_comp_count": cell.comp_count if cell else 0,
+            "grid_refreshed_at": cell.refreshed_at if cell else None,
+            "comps": [pair for pair, _ in ranked],
+        }
+
+
+valuation_engine = ValuationEngine()
@@ -0,0 +1,65 @@
+import logging
+from typing import Any
+
+from app.celery_app import celery_app
+from app.crud.crud_daily_rollup import daily_rollup
+from app.crud.crud_kpi_counter import kpi_counter
+from app.database import SessionLocal
+from app.services.telemetry_service import telemetry_service
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="reconcile_kpi_counters")  # type: ignore
+def reconcile_kpi_counters() -> dict[str, Any]:
+    """
+    Periodic task to rebuild the KPI counters from the base tables.
+    Corrects any drift from writes that bypassed the CRUD layer.
+    """
+    db = SessionLocal()
+    try:
+        counters = kpi_counter.rebuild(db)
+        logger.info("Rebuilt %d KPI counters", counters)
+        return {"status": "completed", "counters": counters}
+    except Exception as e:
+        db.rollback()
+        logger.error("KPI counter reconciliation error: %s", e)
+        return {"status": "failed", "error": str(e)}
+    finally:
+        db.close()
+
+
+@celery_app.task(name="refresh_daily_rollups")  # type: ignore
+def refresh_daily_rollups(full: bool = False) -> dict[str, Any]:
+    """
+    Periodic task to refresh the daily property rollups.
+    Only days touched since the last refresh are recomputed unless full
+    is set, which rebuilds every day and drops deleted properties.
+    """
+    db = SessionLocal()
+    try:
+        days = daily_rollup.refresh(db, full=full)
+        logger.info("Refreshed %d days of property rollups (full=%s)", days, full)
+        return {"status": "completed", "days": days}
+    except Exception as e:
+        db.rollback()
+        logger.error("Daily rollup refresh error: %s", e)
+        return {"status": "failed", "error": str(e)}
+    finally:
+        db.close()
+
+
+@celery_app.task(name="ensure_telemetry_partitions")  # type: ignore
+def ensure_telemetry_partitions() -> dict[str, Any]:
+    """
+    Periodic task creating this and next month's telemetry event partitions
+    ahead of the events that land in them.
+    """
+    try:
+        failed = telemetry_service.ensure_partitions()
+        if failed:
+            return {"status": "failed", "failed_partitions": failed}
+        return {"status": "completed"}
+    except Exception as e:
+        logger.error("Telemetry partition error: %s", e)
+        return {"status": "failed", "error": str(e)}
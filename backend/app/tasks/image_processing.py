@@ -1,12 +1,252 @@
+import logging
+import mmap
+import os
 import uuid
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
+from sqlalchemy.orm import Session
+
 from app.celery_app import celery_app
+from app.core.config import settings
 from app.crud.crud_photo import photo as crud_photo
 from app.database import SessionLocal
-from app.models.photo import QCStatus
+from app.models.photo import PropertyPhoto, QCStatus
+from app.models.property import Property
+from app.services.image_pool_service import StageTimer, image_pool_service
 from app.services.image_service import image_service
+from app.services.scratch_cache_service import scratch_cache_service
+from app.services.storage_service import storage_service
+
+logger = logging.getLogger(__name__)
+
+
+def rendition_key(s3_key: str, name: str, image_format: str) -> str:
+    """Storage key of a rendition uploaded alongside a photo."""
+    extension = "jpg" if image_format == "JPEG" else image_format.lower()
+    return f"{os.path.splitext(s3_key)[0]}_{name}.{extension}"
+
+
+def _analyze_photo(
+    file_path: str, property_lat: float | None, property_lng: float | None
+) -> tuple[dict[str, Any], dict[str, dict[str, Any]], dict[str, float]]:
+    """
+    Extract EXIF, render derivatives and QC a single locally cached photo.
+    The file is memory-mapped once and the same buffer is handed to every
+    stage. Returns the PropertyPhoto fields to update, the encoded
+    renditions and per-stage timings in ms. Kept free of DB and storage access so it
+    can run in an image pool worker.
+    """
+    timer = StageTimer()
+
+    with (
+        open(file_path, "rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer,
+    ):
+        # Extract EXIF
+        with timer.stage("exif"):
+            exif_data = image_service.get_exif_data(buffer)
+
+        # Render the configured sizes and formats for delivery
+        with timer.stage("encode"):
+            renditions = image_service.render_renditions(buffer)
+
+        # Perform QC
+        with timer.stage("qc"):
+            qc_data = image_service.perform_qc_checks(buffer)
+
+    metadata_failures: list[str] = []
+    captured_at = exif_data.get("captured_at")
+    if captured_at is None:
+        metadata_failures.append("Missing capture timestamp metadata")
+    else:
+        captured_at_utc = (
+            captured_at.replace(tzinfo=UTC)
+            if captured_at.tzinfo is None
+            else captured_at.astimezone(UTC)
+        )
+        if captured_at_utc < datetime.now(UTC) - timedelta(minutes=30):
+            metadata_failures.append("Capture timestamp is older than 30 minutes")
+
+    if not exif_data.get("device_model"):
+        metadata_failures.append("Missing device model metadata")
+
+    gps_lat = exif_data.get("gps_lat")
+    gps_lng = exif_data.get("gps_lng")
+    if gps_lat is None or gps_lng is None:
+        metadata_failures.append("Missing GPS metadata")
+    elif property_lat is not None and property_lng is not None:
+        distance_km = image_service.haversine_distance(
+            gps_lat,
+            gps_lng,
+            property_lat,
+            property_lng,
+        )
+        if distance_km > 0.5:
+            metadata_failures.append(
+                f"Photo GPS mismatch: {distance_km:.2f}km from property"
+            )
+
+    # Update photo record
+    is_verified = not (
+        qc_data["is_blurry"]
+        or qc_data["is_too_dark"]
+        or qc_data["is_too_bright"]
+        or metadata_failures
+    )
+
+    qc_notes = f"QC results: {qc_data}"
+    if metadata_failures:
+        qc_notes = f"{qc_notes}; metadata failures: {metadata_failures}"
+
+    # Map QC data to model fields
+    update_data = {
+        "captured_at": exif_data.get("captured_at"),
+        "device_model": exif_data.get("device_model"),
+        "gps_lat": exif_data.get("gps_lat"),
+        "gps_lng": exif_data.get("gps_lng"),
+        "qc_status": QCStatus.APPROVED if is_verified else QCStatus.REJECTED,
+        "qc_notes": qc_notes,
+    }
+    return update_data, renditions, timer.timings
+
+
+def _duplicate_update(
+    file_path: str, original_id: uuid.UUID, original: dict[str, Any]
+) -> dict[str, Any]:
+    """
+    PropertyPhoto fields for a near-duplicate: its own EXIF, with the QC
+    result and renditions of the original reused and the photo flagged for
+    fraud review.
+    """
+    exif_data = image_service.get_exif_data(file_path)
+    return {
+        "captured_at": exif_data.get("captured_at"),
+        "device_model": exif_data.get("device_model"),
+        "gps_lat": exif_data.get("gps_lat"),
+        "gps_lng": exif_data.get("gps_lng"),
+        "qc_status": original["qc_status"],
+        "qc_notes": (
+            f"Near-duplicate of photo {original_id}, QC reused; "
+            f"{original['qc_notes']}"
+        ),
+        "renditions": original.get("renditions"),
+        "duplicate_of_id": original_id,
+        "flagged_for_review": True,
+    }
+
+
+def _process_photos(
+    db: Session,
+    photo_ids: list[uuid.UUID],
+    s3_keys: list[str],
+    property_lat: float | None,
+    property_lng: float | None,
+) -> list[tuple[dict[str, Any], dict[str, float]]]:
+    """
+    Fetch photos into the scratch cache and hash them. Near-duplicates of
+    a stored photo or of an earlier photo in the same job reuse that
+    photo's results; the rest are analyzed on the image pool and every
+    rendition is uploaded back to storage next to the original.
+    """
+    max_distance = settings.PHOTO_DUPLICATE_MAX_DISTANCE
+    timers = [StageTimer() for _ in s3_keys]
+    file_paths: list[str] = []
+    hashes: list[int | None] = []
+    for s3_key, timer in zip(s3_keys, timers, strict=True):
+        with timer.stage("download"):
+            # The batch's earlier files stay on disk until they are processed
+            file_paths.append(scratch_cache_service.fetch(s3_key, file_paths))
+        with timer.stage("hash"):
+            hashes.append(image_service.dhash(file_paths[-1]))
+
+    # Per duplicate: a stored original, or the index of one in this job
+    originals: dict[int, PropertyPhoto | int] = {}
+    for index, (phash, timer) in enumerate(zip(hashes, timers, strict=True)):
+        if phash is None:
+            continue
+        with timer.stage("dedupe"):
+            original: PropertyPhoto | int | None = crud_photo.find_duplicate(
+                db, phash=phash, max_distance=max_distance, exclude_ids=photo_ids
+            )
+            if original is None:
+                original = next(
+                    (
+                        earlier
+                        for earlier, earlier_hash in enumerate(hashes[:index])
+                        if earlier not in originals
+                        and earlier_hash is not None
+                        and image_service.hamming_distance(phash, earlier_hash)
+                        <= max_distance
+                    ),
+                    None,
+                )
+        if original is not None:
+            originals[index] = original
+
+    pending = [index for index in range(len(s3_keys)) if index not in originals]
+    results = dict(
+        zip(
+            pending,
+            image_pool_service.map(
+                _analyze_photo,
+                [(file_paths[index], property_lat, property_lng) for index in pending],
+                [
+                    image_pool_service.estimate_pixel_bytes(file_paths[index])
+                    for index in pending
+                ],
+            ),
+            strict=True,
+        )
+    )
+
+    processed: list[tuple[dict[str, Any], dict[str, float]]] = []
+    for index, (s3_key, timer) in enumerate(zip(s3_keys, timers, strict=True)):
+        original = originals.get(index)
+        if isinstance(original, int):
+            with timer.stage("exif"):
+                update_data = _duplicate_update(
+                    file_paths[index], photo_ids[original], processed[original][0]
+                )
+            timings: dict[str, float] = {}
+        elif original is not None:
+            with timer.stage("exif"):
+                update_data = _duplicate_update(
+                    file_paths[index],
+                    original.id,
+                    {
+                        "qc_status": original.qc_status,
+                        "qc_notes": original.qc_notes,
+                        "renditions": original.renditions,
+                    },
+                )
+            timings = {}
+        else:
+            update_data, renditions, timings = results[index]
+            uploaded = {}
+            with timer.stage("upload"):
+                for name, rendition in renditions.items():
+                    key = rendition_key(s3_key, name, rendition["format"])
+                    uploaded[name] = {
+                        "key": key,
+                        "url": storage_service.upload_file(
+                            rendition["data"],
+                            key,
+                            content_type=rendition["content_type"],
+                        ),
+                        "format": rendition["format"],
+                        "width": rendition["width"],
+                        "height": rendition["height"],
+                        "size_bytes": len(rendition["data"]),
+                    }
+            if uploaded:
+                update_data["renditions"] = uploaded
+            update_data["duplicate_of_id"] = None
+            update_data["flagged_for_review"] = False
+
+        update_data.update(crud_photo.hash_fields(hashes[index]))
+        processed.append((update_data, {**timer.timings, **timings}))
+    return processed
 
 
 @celery_app.task(
@@ -16,10 +256,11 @@ from app.services.image_service import image_service
     retry_backoff=True,
     retry_kwargs={"max_retries": 5},
 )  # type: ignore
-def process_photo(self, photo_id: str, file_path: str) -> dict[str, Any]:
+def process_photo(self, photo_id: str, s3_key: str | None = None) -> dict[str, Any]:
     """
     Background task to process an uploaded photo.
-    Extracts EXIF and performs QC checks.
+    Fetches it from storage, extracts EXIF, performs QC checks and uploads
+    its renditions, or reuses the results of a near-duplicate photo.
     """
     db = SessionLocal()
     try:
@@ -28,72 +269,85 @@ def process_photo(self, photo_id: str, file_path: str) -> dict[str, Any]:
         if not photo_obj:
             return {"error": "Photo not found"}
 
-        # Extract EXIF
-        exif_data = image_service.get_exif_data(file_path)
+        update_data, timings = _process_photos(
+            db,
+            [photo_obj.id],
+            [s3_key or photo_obj.s3_key],
+            photo_obj.property.lat,
+            photo_obj.property.lng,
+        )[0]
+        crud_photo.update(db, db_obj=photo_obj, obj_in=update_data)
+        logger.info("Processed photo %s, stage timings (ms): %s", photo_id, timings)
 
-        # Optimize image for storage and delivery
-        image_service.optimize_image(file_path)
+        return {"status": "completed", "photo_id": photo_id, "timings": timings}
+    except Exception as e:
+        return {"error": str(e)}
+    finally:
+        db.close()
 
-        # Perform QC
-        qc_data = image_service.perform_qc_checks(file_path)
 
-        metadata_failures: list[str] = []
-        captured_at = exif_data.get("captured_at")
-        if captured_at is None:
-            metadata_failures.append("Missing capture timestamp metadata")
-        else:
-            captured_at_utc = (
-                captured_at.replace(tzinfo=UTC)
-                if captured_at.tzinfo is None
-                else captured_at.astimezone(UTC)
-            )
-            if captured_at_utc < datetime.now(UTC) - timedelta(minutes=30):
-                metadata_failures.append("Capture timestamp is older than 30 minutes")
-
-        if not exif_data.get("device_model"):
-            metadata_failures.append("Missing device model metadata")
-
-        gps_lat = exif_data.get("gps_lat")
-        gps_lng = exif_data.get("gps_lng")
-        if gps_lat is None or gps_lng is None:
-            metadata_failures.append("Missing GPS metadata")
-        elif photo_obj.property.lat is not None and photo_obj.property.lng is not None:
-            distance_km = image_service.haversine_distance(
-                gps_lat,
-                gps_lng,
-                photo_obj.property.lat,
-                photo_obj.property.lng,
-            )
-            if distance_km > 0.5:
-                metadata_failures.append(
-                    f"Photo GPS mismatch: {distance_km:.2f}km from property"
-                )
+@celery_app.task(
+    name="process_photo_batch",
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    retry_kwargs={"max_retries": 5},
+)  # type: ignore
+def process_photo_batch(
+    self, property_id: str, photo_ids: list[str] | None = None
+) -> dict[str, Any]:
+    """
+    Background task to QC the photos of a property in one pass, either all
+    of them or only the given photo_ids.
+    CPU work is spread over a process pool and all results are written
+    with a single bulk UPDATE.
+    """
+    db = SessionLocal()
+    try:
+        property_uuid = uuid.UUID(property_id)
+        property_obj = db.get(Property, property_uuid)
+        if not property_obj:
+            return {"error": "Property not found"}
 
-        # Update photo record
-        is_verified = not (
-            qc_data["is_blurry"]
-            or qc_data["is_too_dark"]
-            or qc_data["is_too_bright"]
-            or metadata_failures
-        )
+        photos = crud_photo.get_by_property(db, property_id=property_uuid)
+        if photo_ids is not None:
+            requested = {uuid.UUID(photo_id) for photo_id in photo_ids}
+            photos = [photo for photo in photos if photo.id in requested]
+        if not photos:
+            return {"error": "No photos found"}
 
-        qc_notes = f"QC results: {qc_data}"
-        if metadata_failures:
-            qc_notes = f"{qc_notes}; metadata failures: {metadata_failures}"
-
-        # Map QC data to model fields
-        update_data = {
-            "captured_at": exif_data.get("captured_at"),
-            "device_model": exif_data.get("device_model"),
-            "gps_lat": exif_data.get("gps_lat"),
-            "gps_lng": exif_data.get("gps_lng"),
-            "qc_status": QCStatus.APPROVED if is_verified else QCStatus.REJECTED,
-            "qc_notes": qc_notes,
+        photo_uuids = [photo.id for photo in photos]
+        results = _process_photos(
+            db,
+            photo_uuids,
+            [photo.s3_key for photo in photos],
+            property_obj.lat,
+            property_obj.lng,
+        )
+        crud_photo.update_many(
+            db,
+            updates=[
+                {"id": photo_id, **update_data}
+                for photo_id, (update_data, _) in zip(photo_uuids, results, strict=True)
+            ],
+        )
+        timings = {
+            str(photo_id): photo_timings
+            for photo_id, (_, photo_timings) in zip(photo_uuids, results, strict=True)
         }
+        logger.info(
+            "Processed %d photos for property %s, stage timings (ms): %s",
+            len(photo_uuids),
+            property_id,
+            timings,
+        )
 
-        crud_photo.update(db, db_obj=photo_obj, obj_in=update_data)
-
-        return {"status": "completed", "photo_id": photo_id}
+        return {
+            "status": "completed",
+            "property_id": property_id,
+            "photo_ids": [str(photo_id) for photo_id in photo_uuids],
+            "timings": timings,
+        }
     except Exception as e:
         return {"error": str(e)}
     finally:
@@ -0,0 +1,27 @@
+import logging
+from typing import Any
+
+from app.celery_app import celery_app
+from app.crud.crud_price_grid import price_grid
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="refresh_price_grids")  # type: ignore
+def refresh_price_grids() -> dict[str, Any]:
+    """
+    Nightly task rebuilding the price-per-sqft grids the valuation engine
+    reads from recent comparable sales.
+    """
+    db = SessionLocal()
+    try:
+        cells = price_grid.refresh(db)
+        logger.info("Rebuilt %d price-per-sqft grid cells", cells)
+        return {"status": "completed", "cells": cells}
+    except Exception as e:
+        db.rollback()
+        logger.error("Price grid refresh error: %s", e)
+        return {"status": "failed", "error": str(e)}
+    finally:
+        db.close()
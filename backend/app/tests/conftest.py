@@ -4,17 +4,18 @@
 # let's try to use a mock for the database if SQLite fails on UUID.
 # Actually, the best way for SQLite is to use a GUID type that maps to String.
 import uuid
-from collections.abc import Generator
+from collections.abc import Callable, Generator, Iterator
+from contextlib import AbstractContextManager, contextmanager
 from typing import Any
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.types import CHAR, TypeDecorator
 
-from app.api.deps import get_db
+from app.api.deps import get_db, get_session_factory
 from app.database import Base
 from app.main import app
 
@@ -91,6 +92,38 @@ def client(db: Session) -> Generator[TestClient, None, None]:
             pass
 
     app.dependency_overrides[get_db] = override_get_db
+    # Streaming endpoints open their own sessions, on the test database too
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def assert_max_queries(
+    db: Session,
+) -> Callable[[int], AbstractContextManager[list[str]]]:
+    """
+    Fails the test if the block runs more than the given number of SQL
+    statements. Yields the list of statements as they run.
+    """
+
+    @contextmanager
+    def counter(limit: int) -> Iterator[list[str]]:
+        statements: list[str] = []
+
+        def record(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+            statements.append(statement)
+
+        bind = db.get_bind()
+        event.listen(bind, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(bind, "before_cursor_execute", record)
+        assert len(statements) <= limit, (
+            f"{len(statements)} queries, expected at most {limit}:\n"
+            + "\n".join(statements)
+        )
+
+    return counter
@@ -0,0 +1,403 @@
+import uuid
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app import crud, models, schemas
+from app.core.config import settings
+from app.crud.crud_daily_rollup import MEASURES
+from app.models.photo import QCStatus
+from app.models.property import PropertyStatus
+from app.services.analytics_service import AnalyticsService
+from app.services.telemetry_service import TelemetryService, telemetry_service
+
+
+def _seed(db: Session) -> None:
+    user = crud.user.create(
+        db,
+        obj_in=schemas.UserCreate(
+            phone=f"+1{str(uuid.uuid4().int)[:10]}", name="KPI User", password="pw"
+        ),
+    )
+    now = datetime.now(UTC)
+    statuses = [
+        (PropertyStatus.DRAFT, None, None, None),
+        (PropertyStatus.SUBMITTED, timedelta(minutes=30), None, None),
+        (PropertyStatus.SUBMITTED, timedelta(hours=2), None, None),
+        (PropertyStatus.SUBMITTED, timedelta(days=3), None, None),
+        (PropertyStatus.UNDER_REVIEW, timedelta(hours=5), None, None),
+        (PropertyStatus.VALUED, timedelta(days=2), timedelta(days=1), 5_000_000.0),
+        (PropertyStatus.APPROVED, timedelta(days=40), timedelta(days=39), 800_000.0),
+    ]
+    for status, submitted_ago, reviewed_ago, value in statuses:
+        prop = crud.property.create_with_owner(
+            db,
+            obj_in=schemas.PropertyCreate(
+                address="1 KPI St",
+                city="KPI City",
+                state="KS",
+                pincode="10101",
+                property_type=models.PropertyType.HOUSE,
+                area_sqft=1000.0,
+            ),
+            user_id=user.id,
+        )
+        prop.status = status
+        prop.submitted_at = now - submitted_ago if submitted_ago else None
+        prop.reviewed_at = now - reviewed_ago if reviewed_ago else None
+        prop.estimated_value = value
+        db.add(prop)
+        photo = crud.photo.create_with_property(
+            db,
+            obj_in=schemas.PropertyPhotoCreate(
+                property_id=prop.id, s3_key="kpi.jpg", s3_url="http://mock-s3/kpi.jpg"
+            ),
+        )
+        photo.qc_status = QCStatus.APPROVED if value else QCStatus.REJECTED
+        db.add(photo)
+    db.commit()
+
+
+def _as_utc(value: datetime | None) -> datetime | None:
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=UTC)
+
+
+def test_kpi_dashboard_matches_row_by_row_counts(
+    db: Session, assert_max_queries: Callable[[int], Any]
+) -> None:
+    _seed(db)
+    crud.daily_rollup.refresh(db, full=True)
+
+    # Aggregates plus one rollup read, however large the table
+    with assert_max_queries(2):
+        dashboard = AnalyticsService(db).get_kpi_dashboard()
+
+    properties = db.query(models.Property).all()
+    now = datetime.now(UTC)
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    submitted = [_as_utc(prop.submitted_at) for prop in properties]
+
+    submissions = dashboard["submission_metrics"]
+    assert submissions["total"] == sum(
+        prop.status != PropertyStatus.DRAFT for prop in properties
+    )
+    assert submissions["today"] == sum(
+        at is not None and at >= today for at in submitted
+    )
+    assert submissions["month"] == sum(
+        at is not None and at >= today - timedelta(days=30) for at in submitted
+    )
+
+    pending = [
+        _as_utc(prop.submitted_at)
+        for prop in properties
+        if prop.status == PropertyStatus.SUBMITTED
+    ]
+    review = dashboard["review_metrics"]
+    assert review["pending_queue"] == len(pending)
+    assert sum(review["queue_age_distribution"].values()) == sum(
+        at is not None for at in pending
+    )
+    assert review["queue_age_distribution"]["over_24_hours"] == sum(
+        at is not None and at < now - timedelta(hours=24) for at in pending
+    )
+
+    valuations = dashboard["valuation_metrics"]
+    assert valuations["total_valued"] == sum(
+        prop.status == PropertyStatus.VALUED for prop in properties
+    )
+    assert valuations["total_portfolio_value"] == sum(
+        prop.estimated_value or 0 for prop in properties
+    )
+
+    photos = db.query(models.PropertyPhoto).all()
+    quality = dashboard["quality_metrics"]
+    assert quality["total_photos"] == len(photos)
+    assert quality["photos_approved"] == sum(
+        photo.qc_status == QCStatus.APPROVED for photo in photos
+    )
+
+    trends = dashboard["trends"]
+    assert len(trends["daily_submissions"]) == AnalyticsService.TREND_DAYS
+    assert trends["daily_submissions"][-1]["date"] == today.date().isoformat()
+    assert sum(day["count"] for day in trends["daily_valuations"]) >= 1
+
+
+def test_funnel_analysis_from_rollup(db: Session) -> None:
+    crud.daily_rollup.refresh(db, full=True)
+    funnel = AnalyticsService(db).get_funnel_analysis()
+
+    stages = funnel["stages"]
+    assert stages["started"] == db.query(models.Property).count()
+    assert stages["photos_uploaded"] == len(
+        {photo.property_id for photo in db.query(models.PropertyPhoto).all()}
+    )
+    assert stages["valued"] == (
+        db.query(models.Property)
+        .filter(models.Property.status == PropertyStatus.VALUED)
+        .count()
+    )
+
+
+def test_daily_rollup_incremental_refresh_matches_full(db: Session) -> None:
+    crud.daily_rollup.refresh(db, full=True)
+    analytics = AnalyticsService(db)
+    before = analytics.get_funnel_analysis(city="Rollup City")
+    assert before["stages"]["started"] == 0
+
+    _seed(db)
+    owner = db.query(models.User).first()
+    assert owner is not None
+    prop = crud.property.create_with_owner(
+        db,
+        obj_in=schemas.PropertyCreate(
+            address="3 Rollup St",
+            city="Rollup City",
+            state="RS",
+            pincode="30303",
+            property_type=models.PropertyType.LAND,
+            area_sqft=5000.0,
+        ),
+        user_id=owner.id,
+    )
+    crud.property.submit(db, db_obj=prop)
+
+    # Only days touched since the last refresh are recomputed
+    assert crud.daily_rollup.refresh(db) >= 1
+    after = analytics.get_funnel_analysis(
+        city="Rollup City", property_type=models.PropertyType.LAND
+    )
+    assert after["stages"]["started"] == 1
+    assert after["stages"]["submitted"] == 1
+    assert after["stages"]["valued"] == 0
+
+    trends = analytics.get_daily_trends(7, city="Rollup City")
+    assert len(trends["daily_submissions"]) == 7
+    assert trends["daily_submissions"][-1]["count"] == 1
+
+    def rows() -> set[tuple[Any, ...]]:
+        return {
+            (row.day, row.city, row.property_type, row.status)
+            + tuple(getattr(row, name) for name in MEASURES)
+            for row in db.query(models.DailyPropertyRollup).all()
+        }
+
+    incremental = rows()
+    crud.daily_rollup.refresh(db, full=True)
+    assert rows() == incremental
+
+
+def test_kpi_counters_follow_transitions_and_match_rebuild(db: Session) -> None:
+    crud.kpi_counter.rebuild(db)
+    analytics = AnalyticsService(db)
+    before = analytics.get_live_counters()
+
+    owner = crud.user.create(
+        db,
+        obj_in=schemas.UserCreate(
+            phone=f"+1{str(uuid.uuid4().int)[:10]}", name="Owner", password="pw"
+        ),
+    )
+    valuer = crud.user.create(
+        db,
+        obj_in=schemas.UserCreate(
+            phone=f"+1{str(uuid.uuid4().int)[:10]}",
+            name="Valuer",
+            password="pw",
+            role=models.UserRole.VALUER,
+        ),
+    )
+    prop = crud.property.create_with_owner(
+        db,
+        obj_in=schemas.PropertyCreate(
+            address="2 Counter St",
+            city="Counter City",
+            state="CS",
+            pincode="20202",
+            property_type=models.PropertyType.VILLA,
+            area_sqft=2400.0,
+        ),
+        user_id=owner.id,
+    )
+    crud.property.submit(db, db_obj=prop)
+    crud.valuation.create_with_property_update(
+        db,
+        obj_in=schemas.ValuationCreate(
+            property_id=prop.id,
+            estimated_value=9_000_000.0,
+            confidence_score=0.9,
+            valuation_date=datetime.now(UTC),
+        ),
+        valuer_id=valuer.id,
+    )
+
+    after = analytics.get_live_counters()
+    valued = PropertyStatus.VALUED.value
+    assert after["status_counts"][valued] == before["status_counts"][valued] + 1
+    assert after["status_value_sums"][valued] == (
+        before["status_value_sums"][valued] + 9_000_000.0
+    )
+    # The property passed through DRAFT and SUBMITTED without staying there
+    for status in (PropertyStatus.DRAFT.value, PropertyStatus.SUBMITTED.value):
+        assert after["status_counts"][status] == before["status_counts"][status]
+    assert after["daily_submissions"][-1]["count"] == (
+        before["daily_submissions"][-1]["count"] + 1
+    )
+    assert after["valuers"][str(valuer.id)] == {
+        "count": 1,
+        "value_sum": 9_000_000.0,
+    }
+
+    crud.property.remove(db, id=prop.id)
+    incremental = crud.kpi_counter.get_scopes(db)
+    crud.kpi_counter.rebuild(db)
+    rebuilt = crud.kpi_counter.get_scopes(db)
+
+    def non_zero(scopes: dict[str, Any]) -> dict[tuple[str, str], Any]:
+        return {
+            (scope, key): counter
+            for scope, counters in scopes.items()
+            for key, counter in counters.items()
+            if counter["count"]
+        }
+
+    assert non_zero(incremental) == non_zero(rebuilt)
+
+
+def test_telemetry_events_are_buffered_and_aggregated(
+    client: TestClient, db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    phone = f"+1{str(uuid.uuid4().int)[:10]}"
+    crud.user.create(
+        db, obj_in=schemas.UserCreate(phone=phone, name="App User", password="pw")
+    )
+    response = client.post(
+        f"{settings.API_V1_STR}/auth/login/access-token",
+        data={"username": phone, "password": "pw"},
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    # Keep the background flusher out of the way; the test flushes itself
+    monkeypatch.setattr(settings, "TELEMETRY_FLUSH_INTERVAL_SECONDS", 3600.0)
+
+    start = datetime.now(UTC) - timedelta(hours=2)
+    timeline = [
+        # Abandoned on property_details after a minute
+        ("s1", "screen_view", "property_type", 0),
+        ("s1", "screen_view", "property_details", 30),
+        ("s1", "screen_exit", "property_details", 90),
+        # Completed
+        ("s2", "screen_view", "property_type", 0),
+        ("s2", "screen_view", "property_details", 10),
+        ("s2", "complete", "property_details", 30),
+    ]
+    events = [
+        {
+            "session_id": session_id,
+            "event_type": event_type,
+            "screen": screen,
+            "occurred_at": (start + timedelta(seconds=offset)).isoformat(),
+        }
+        for session_id, event_type, screen, offset in timeline
+    ]
+    # Still in progress, so not a drop-off yet
+    events.append(
+        {
+            "session_id": "s3",
+            "event_type": "screen_view",
+            "screen": "property_type",
+            "occurred_at": datetime.now(UTC).isoformat(),
+        }
+    )
+
+    count_before = db.query(models.TelemetryEvent).count()
+    response = client.post(
+        f"{settings.API_V1_STR}/analytics/events",
+        json={"events": events},
+        headers=headers,
+    )
+    assert response.status_code == 202
+    assert response.json() == {"accepted": len(events)}
+    # Nothing is written on the request path
+    assert db.query(models.TelemetryEvent).count() == count_before
+
+    bind = db.get_bind()
+    assert isinstance(bind, Engine)
+    assert telemetry_service.flush(bind=bind) == len(events)
+    assert db.query(models.TelemetryEvent).count() == count_before + len(events)
+
+    screens = {
+        row["screen"]: row for row in AnalyticsService(db).get_drop_off_analysis()
+    }
+    assert list(screens) == ["property_type", "property_details"]
+    assert screens["property_type"]["visitors"] == 3
+    assert screens["property_type"]["drop_offs"] == 0
+    assert screens["property_type"]["median_time_seconds"] == 20
+    assert screens["property_details"]["visitors"] == 2
+    assert screens["property_details"]["drop_offs"] == 1
+    assert screens["property_details"]["drop_off_rate"] == 50.0
+    assert screens["property_details"]["median_time_seconds"] == 40
+
+    monkeypatch.setattr(settings, "TELEMETRY_BUFFER_MAX_EVENTS", 0)
+    response = client.post(
+        f"{settings.API_V1_STR}/analytics/events",
+        json={"events": events[:1]},
+        headers=headers,
+    )
+    assert response.status_code == 503
+
+
+def test_telemetry_flusher_restarts_after_close(db: Session) -> None:
+    bind = db.get_bind()
+    assert isinstance(bind, Engine)
+    service = TelemetryService(bind=bind)
+    event = schemas.TelemetryEventIn(
+        session_id="restart",
+        event_type="screen_view",
+        screen="property_type",
+        occurred_at=datetime.now(UTC),
+    )
+
+    assert service.add([event])
+    assert service._thread is not None
+    service.close()
+    assert service.pending == 0
+
+    # As after an app shutdown and restart in the same process
+    assert service.add([event])
+    assert service._thread is not None and service._thread.is_alive()
+    service.close()
+    assert service.pending == 0
+
+
+@pytest.mark.parametrize(
+    "offset", [timedelta(days=-8), timedelta(hours=1), timedelta(days=70)]
+)
+def test_telemetry_rejects_events_far_from_server_time(offset: timedelta) -> None:
+    with pytest.raises(ValidationError):
+        schemas.TelemetryEventIn(
+            session_id="skewed",
+            event_type="screen_view",
+            screen="property_type",
+            occurred_at=datetime.now(UTC) + offset,
+        )
+
+
+def test_telemetry_partitions_are_created_independently() -> None:
+    bind = MagicMock()
+    bind.dialect.name = "postgresql"
+    conn = bind.begin.return_value.__enter__.return_value
+    # This month's range already has rows in the default partition
+    conn.execute.side_effect = [Exception("overlapping rows"), None]
+
+    assert TelemetryService(bind=bind).ensure_partitions(months=2) == 1
+    assert bind.begin.call_count == 2
+    assert conn.execute.call_count == 2
@@ -1,22 +1,44 @@
 import json
-from unittest.mock import patch
+import uuid
+from collections.abc import Iterator
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
 
-from app.utils.cache import cache_response, invalidate_cache
+from app import crud
+from app.core.config import settings
+from app.models.property import PropertyType
+from app.schemas.photo import PropertyPhotoCreate
+from app.schemas.property import PropertyCreate
+from app.schemas.user import UserCreate
+from app.utils.cache import cache_metrics, cache_response, invalidate_cache
 
 
 @pytest.fixture
-def mock_redis():
+def mock_redis() -> Iterator[MagicMock]:
     with patch("app.utils.cache.redis_client") as mock:
+        mock.mget.return_value = [None]
         yield mock
 
 
-def test_cache_response_sync(mock_redis):
+@pytest.fixture
+def mock_async_redis() -> Iterator[MagicMock]:
+    with patch("app.utils.cache.async_redis_client") as mock:
+        mock.mget = AsyncMock(return_value=[None])
+        mock.get = AsyncMock()
+        mock.setex = AsyncMock()
+        yield mock
+
+
+def test_cache_response_sync(mock_redis: MagicMock) -> None:
     call_count = 0
 
     @cache_response(expire=100, key_prefix="test")
-    def my_func(a, b):
+    def my_func(a: int, b: int) -> dict[str, int]:
         nonlocal call_count
         call_count += 1
         return {"result": a + b}
@@ -36,30 +58,139 @@ def test_cache_response_sync(mock_redis):
 
 
 @pytest.mark.asyncio
-async def test_cache_response_async(mock_redis):
+async def test_cache_response_async(
+    mock_redis: MagicMock, mock_async_redis: MagicMock
+) -> None:
     call_count = 0
 
     @cache_response(expire=100, key_prefix="test")
-    async def my_async_func(a, b):
+    async def my_async_func(a: int, b: int) -> dict[str, int]:
         nonlocal call_count
         call_count += 1
         return {"result": a + b}
 
     # First call - cache miss
-    mock_redis.get.return_value = None
+    mock_async_redis.get.return_value = None
     res1 = await my_async_func(1, 2)
     assert res1 == {"result": 3}
     assert call_count == 1
+    assert mock_async_redis.setex.await_count == 1
 
     # Second call - cache hit
-    mock_redis.get.return_value = json.dumps({"result": 3})
+    mock_async_redis.get.return_value = json.dumps({"result": 3})
     res2 = await my_async_func(1, 2)
     assert res2 == {"result": 3}
     assert call_count == 1
 
+    # Never the blocking client on the event loop
+    assert not mock_redis.get.called
+
+
+def test_cache_keys_are_scoped(mock_redis: MagicMock) -> None:
+    @cache_response(expire=100, key_prefix="test", tags=["other"])
+    def my_func(*, current_user: SimpleNamespace, page: int) -> dict[str, int]:
+        return {"page": page}
+
+    alice = SimpleNamespace(id=uuid.uuid4())
+    bob = SimpleNamespace(id=uuid.uuid4())
+    mock_redis.get.return_value = None
+    mock_redis.mget.return_value = [None, None]
+
+    def key_for(**kwargs: Any) -> str:
+        my_func(**kwargs)
+        key: str = mock_redis.get.call_args.args[0]
+        return key
+
+    key = key_for(current_user=alice, page=1)
+    assert key_for(current_user=alice, page=1) == key
+    assert key_for(current_user=bob, page=1) != key
+    assert key_for(current_user=alice, page=2) != key
+    mock_redis.mget.assert_called_with(["cache:gen:test", "cache:gen:other"])
 
-def test_invalidate_cache(mock_redis):
-    mock_redis.keys.return_value = ["test:key1", "test:key2"]
-    invalidate_cache("test:*")
-    mock_redis.keys.assert_called_with("test:*")
-    mock_redis.delete.assert_called_with("test:key1", "test:key2")
+    # A bumped generation of the prefix or any tag moves to fresh keys
+    mock_redis.mget.return_value = ["1", None]
+    assert key_for(current_user=alice, page=1) != key
+
+
+def test_cache_falls_through_when_redis_is_down(mock_redis: MagicMock) -> None:
+    cache_metrics.reset()
+    mock_redis.mget.side_effect = ConnectionError("down")
+
+    @cache_response(expire=100, key_prefix="test")
+    def my_func() -> dict[str, bool]:
+        return {"ok": True}
+
+    assert my_func() == {"ok": True}
+    assert not mock_redis.setex.called
+    assert cache_metrics.snapshot()["test"]["errors"] == 1
+
+
+def test_cache_metrics(mock_redis: MagicMock) -> None:
+    cache_metrics.reset()
+
+    @cache_response(expire=100, key_prefix="test")
+    def my_func() -> dict[str, bool]:
+        return {"ok": True}
+
+    mock_redis.get.return_value = None
+    my_func()
+    mock_redis.get.return_value = json.dumps({"ok": True})
+    my_func()
+    my_func()
+
+    stats = cache_metrics.snapshot()["test"]
+    assert (stats["hits"], stats["misses"], stats["errors"]) == (2, 1, 0)
+    assert stats["hit_rate"] == 66.7
+
+
+def test_invalidate_cache(mock_redis: MagicMock) -> None:
+    invalidate_cache("test", "other")
+    pipe = mock_redis.pipeline.return_value
+    pipe.incr.assert_any_call("cache:gen:test")
+    pipe.incr.assert_any_call("cache:gen:other")
+    pipe.execute.assert_called_once()
+    assert not mock_redis.keys.called
+    assert not mock_redis.delete.called
+
+
+def test_cached_property_matches_uncached(
+    client: TestClient, db: Session, mock_redis: MagicMock
+) -> None:
+    store: dict[str, str] = {}
+    mock_redis.get.side_effect = store.get
+    mock_redis.setex.side_effect = lambda key, expire, value: store.update({key: value})
+
+    phone = f"+1{str(uuid.uuid4().int)[:10]}"
+    user = crud.user.create(
+        db, obj_in=UserCreate(phone=phone, name="Cache User", password="pw")
+    )
+    prop = crud.property.create_with_owner(
+        db,
+        obj_in=PropertyCreate(
+            property_type=PropertyType.HOUSE,
+            address="1 Cache St",
+            city="City",
+            state="State",
+            pincode="123456",
+            area_sqft=1000.0,
+        ),
+        user_id=user.id,
+    )
+    crud.photo.create_with_property(
+        db,
+        obj_in=PropertyPhotoCreate(
+            property_id=prop.id, s3_key="cache.jpg", s3_url="http://mock-s3/cache.jpg"
+        ),
+    )
+    response = client.post(
+        f"{settings.API_V1_STR}/auth/login/access-token",
+        data={"username": phone, "password": "pw"},
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    miss = client.get(f"{settings.API_V1_STR}/properties/{prop.id}", headers=headers)
+    assert len(store) == 1
+    hit = client.get(f"{settings.API_V1_STR}/properties/{prop.id}", headers=headers)
+    assert miss.status_code == hit.status_code == 200
+    assert len(miss.json()["photos"]) == 1
+    assert hit.json() == miss.json()
@@ -1,13 +1,22 @@
+import csv
+import json
+import random
 import uuid
-from datetime import datetime
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
 
 from fastapi.testclient import TestClient
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app import crud
 from app.core.config import settings
+from app.models.comp import Comparable
+from app.models.property import PropertyType
 from app.models.user import UserRole
+from app.schemas.property import PropertyCreate
 from app.schemas.user import UserCreate
+from app.utils.geo import haversine_km
 
 
 def test_create_comp(client: TestClient, db: Session) -> None:
@@ -38,7 +47,7 @@ def test_create_comp(client: TestClient, db: Session) -> None:
         "sale_price": 4500000.0,
         "sale_date": datetime.now().isoformat(),
         "distance_km": 0.5,
-        "description": "Similar house nearby"
+        "description": "Similar house nearby",
     }
     response = client.post(
         f"{settings.API_V1_STR}/comps/",
@@ -51,6 +60,15 @@ def test_create_comp(client: TestClient, db: Session) -> None:
     assert data["address"] == "555 Comp St"
     assert data["sale_price"] == 4500000.0
 
+    # The same sale twice
+    response = client.post(
+        f"{settings.API_V1_STR}/comps/",
+        json=comp_data,
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 400
+
+
 def test_read_comps(client: TestClient, db: Session) -> None:
     # Login
     phone = f"+1{str(uuid.uuid4().int)[:10]}"
@@ -71,6 +89,7 @@ def test_read_comps(client: TestClient, db: Session) -> None:
     assert response.status_code == 200
     assert isinstance(response.json(), list)
 
+
 def test_update_comp(client: TestClient, db: Session) -> None:
     # Create valuer
     valuer_phone = f"+1{str(uuid.uuid4().int)[:10]}"
@@ -115,3 +134,274 @@ def test_update_comp(client: TestClient, db: Session) -> None:
     )
     assert response.status_code == 200
     assert response.json()["sale_price"] == 3100000.0
+
+
+def test_read_nearest_comps(client: TestClient, db: Session) -> None:
+    valuer_phone = f"+1{str(uuid.uuid4().int)[:10]}"
+    valuer = crud.user.create(
+        db,
+        obj_in=UserCreate(
+            phone=valuer_phone,
+            name="Valuer Nearest",
+            password="password",
+            role=UserRole.VALUER,
+        ),
+    )
+    response = client.post(
+        f"{settings.API_V1_STR}/auth/login/access-token",
+        data={"username": valuer_phone, "password": "password"},
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    # Somewhere no other test puts comparables
+    lat, lng = -45.0, 170.0
+    prop = crud.property.create_with_owner(
+        db,
+        obj_in=PropertyCreate(
+            property_type=PropertyType.HOUSE,
+            address="1 Nearest Rd",
+            city="City",
+            state="State",
+            pincode="123456",
+            lat=lat,
+            lng=lng,
+            area_sqft=1000.0,
+        ),
+        user_id=valuer.id,
+    )
+    rng = random.Random(7)
+    now = datetime.now(UTC)
+    comps = [
+        Comparable(
+            address=f"{i} Comp Rd",
+            city="City",
+            state="State",
+            pincode="123456",
+            lat=lat + rng.uniform(-0.1, 0.1),
+            lng=lng + rng.uniform(-0.1, 0.1),
+            area_sqft=rng.uniform(500, 1500),
+            sale_price=5e6,
+            sale_date=now - timedelta(days=rng.randint(0, 1000)),
+        )
+        for i in range(200)
+    ]
+    db.add_all(comps)
+    db.commit()
+
+    def expected(
+        radius_km: float,
+        k: int,
+        keep: Callable[[Comparable], bool] = lambda comp: True,
+    ) -> list[str]:
+        distances = [
+            (haversine_km(lat, lng, comp.lat, comp.lng), str(comp.id))
+            for comp in comps
+            if keep(comp) and comp.lat is not None and comp.lng is not None
+        ]
+        return [id for km, id in sorted(distances) if km <= radius_km][:k]
+
+    response = client.get(
+        f"{settings.API_V1_STR}/comps/nearest",
+        params={"property_id": str(prop.id), "k": 5, "radius_km": 5},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [comp["id"] for comp in data] == expected(5, 5)
+    assert data == sorted(data, key=lambda comp: comp["distance_km"])
+    assert all(comp["distance_km"] <= 5 for comp in data)
+
+    response = client.get(
+        f"{settings.API_V1_STR}/comps/nearest",
+        params={
+            "property_id": str(prop.id),
+            "k": 20,
+            "radius_km": 3,
+            "area_tolerance": 0.2,
+            "sold_within_days": 365,
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert [comp["id"] for comp in response.json()] == expected(
+        3,
+        20,
+        lambda comp: 800 <= comp.area_sqft <= 1200
+        # SQLite returns naive datetimes
+        and comp.sale_date.replace(tzinfo=UTC) >= now - timedelta(days=364),
+    )
+
+    crud.property.update(db, db_obj=prop, obj_in={"lat": None, "lng": None})
+    response = client.get(
+        f"{settings.API_V1_STR}/comps/nearest",
+        params={"property_id": str(prop.id)},
+        headers=headers,
+    )
+    assert response.status_code == 400
+
+
+def test_import_comps(client: TestClient, db: Session) -> None:
+    phone = f"+1{str(uuid.uuid4().int)[:10]}"
+    crud.user.create(
+        db,
+        obj_in=UserCreate(
+            phone=phone, name="Import Admin", password="password", role=UserRole.ADMIN
+        ),
+    )
+    response = client.post(
+        f"{settings.API_V1_STR}/auth/login/access-token",
+        data={"username": phone, "password": "password"},
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    street = f"Import Rd {uuid.uuid4().hex[:8]}"
+
+    csv_file = (
+        "address,city,state,pincode,lat,lng,area_sqft,sale_price,sale_date\n"
+        f"1 {street},City,State,400001,19.1,72.9,900,9000000,2026-01-15\n"
+        f"2 {street},City,State,400001,,,1200,11000000,2026-02-01\n"
+        f"3 {street},City,State,400001,19.1,72.9,big,5000000,2026-03-01\n"
+        # Repeated within the file: the later row wins
+        f"1 {street},City,State,400001,19.1,72.9,900,9500000,2026-01-15\n"
+    )
+    response = client.post(
+        f"{settings.API_V1_STR}/comps/import",
+        files={"file": ("sales.csv", csv_file.encode(), "text/csv")},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["rows"], report["written"], report["rejected"]) == (4, 2, 1)
+    assert report["rejects"][0]["line"] == 4
+    assert report["rejects"][0]["errors"][0].startswith("area_sqft")
+    assert report["rows_per_second"] > 0
+
+    # Re-importing a sale updates it rather than adding another
+    ndjson_file = "\n".join(
+        [
+            json.dumps(
+                {
+                    "address": f"2 {street}",
+                    "city": "City",
+                    "state": "State",
+                    "pincode": "400001",
+                    "area_sqft": 1200,
+                    "sale_price": 11500000,
+                    "sale_date": "2026-02-01T00:00:00Z",
+                }
+            ),
+            "{not json",
+        ]
+    )
+    response = client.post(
+        f"{settings.API_V1_STR}/comps/import",
+        files={"file": ("sales.ndjson", ndjson_file.encode())},
+        headers=headers,
+    )
+    report = response.json()
+    assert (report["rows"], report["written"], report["rejected"]) == (2, 1, 1)
+    assert report["rejects"][0]["line"] == 2
+
+    db.expire_all()
+    prices = dict(
+        db.execute(
+            select(Comparable.address, Comparable.sale_price).where(
+                Comparable.address.endswith(street)
+            )
+        )
+        .tuples()
+        .all()
+    )
+    assert prices == {f"1 {street}": 9500000, f"2 {street}": 11500000}
+
+    # Admins only
+    valuer_phone = f"+1{str(uuid.uuid4().int)[:10]}"
+    crud.user.create(
+        db,
+        obj_in=UserCreate(
+            phone=valuer_phone, name="Valuer", password="password", role=UserRole.VALUER
+        ),
+    )
+    response = client.post(
+        f"{settings.API_V1_STR}/auth/login/access-token",
+        data={"username": valuer_phone, "password": "password"},
+    )
+    response = client.post(
+        f"{settings.API_V1_STR}/comps/import",
+        files={"file": ("sales.csv", csv_file.encode())},
+        headers={"Authorization": f"Bearer {response.json()['access_token']}"},
+    )
+    assert response.status_code == 400
+
+
+def test_import_comps_rejects_unreadable_records(
+    client: TestClient, db: Session
+) -> None:
+    phone = f"+1{str(uuid.uuid4().int)[:10]}"
+    crud.user.create(
+        db,
+        obj_in=UserCreate(
+            phone=phone, name="Import Admin", password="password", role=UserRole.ADMIN
+        ),
+    )
+    response = client.post(
+        f"{settings.API_V1_STR}/auth/login/access-token",
+        data={"username": phone, "password": "password"},
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    street = f"Unreadable Rd {uuid.uuid4().hex[:8]}"
+
+    def row(number: int, description: bytes = b"") -> bytes:
+        return (
+            f"{number} {street},City,State,400001,,,900,9000000,2026-01-15,".encode()
+            + description
+            + b"\n"
+        )
+
+    csv_file = b"".join(
+        [
+            b"address,city,state,pincode,lat,lng,area_sqft,sale_price,sale_date,"
+            b"description\n",
+            row(1),
+            row(2, b"caf\xe9"),  # Latin-1, not UTF-8
+            row(3, b"x" * (csv.field_size_limit() + 1)),
+            row(4),
+        ]
+    )
+    response = client.post(
+        f"{settings.API_V1_STR}/comps/import",
+        files={"file": ("sales.csv", csv_file, "text/csv")},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["rows"], report["written"], report["rejected"]) == (4, 2, 2)
+    assert report["rejects"] == [
+        {"line": 3, "errors": ["invalid UTF-8"]},
+        {"line": 4, "errors": [report["rejects"][1]["errors"][0]]},
+    ]
+    assert report["rejects"][1]["errors"][0].startswith("invalid CSV")
+
+    ndjson_file = b"\n".join(
+        [
+            json.dumps(
+                {
+                    "address": f"5 {street}",
+                    "city": "City",
+                    "state": "State",
+                    "pincode": "400001",
+                    "area_sqft": 900,
+                    "sale_price": 9000000,
+                    "sale_date": "2026-01-15T00:00:00Z",
+                }
+            ).encode(),
+            b'{"address": "caf\xe9"}',
+        ]
+    )
+    response = client.post(
+        f"{settings.API_V1_STR}/comps/import",
+        files={"file": ("sales.ndjson", ndjson_file)},
+        headers=headers,
+    )
+    report = response.json()
+    assert (report["rows"], report["written"], report["rejected"]) == (2, 1, 1)
+    assert report["rejects"] == [{"line": 2, "errors": ["invalid UTF-8"]}]
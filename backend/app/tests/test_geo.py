@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from numpy.typing import NDArray
+
+from app.services.image_service import ImageService
+from app.utils import geo
+
+LONDON = (51.5074, -0.1278)
+PARIS = (48.8566, 2.3522)
+
+
+def _points(count: int, seed: int) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    rng = np.random.default_rng(seed)
+    return rng.uniform(8, 35, count), rng.uniform(68, 97, count)
+
+
+def test_scalar_wrapper_matches_geo() -> None:
+    assert ImageService.haversine_distance(*LONDON, *PARIS) == pytest.approx(
+        geo.haversine_km(*LONDON, *PARIS)
+    )
+    assert geo.haversine_km(*LONDON, *LONDON) == 0.0
+
+
+def test_vectorized_haversine_matches_scalar() -> None:
+    lats, lngs = _points(500, 1)
+    many = geo.haversine_many(*LONDON, lats, lngs)
+    assert many.shape == (500,)
+    assert many == pytest.approx(
+        [
+            geo.haversine_km(*LONDON, lat, lng)
+            for lat, lng in zip(lats, lngs, strict=True)
+        ]
+    )
+
+    other_lats, other_lngs = _points(7, 2)
+    matrix = geo.haversine_matrix(lats, lngs, other_lats, other_lngs)
+    assert matrix.shape == (500, 7)
+    for j in range(7):
+        assert matrix[:, j] == pytest.approx(
+            geo.haversine_many(other_lats[j], other_lngs[j], lats, lngs)
+        )
+
+
+def test_equirectangular_approximates_nearby_distances() -> None:
+    rng = np.random.default_rng(3)
+    lat, lng = 19.076, 72.8777
+    lats = lat + rng.uniform(-0.5, 0.5, 1000)
+    lngs = lng + rng.uniform(-0.5, 0.5, 1000)
+    exact = geo.haversine_many(lat, lng, lats, lngs)
+    assert geo.equirectangular_many(lat, lng, lats, lngs) == pytest.approx(
+        exact, rel=1e-3
+    )
+    assert geo.equirectangular_matrix([lat], [lng], lats, lngs)[0] == pytest.approx(
+        exact, rel=1e-3
+    )
+
+
+def test_bounding_box_prefilter_keeps_every_point_in_radius() -> None:
+    lats, lngs = _points(20_000, 4)
+    lat, lng, radius_km = 20.0, 80.0, 300.0
+    inside = geo.within_box(lat, lng, radius_km, lats, lngs)
+    near = geo.haversine_many(lat, lng, lats, lngs) <= radius_km
+    assert near.any()
+    assert not (near & ~inside).any()
+    assert inside.sum() < len(lats)
+
+
+def test_geohash_matches_reference_and_codes() -> None:
+    assert geo.geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    lats, lngs = _points(1000, seed=5)
+    codes = geo.geohash_codes(lats, lngs, 6)
+    # A cell's code is its parent's code plus one more character
+    parents = geo.geohash_codes(lats, lngs, 5)
+    assert np.array_equal(codes >> 5, parents)
+    for lat, lng, code in zip(lats[:20], lngs[:20], codes[:20], strict=True):
+        assert geo.geohash_string(int(code), 6) == geo.geohash(lat, lng, 6)
@@ -0,0 +1,144 @@
+import asyncio
+import time
+from collections.abc import Iterator
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.services.geocoding_service import GeocodingService, normalize_address
+
+
+class Nominatim:
+    """Mock Nominatim counting the requests it answers."""
+
+    def __init__(self) -> None:
+        self.requests: list[httpx.Request] = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        await asyncio.sleep(0.01)
+        if request.url.path == "/reverse":
+            if request.url.params["lat"] == "0.0":
+                return httpx.Response(200, json={"error": "Unable to geocode"})
+            return httpx.Response(
+                200,
+                json={
+                    "lat": request.url.params["lat"],
+                    "lon": request.url.params["lon"],
+                },
+            )
+        if "nowhere" in request.url.params["q"]:
+            return httpx.Response(200, json=[])
+        return httpx.Response(200, json=[{"lat": "12.9716", "lon": "77.5946"}])
+
+
+@pytest.fixture
+def nominatim() -> Nominatim:
+    return Nominatim()
+
+
+@pytest.fixture
+def service(nominatim: Nominatim) -> GeocodingService:
+    return GeocodingService(transport=httpx.MockTransport(nominatim))
+
+
+@pytest.fixture(autouse=True)
+def mock_async_redis() -> Iterator[MagicMock]:
+    with patch("app.services.geocoding_service.async_redis_client") as mock:
+        mock.get = AsyncMock(return_value=None)
+        mock.setex = AsyncMock()
+        mock.set = AsyncMock(return_value=True)
+        yield mock
+
+
+def test_normalize_address() -> None:
+    assert (
+        normalize_address("  12  MG Road ,Bengaluru,, ")
+        == normalize_address("12 mg road, BENGALURU")
+        == "12 mg road, bengaluru"
+    )
+
+
+@pytest.mark.asyncio
+async def test_repeat_lookups_are_cached(
+    service: GeocodingService, nominatim: Nominatim, mock_async_redis: MagicMock
+) -> None:
+    assert await service.geocode("12 MG Road, Bengaluru") == {
+        "lat": 12.9716,
+        "lng": 77.5946,
+    }
+    assert mock_async_redis.setex.await_count == 1
+
+    assert await service.geocode("12 mg road,  bengaluru") == {
+        "lat": 12.9716,
+        "lng": 77.5946,
+    }
+    # Nothing found is cached too
+    assert await service.geocode("Nowhere Lane") is None
+    assert await service.geocode("nowhere lane") is None
+    assert len(nominatim.requests) == 2
+
+    # Nearby points share a rounded reverse key
+    assert await service.reverse(12.97161, 77.59461) == {
+        "lat": 12.9716,
+        "lng": 77.5946,
+    }
+    assert await service.reverse(12.97159, 77.59459) is not None
+    assert len(nominatim.requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_redis_hits_skip_upstream(
+    service: GeocodingService, nominatim: Nominatim, mock_async_redis: MagicMock
+) -> None:
+    mock_async_redis.get.return_value = '{"lat": 1.5, "lng": 2.5}'
+    assert await service.geocode("Cached Street") == {"lat": 1.5, "lng": 2.5}
+    assert nominatim.requests == []
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_coalesce(
+    service: GeocodingService, nominatim: Nominatim
+) -> None:
+    results = await asyncio.gather(
+        *(service.geocode("1 Coalesce Road") for _ in range(20))
+    )
+    assert len(nominatim.requests) == 1
+    assert all(result == results[0] for result in results)
+
+
+@pytest.mark.asyncio
+async def test_upstream_requests_are_spaced(
+    service: GeocodingService, nominatim: Nominatim, mock_async_redis: MagicMock
+) -> None:
+    # Redis down: spacing still holds within the process
+    mock_async_redis.get.side_effect = ConnectionError("down")
+    mock_async_redis.set.side_effect = ConnectionError("down")
+    with patch.object(settings, "GEOCODE_MIN_INTERVAL_SECONDS", 0.05):
+        start = time.perf_counter()
+        await asyncio.gather(*(service.geocode(f"{i} Spaced Road") for i in range(4)))
+        elapsed = time.perf_counter() - start
+    assert len(nominatim.requests) == 4
+    assert elapsed >= 0.15
+
+
+def test_reverse_geocode_not_found(client: TestClient, nominatim: Nominatim) -> None:
+    with patch(
+        "app.api.v1.endpoints.geocode.geocoding_service",
+        GeocodingService(transport=httpx.MockTransport(nominatim)),
+    ):
+        response = client.post(
+            f"{settings.API_V1_STR}/geocode/geocode/reverse",
+            params={"lat": 0.0, "lng": 0.0},
+        )
+        assert response.status_code == 404
+
+        response = client.post(
+            f"{settings.API_V1_STR}/geocode/geocode",
+            json={"address": "12 MG Road, Bengaluru"},
+        )
+        assert response.status_code == 200
+        assert response.json() == {"lat": 12.9716, "lng": 77.5946}
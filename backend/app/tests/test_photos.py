@@ -1,15 +1,36 @@
 import uuid
 from io import BytesIO
+from typing import Any
 from unittest.mock import patch
 
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session
 
 from app import crud
 from app.core.config import settings
+from app.database import Base
+from app.models.property import PropertyType
+from app.schemas.photo import PropertyPhotoCreate
+from app.schemas.property import PropertyCreate
 from app.schemas.user import UserCreate
 
 
+def _renditions(s3_key: str) -> dict[str, dict[str, Any]]:
+    stem = s3_key.rsplit(".", 1)[0]
+    return {
+        name: {
+            "key": f"{stem}_{name}.webp",
+            "url": f"https://mock-s3.com/{stem}_{name}.webp",
+            "format": "WEBP",
+            "width": size,
+            "height": size,
+            "size_bytes": size * 10,
+        }
+        for name, size in (("thumb", 320), ("medium", 1024), ("full", 2048))
+    }
+
+
 def test_upload_photo(client: TestClient, db: Session) -> None:
     # Create user
     phone = f"+1{str(uuid.uuid4().int)[:10]}"
@@ -43,7 +64,9 @@ def test_upload_photo(client: TestClient, db: Session) -> None:
     property_id = response.json()["id"]
 
     # Mock storage upload
-    with patch("app.core.storage.storage_service.upload_file") as mock_upload:
+    with patch(
+        "app.services.storage_service.storage_service.upload_file"
+    ) as mock_upload:
         mock_upload.return_value = "https://mock-s3.com/photo.jpg"
 
         # Upload photo
@@ -92,7 +115,9 @@ def test_get_property_photos(client: TestClient, db: Session) -> None:
     property_id = response.json()["id"]
 
     # Upload photo
-    with patch("app.core.storage.storage_service.upload_file") as mock_upload:
+    with patch(
+        "app.services.storage_service.storage_service.upload_file"
+    ) as mock_upload:
         mock_upload.return_value = "https://mock-s3.com/photo.jpg"
         file = {"file": ("test.jpg", BytesIO(b"data"), "image/jpeg")}
         client.post(
@@ -140,7 +165,9 @@ def test_delete_photo(client: TestClient, db: Session) -> None:
     property_id = response.json()["id"]
 
     # Upload photo
-    with patch("app.core.storage.storage_service.upload_file") as mock_upload:
+    with patch(
+        "app.services.storage_service.storage_service.upload_file"
+    ) as mock_upload:
         mock_upload.return_value = "https://mock-s3.com/photo.jpg"
         file = {"file": ("test.jpg", BytesIO(b"data"), "image/jpeg")}
         resp = client.post(
@@ -150,12 +177,25 @@ def test_delete_photo(client: TestClient, db: Session) -> None:
         )
         photo_id = resp.json()["id"]
 
-    # Delete photo
-    response = client.delete(
-        f"{settings.API_V1_STR}/properties/photos/{photo_id}",
-        headers={"Authorization": f"Bearer {token}"},
+    photo = crud.photo.get(db, id=uuid.UUID(photo_id))
+    assert photo is not None
+    crud.photo.update(
+        db, db_obj=photo, obj_in={"renditions": _renditions(photo.s3_key)}
     )
+
+    # Delete photo
+    with patch(
+        "app.services.storage_service.storage_service.delete_file"
+    ) as mock_delete:
+        response = client.delete(
+            f"{settings.API_V1_STR}/properties/photos/{photo_id}",
+            headers={"Authorization": f"Bearer {token}"},
+        )
     assert response.status_code == 200
+    # The original and every rendition
+    assert sorted(call.args[0] for call in mock_delete.call_args_list) == sorted(
+        [photo.s3_key, *(r["key"] for r in _renditions(photo.s3_key).values())]
+    )
 
     # Verify deleted
     response = client.get(
@@ -163,3 +203,259 @@ def test_delete_photo(client: TestClient, db: Session) -> None:
         headers={"Authorization": f"Bearer {token}"},
     )
     assert len(response.json()) == 0
+
+
+def test_delete_duplicate_photo_keeps_shared_renditions(
+    client: TestClient, db: Session
+) -> None:
+    phone = f"+1{str(uuid.uuid4().int)[:10]}"
+    user = crud.user.create(
+        db, obj_in=UserCreate(phone=phone, name="Dup Owner", password="password")
+    )
+    response = client.post(
+        f"{settings.API_V1_STR}/auth/login/access-token",
+        data={"username": phone, "password": "password"},
+    )
+    token = response.json()["access_token"]
+    prop = crud.property.create_with_owner(
+        db,
+        obj_in=PropertyCreate(
+            property_type=PropertyType.HOUSE,
+            address="7 Shared St",
+            city="Dup City",
+            state="Dup State",
+            pincode="555777",
+            area_sqft=900.0,
+        ),
+        user_id=user.id,
+    )
+    original, duplicate = (
+        crud.photo.create_with_property(
+            db,
+            obj_in=PropertyPhotoCreate(
+                property_id=prop.id, s3_key=key, s3_url=f"s3://{key}"
+            ),
+        )
+        for key in ("shared_original.jpg", "shared_copy.jpg")
+    )
+    crud.photo.update(
+        db,
+        db_obj=original,
+        obj_in={"renditions": _renditions(original.s3_key)},
+    )
+    # Near-duplicates reuse their original's renditions
+    crud.photo.update(
+        db,
+        db_obj=duplicate,
+        obj_in={
+            "renditions": _renditions(original.s3_key),
+            "duplicate_of_id": original.id,
+        },
+    )
+
+    with patch(
+        "app.services.storage_service.storage_service.delete_file"
+    ) as mock_delete:
+        response = client.delete(
+            f"{settings.API_V1_STR}/properties/photos/{duplicate.id}",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    assert response.status_code == 200
+    mock_delete.assert_called_once_with("shared_copy.jpg")
+
+
+def test_deleting_original_photo_unlinks_duplicates(db: Session) -> None:
+    # The shared test database does not enforce foreign keys; this one does
+    engine = create_engine("sqlite://")
+    event.listen(
+        engine,
+        "connect",
+        lambda dbapi_connection, _: dbapi_connection.execute("PRAGMA foreign_keys=ON"),
+    )
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        user = crud.user.create(
+            session,
+            obj_in=UserCreate(phone="+15550001111", name="FK Owner", password="pw"),
+        )
+        prop = crud.property.create_with_owner(
+            session,
+            obj_in=PropertyCreate(
+                property_type=PropertyType.HOUSE,
+                address="9 Original St",
+                city="FK City",
+                state="FK State",
+                pincode="555888",
+                area_sqft=900.0,
+            ),
+            user_id=user.id,
+        )
+        original, duplicate = (
+            crud.photo.create_with_property(
+                session,
+                obj_in=PropertyPhotoCreate(
+                    property_id=prop.id, s3_key=key, s3_url=f"s3://{key}"
+                ),
+            )
+            for key in ("fk_original.jpg", "fk_copy.jpg")
+        )
+        crud.photo.update(
+            session, db_obj=duplicate, obj_in={"duplicate_of_id": original.id}
+        )
+
+        crud.photo.remove(session, id=original.id)
+        session.refresh(duplicate)
+
+        assert duplicate.duplicate_of_id is None
+    engine.dispose()
+
+
+def test_run_property_photo_qc(client: TestClient, db: Session) -> None:
+    phone = f"+1{str(uuid.uuid4().int)[:10]}"
+    user = crud.user.create(
+        db, obj_in=UserCreate(phone=phone, name="QC Owner", password="password")
+    )
+    response = client.post(
+        f"{settings.API_V1_STR}/auth/login/access-token",
+        data={"username": phone, "password": "password"},
+    )
+    token = response.json()["access_token"]
+
+    prop = crud.property.create_with_owner(
+        db,
+        obj_in=PropertyCreate(
+            property_type=PropertyType.HOUSE,
+            address="12 QC St",
+            city="QC City",
+            state="QC State",
+            pincode="555666",
+            area_sqft=1100.0,
+        ),
+        user_id=user.id,
+    )
+    for i in range(2):
+        crud.photo.create_with_property(
+            db,
+            obj_in=PropertyPhotoCreate(
+                property_id=prop.id, s3_key=f"qc_{i}.jpg", s3_url=f"s3://qc_{i}.jpg"
+            ),
+        )
+
+    with patch("app.tasks.image_processing.process_photo_batch.delay") as mock_delay:
+        mock_delay.return_value.id = "task-123"
+        response = client.post(
+            f"{settings.API_V1_STR}/properties/{prop.id}/photos/qc",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "property_id": str(prop.id),
+        "task_id": "task-123",
+        "photo_count": 2,
+    }
+    mock_delay.assert_called_once_with(str(prop.id))
+
+
+def test_presigned_upload_and_finalize(client: TestClient, db: Session) -> None:
+    phone = f"+1{str(uuid.uuid4().int)[:10]}"
+    user = crud.user.create(
+        db, obj_in=UserCreate(phone=phone, name="Direct Owner", password="password")
+    )
+    response = client.post(
+        f"{settings.API_V1_STR}/auth/login/access-token",
+        data={"username": phone, "password": "password"},
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    prop = crud.property.create_with_owner(
+        db,
+        obj_in=PropertyCreate(
+            property_type=PropertyType.HOUSE,
+            address="34 Direct St",
+            city="Direct City",
+            state="Direct State",
+            pincode="777888",
+            area_sqft=1300.0,
+        ),
+        user_id=user.id,
+    )
+
+    # Screenshots are rejected before any URL is issued
+    response = client.post(
+        f"{settings.API_V1_STR}/properties/{prop.id}/photos/upload-urls",
+        json={"files": [{"filename": "Screenshot 1.png", "content_type": "image/png"}]},
+        headers=headers,
+    )
+    assert response.status_code == 400
+
+    response = client.post(
+        f"{settings.API_V1_STR}/properties/{prop.id}/photos/upload-urls",
+        json={
+            "files": [
+                {"filename": "front.jpg", "content_type": "image/jpeg"},
+                {"filename": "kitchen.HEIC", "content_type": "image/heic"},
+            ]
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+    uploads = response.json()["uploads"]
+    assert [upload["key"].rsplit(".", 1)[1] for upload in uploads] == ["jpg", "heic"]
+    assert all(
+        upload["key"].startswith(f"properties/{prop.id}/") for upload in uploads
+    )
+    assert all("X-Amz-Signature" in upload["url"] for upload in uploads)
+
+    # Keys outside this property's prefix cannot be claimed
+    response = client.post(
+        f"{settings.API_V1_STR}/properties/{prop.id}/photos/finalize",
+        json={"photos": [{"key": f"properties/{uuid.uuid4()}/x.jpg"}]},
+        headers=headers,
+    )
+    assert response.status_code == 400
+
+    with (
+        patch(
+            "app.services.storage_service.storage_service.get_object_size",
+            return_value=1024,
+        ),
+        patch(
+            "app.tasks.image_processing.process_photo_batch.delay"
+        ) as mock_delay,
+    ):
+        mock_delay.return_value.id = "task-456"
+        response = client.post(
+            f"{settings.API_V1_STR}/properties/{prop.id}/photos/finalize",
+            json={
+                "photos": [
+                    {"key": uploads[0]["key"], "photo_type": "EXTERIOR"},
+                    {"key": uploads[1]["key"], "photo_type": "INTERIOR"},
+                ]
+            },
+            headers=headers,
+        )
+
+    assert response.status_code == 200
+    content = response.json()
+    assert content["task_id"] == "task-456"
+    assert [photo["s3_key"] for photo in content["photos"]] == [
+        upload["key"] for upload in uploads
+    ]
+    assert [photo["sequence"] for photo in content["photos"]] == [1, 2]
+    mock_delay.assert_called_once_with(
+        str(prop.id), [photo["id"] for photo in content["photos"]]
+    )
+
+    # Finalizing the same upload twice is rejected
+    with patch(
+        "app.services.storage_service.storage_service.get_object_size",
+        return_value=1024,
+    ):
+        response = client.post(
+            f"{settings.API_V1_STR}/properties/{prop.id}/photos/finalize",
+            json={"photos": [{"key": uploads[0]["key"]}]},
+            headers=headers,
+        )
+    assert response.status_code == 400
@@ -1,4 +1,6 @@
 import uuid
+from collections.abc import Callable
+from typing import Any
 
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
@@ -6,7 +8,8 @@ from sqlalchemy.orm import Session
 from app import crud
 from app.core.config import settings
 from app.models.property import PropertyType
-from app.schemas.property import PropertyCreate
+from app.schemas.photo import PropertyPhotoCreate
+from app.schemas.property import PropertyCreate, PropertySummary
 from app.schemas.user import UserCreate
 
 
@@ -189,3 +192,165 @@ def test_read_properties_admin_valuer(client: TestClient, db: Session) -> None:
     assert response.status_code == 200
     # Note: Depending on existing data, this might be 1 or more
     assert len(response.json()) >= 1
+
+
+def test_read_properties_cursor_pagination(client: TestClient, db: Session) -> None:
+    phone = f"+1{str(uuid.uuid4().int)[:10]}"
+    user = crud.user.create(
+        db, obj_in=UserCreate(phone=phone, name="Paging Owner", password="password")
+    )
+    # Created within the same second, so pages are split on id as well
+    created = [
+        crud.property.create_with_owner(
+            db,
+            obj_in=PropertyCreate(
+                property_type=PropertyType.HOUSE,
+                address=f"Page Address {i}",
+                city="City",
+                state="State",
+                pincode="123456",
+                area_sqft=1000.0,
+            ),
+            user_id=user.id,
+        )
+        for i in range(5)
+    ]
+
+    response = client.post(
+        f"{settings.API_V1_STR}/auth/login/access-token",
+        data={"username": phone, "password": "password"},
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    seen: list[str] = []
+    params: dict[str, str | int] = {"limit": 2}
+    for _ in range(len(created)):
+        response = client.get(
+            f"{settings.API_V1_STR}/properties/", params=params, headers=headers
+        )
+        assert response.status_code == 200
+        seen += [prop["id"] for prop in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params = {"limit": 2, "cursor": cursor}
+
+    assert sorted(seen) == sorted(str(prop.id) for prop in created)
+    assert len(seen) == len(set(seen))
+
+    # Offset paging is reserved for admins, and cursors are validated
+    response = client.get(
+        f"{settings.API_V1_STR}/properties/", params={"skip": 2}, headers=headers
+    )
+    assert response.status_code == 400
+    response = client.get(
+        f"{settings.API_V1_STR}/properties/",
+        params={"cursor": "not-a-cursor"},
+        headers=headers,
+    )
+    assert response.status_code == 400
+
+
+def test_read_properties_query_count_is_constant(
+    client: TestClient, db: Session, assert_max_queries: Callable[[int], Any]
+) -> None:
+    phone = f"+1{str(uuid.uuid4().int)[:10]}"
+    user = crud.user.create(
+        db, obj_in=UserCreate(phone=phone, name="Busy Owner", password="password")
+    )
+    for i in range(30):
+        prop = crud.property.create_with_owner(
+            db,
+            obj_in=PropertyCreate(
+                property_type=PropertyType.APARTMENT,
+                address=f"Flat {i}",
+                city="City",
+                state="State",
+                pincode="123456",
+                area_sqft=800.0,
+            ),
+            user_id=user.id,
+        )
+        for sequence in range(2):
+            crud.photo.create_with_property(
+                db,
+                obj_in=PropertyPhotoCreate(
+                    property_id=prop.id,
+                    s3_key=f"flat-{i}-{sequence}.jpg",
+                    s3_url=f"http://mock-s3/flat-{i}-{sequence}.jpg",
+                    sequence=sequence,
+                ),
+            )
+
+    response = client.post(
+        f"{settings.API_V1_STR}/auth/login/access-token",
+        data={"username": phone, "password": "password"},
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    # Current user, the page of properties and all of their photos
+    with assert_max_queries(3):
+        response = client.get(
+            f"{settings.API_V1_STR}/properties/",
+            params={"limit": 100},
+            headers=headers,
+        )
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 30
+    assert all(len(prop["photos"]) == 2 for prop in data)
+
+
+def test_read_property_summaries(
+    client: TestClient, db: Session, assert_max_queries: Callable[[int], Any]
+) -> None:
+    phone = f"+1{str(uuid.uuid4().int)[:10]}"
+    user = crud.user.create(
+        db, obj_in=UserCreate(phone=phone, name="Summary Owner", password="password")
+    )
+    created = [
+        crud.property.create_with_owner(
+            db,
+            obj_in=PropertyCreate(
+                property_type=PropertyType.VILLA,
+                address=f"Summary Address {i}",
+                city="City",
+                state="State",
+                pincode="123456",
+                area_sqft=1500.0,
+                description="Not part of the summary",
+            ),
+            user_id=user.id,
+        )
+        for i in range(3)
+    ]
+
+    response = client.post(
+        f"{settings.API_V1_STR}/auth/login/access-token",
+        data={"username": phone, "password": "password"},
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    # Current user and the page itself
+    with assert_max_queries(2):
+        response = client.get(
+            f"{settings.API_V1_STR}/properties/summary",
+            params={"limit": 2},
+            headers=headers,
+        )
+    assert response.status_code == 200
+    first = response.json()
+    assert set(first[0]) == set(PropertySummary.model_fields)
+    assert first[0]["city"] == "City"
+
+    response = client.get(
+        f"{settings.API_V1_STR}/properties/summary",
+        params={"limit": 2, "cursor": response.headers["X-Next-Cursor"]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    rest = response.json()
+    assert "X-Next-Cursor" not in response.headers
+    assert sorted(prop["id"] for prop in first + rest) == sorted(
+        str(prop.id) for prop in created
+    )
@@ -0,0 +1,147 @@
+import re
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import ClauseElement, func, select, text
+from sqlalchemy.orm import Query, Session
+
+from app import crud
+from app.crud.base import encode_cursor
+from app.models.photo import PropertyPhoto
+from app.models.property import Property, PropertyStatus
+from app.models.valuation import Valuation
+
+NOW = datetime(2026, 1, 15, tzinfo=UTC)
+ID = uuid.UUID(int=1)
+
+# Hot queries and the index each must be answered from
+HOT_QUERIES: list[tuple[str, ClauseElement, str]] = [
+    (
+        "owner property list",
+        select(Property).where(Property.user_id == ID),
+        "ix_property_user_id_created_at_id",
+    ),
+    (
+        "valuer queue age bucket",
+        select(func.count()).where(
+            Property.status == PropertyStatus.SUBMITTED,
+            Property.submitted_at < NOW - timedelta(hours=24),
+        ),
+        "ix_property_submitted_queue",
+    ),
+    (
+        "stale draft cleanup",
+        select(Property).where(
+            Property.status == PropertyStatus.DRAFT,
+            Property.created_at < NOW - timedelta(days=30),
+        ),
+        "ix_property_draft_created_at",
+    ),
+    (
+        "rollup created range",
+        select(Property.city).where(
+            Property.created_at >= NOW, Property.created_at < NOW + timedelta(days=1)
+        ),
+        "ix_property_created_at_id",
+    ),
+    (
+        "rollup submitted range",
+        select(Property.city).where(
+            Property.submitted_at.isnot(None),
+            Property.submitted_at >= NOW,
+            Property.submitted_at < NOW + timedelta(days=1),
+        ),
+        "ix_property_submitted_at",
+    ),
+    (
+        "rollup reviewed range",
+        select(Property.city).where(
+            Property.reviewed_at.isnot(None),
+            Property.reviewed_at >= NOW,
+            Property.reviewed_at < NOW + timedelta(days=1),
+        ),
+        "ix_property_reviewed_at",
+    ),
+    (
+        "valuer workload",
+        select(Property).where(Property.valuer_id == ID),
+        "ix_property_valuer_id",
+    ),
+    (
+        "property photos",
+        select(PropertyPhoto)
+        .where(PropertyPhoto.property_id == ID)
+        .order_by(PropertyPhoto.sequence),
+        "ix_propertyphoto_property_id_qc_status",
+    ),
+    (
+        "valuer valuations",
+        select(Valuation).where(Valuation.valuer_id == ID),
+        "ix_valuation_valuer_id_created_at_id",
+    ),
+    (
+        "deep keyset page",
+        crud.property.page_query(
+            Query(Property), cursor=encode_cursor(NOW, ID), limit=20
+        ).statement,
+        "ix_property_created_at_id",
+    ),
+    (
+        "owner keyset page",
+        crud.property.page_query(
+            Query(Property).filter(Property.user_id == ID),
+            cursor=encode_cursor(NOW, ID),
+            limit=20,
+        ).statement,
+        "ix_property_user_id_created_at_id",
+    ),
+    (
+        "owner summary page",
+        crud.property.page_query(
+            select(*crud.property.SUMMARY_COLUMNS).where(Property.user_id == ID),
+            cursor=encode_cursor(NOW, ID),
+            limit=20,
+        ),
+        "ix_property_user_id_created_at_id",
+    ),
+    (
+        "photo export window",
+        crud.photo.page_query(
+            select(*PropertyPhoto.__table__.columns),
+            cursor=encode_cursor(NOW, ID),
+            limit=100_000,
+        ),
+        "ix_propertyphoto_created_at_id",
+    ),
+]
+
+
+def _explain(db: Session, query: ClauseElement) -> list[str]:
+    dialect = db.get_bind().dialect
+    # Literal values, so the planner can match partial index predicates
+    sql = str(query.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+    if dialect.name == "postgresql":
+        # Test tables are tiny; only fall back to a seq scan if forced to
+        db.execute(text("SET LOCAL enable_seqscan = off"))
+        return list(db.execute(text(f"EXPLAIN {sql}")).scalars())
+    return [row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+def _full_scans(plan: list[str]) -> list[str]:
+    # PostgreSQL "Seq Scan on t"; SQLite "SCAN t", as opposed to "SEARCH t"
+    return [line for line in plan if re.search(r"Seq Scan on|^SCAN (?!CONSTANT)", line)]
+
+
+@pytest.mark.parametrize(
+    ("name", "query", "index"), HOT_QUERIES, ids=[name for name, *_ in HOT_QUERIES]
+)
+def test_hot_query_uses_index(
+    db: Session, name: str, query: ClauseElement, index: str
+) -> None:
+    try:
+        plan = _explain(db, query)
+    finally:
+        db.rollback()
+    assert not _full_scans(plan), f"{name} falls back to a full scan: {plan}"
+    assert any(index in line for line in plan), f"{name} does not use {index}: {plan}"
@@ -1,11 +1,21 @@
+import io
 import os
 import tempfile
 from datetime import datetime
+from typing import Any
+from unittest.mock import patch
 
+import numpy as np
 import piexif
+import pytest
+from numpy.typing import NDArray
 from PIL import Image
 
+from app.core.config import RenditionSpec
+from app.services.image_pool_service import ImagePoolService
+from app.services.image_qc_service import ImageQCService
 from app.services.image_service import ImageService
+from app.services.scratch_cache_service import ScratchCacheService
 
 
 def test_haversine_distance():
@@ -82,3 +92,299 @@ def test_get_exif_data_with_exif():
         assert exif_data["gps_lat"] == 40.5
         assert exif_data["gps_lng"] == 70.33333333333333
     os.unlink(tmp.name)
+
+
+def _loop_laplacian_variance(img_array: NDArray[Any]) -> float:
+    kernel = np.array([[0, 1, 0], [1, -4, 1], [0, 1, 0]])
+    laplacian = np.zeros_like(img_array, dtype=np.float64)
+    for i in range(1, img_array.shape[0] - 1):
+        for j in range(1, img_array.shape[1] - 1):
+            laplacian[i, j] = np.sum(img_array[i - 1 : i + 2, j - 1 : j + 2] * kernel)
+    return float(laplacian.var())
+
+
+def test_check_blur_matches_loop_laplacian() -> None:
+    img = Image.effect_noise((64, 48), 40)
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+
+    result = ImageQCService().check_blur(buffer.getvalue())
+
+    assert "error" not in result
+    assert result["score"] == pytest.approx(_loop_laplacian_variance(np.array(img)))
+
+
+def test_check_blur_flat_vs_sharp() -> None:
+    service = ImageQCService()
+    flat = io.BytesIO()
+    Image.new("L", (200, 200), color=128).save(flat, format="PNG")
+    sharp = io.BytesIO()
+    Image.effect_noise((200, 200), 60).save(sharp, format="PNG")
+
+    assert service.check_blur(flat.getvalue())["is_blurry"] is True
+    assert service.check_blur(sharp.getvalue())["is_blurry"] is False
+
+
+def test_check_blur_downscales_to_max_dimension() -> None:
+    service = ImageQCService()
+    buffer = io.BytesIO()
+    Image.effect_noise((800, 600), 60).save(buffer, format="PNG")
+
+    result = service.check_blur(buffer.getvalue(), max_dimension=200)
+
+    assert "error" not in result
+    assert result["is_blurry"] is False
+
+
+def test_run_qc_checks_decodes_once() -> None:
+    service = ImageQCService()
+    buffer = io.BytesIO()
+    Image.new("RGB", (300, 200), color=(128, 128, 128)).save(buffer, format="JPEG")
+
+    with patch(
+        "app.services.image_qc_service.Image.open", wraps=Image.open
+    ) as mock_open:
+        qc_result = service.run_qc_checks(buffer.getvalue(), max_dimension=100)
+
+    assert mock_open.call_count == 1
+    assert qc_result["brightness"]["score"] == pytest.approx(128, abs=2)
+    assert qc_result["glare"]["has_glare"] is False
+
+
+def test_run_qc_checks_registered_check_gets_shared_raster() -> None:
+    service = ImageQCService()
+    seen: list[Image.Image] = []
+
+    def too_small(raster: Image.Image) -> dict[str, Any]:
+        seen.append(raster)
+        return {"issues": ["Image is too small"]}
+
+    service.register_check("size", too_small)
+    buffer = io.BytesIO()
+    Image.effect_noise((400, 300), 60).save(buffer, format="PNG")
+
+    qc_result = service.run_qc_checks(buffer.getvalue(), max_dimension=200)
+
+    assert seen[0].mode == "L"
+    assert seen[0].size == (200, 150)
+    assert qc_result["size"] == {"issues": ["Image is too small"]}
+    assert "Image is too small" in qc_result["issues"]
+    assert qc_result["recommendation"] == "reject"
+
+
+def test_draft_decode_scales_jpeg() -> None:
+    buffer = io.BytesIO()
+    Image.new("RGB", (2000, 1500), color=(90, 90, 90)).save(buffer, format="JPEG")
+
+    img = ImageService.draft_decode(Image.open(buffer), (200, 200), "L")
+
+    assert img.mode == "L"
+    assert img.size == (500, 375)
+
+
+def test_get_exif_data_does_not_decode_pixels() -> None:
+    buffer = io.BytesIO()
+    exif_bytes = piexif.dump({"0th": {piexif.ImageIFD.Model: "Pixel 8"}})
+    Image.new("RGB", (100, 100)).save(buffer, format="JPEG", exif=exif_bytes)
+    buffer.seek(0)
+
+    with patch("PIL.JpegImagePlugin.JpegImageFile.load", side_effect=AssertionError):
+        exif_data = ImageService.get_exif_data(buffer)
+
+    assert exif_data["device_model"] == "Pixel 8"
+
+
+def test_render_renditions_sizes_and_formats() -> None:
+    buffer = io.BytesIO()
+    Image.new("RGB", (2000, 1500), color=(90, 120, 150)).save(buffer, format="JPEG")
+    buffer.seek(0)
+    specs = [
+        RenditionSpec(name="thumb", max_size=320, format="WEBP", quality=70),
+        RenditionSpec(name="full", max_size=1024, format="JPEG", quality=85),
+        RenditionSpec(name="tiny", max_size=64, format="NOT-A-FORMAT"),
+    ]
+
+    renditions = ImageService.render_renditions(buffer, specs)
+
+    # Unsupported formats are skipped rather than failing the whole set
+    assert set(renditions) == {"thumb", "full"}
+    assert (renditions["full"]["width"], renditions["full"]["height"]) == (1024, 768)
+    assert renditions["full"]["content_type"] == "image/jpeg"
+    assert (renditions["thumb"]["width"], renditions["thumb"]["height"]) == (320, 240)
+    assert renditions["thumb"]["content_type"] == "image/webp"
+    thumb = Image.open(io.BytesIO(renditions["thumb"]["data"]))
+    assert thumb.format == "WEBP"
+    assert thumb.size == (320, 240)
+
+
+def test_dhash_survives_reencoding_but_not_other_photos() -> None:
+    def encode(img: Image.Image, **save_args: Any) -> io.BytesIO:
+        buffer = io.BytesIO()
+        img.save(buffer, format="JPEG", **save_args)
+        buffer.seek(0)
+        return buffer
+
+    photo = Image.radial_gradient("L").resize((1200, 900)).convert("RGB")
+    other = Image.linear_gradient("L").resize((1200, 900)).convert("RGB")
+
+    original = ImageService.dhash(encode(photo, quality=95))
+    resaved = ImageService.dhash(encode(photo.resize((600, 450)), quality=60))
+    different = ImageService.dhash(encode(other, quality=95))
+
+    assert original is not None and resaved is not None and different is not None
+    assert ImageService.hamming_distance(original, resaved) <= 3
+    assert ImageService.hamming_distance(original, different) > 10
+    assert ImageService.dhash(io.BytesIO(b"not an image")) is None
+
+
+def test_hash_bands_find_every_match_within_three_bits() -> None:
+    value = 0x0123_4567_89AB_CDEF
+    near = value ^ (1 << 3) ^ (1 << 20) ^ (1 << 40)
+
+    shared = [
+        a == b
+        for a, b in zip(
+            ImageService.hash_bands(value), ImageService.hash_bands(near), strict=True
+        )
+    ]
+
+    assert ImageService.hamming_distance(value, near) == 3
+    assert shared.count(True) == 1
+    # Signed storage of the same bit pattern compares equal
+    unsigned = value | (1 << 63)
+    assert ImageService.hamming_distance(unsigned, unsigned - (1 << 64)) == 0
+
+
+def test_fallback_blur_check_matches_pixel_loop() -> None:
+    img = Image.effect_noise((100, 100), 20)
+    pixels = list(img.getdata())
+    expected = sum(
+        1
+        for i in range(1, 99)
+        for j in range(1, 99)
+        if abs(
+            pixels[i * 100 + j]
+            - (
+                pixels[i * 100 + j - 1]
+                + pixels[i * 100 + j + 1]
+                + pixels[i * 100 + j - 100]
+                + pixels[i * 100 + j + 100]
+            )
+            / 4
+        )
+        > 10
+    )
+
+    assert ImageQCService()._fallback_blur_check(img) == float(expected)
+
+
+def test_histogram_exposure_metrics() -> None:
+    service = ImageQCService()
+    img = Image.new("L", (100, 100), color=0)
+    img.paste(255, (0, 0, 100, 25))
+    img.paste(128, (0, 25, 100, 75))
+
+    brightness = service.check_brightness(img)
+    glare = service.check_glare(img)
+
+    assert brightness["score"] == pytest.approx(0.25 * 255 + 0.5 * 128)
+    assert brightness["percentiles"] == {"p5": 0, "p50": 128, "p95": 255}
+    assert brightness["clipped_highlight_ratio"] == pytest.approx(0.25)
+    assert brightness["crushed_shadow_ratio"] == pytest.approx(0.25)
+    assert glare["percentage"] == pytest.approx(25.0)
+    assert glare["has_glare"] is False
+
+
+def test_histogram_stats_cached_on_shared_raster() -> None:
+    service = ImageQCService()
+    raster = Image.new("L", (50, 50), color=250)
+
+    with patch.object(raster, "histogram", wraps=raster.histogram) as mock_hist:
+        qc_result = service.run_qc_checks(raster)
+
+    assert mock_hist.call_count == 1
+    assert qc_result["glare"]["has_glare"] is True
+    assert "Image is too bright" in qc_result["issues"]
+
+
+def test_image_pool_runs_inline_when_disabled() -> None:
+    pool = ImagePoolService()
+    with patch("app.services.image_pool_service.settings.IMAGE_POOL_ENABLED", False):
+        assert pool.map(pow, [(2, 3), (3, 2)], [0, 0]) == [8, 9]
+    assert pool._executor is None
+
+
+def test_image_pool_process_workers_and_pixel_budget() -> None:
+    pool = ImagePoolService()
+    with (
+        patch("app.services.image_pool_service.settings.IMAGE_POOL_ENABLED", True),
+        patch("app.services.image_pool_service.settings.IMAGE_POOL_WORKERS", 2),
+        patch(
+            "app.services.image_pool_service.settings.IMAGE_POOL_MAX_PIXEL_BYTES", 100
+        ),
+    ):
+        try:
+            # The oversized job runs alone rather than deadlocking
+            results = pool.map(pow, [(2, 3), (3, 2), (2, 10)], [60, 60, 500])
+        finally:
+            pool.shutdown()
+
+    assert results == [8, 9, 1024]
+    assert pool._in_flight_bytes == 0
+
+
+def test_image_pool_estimates_pixel_bytes_from_header() -> None:
+    buffer = io.BytesIO()
+    Image.new("RGB", (40, 30)).save(buffer, format="JPEG")
+    buffer.seek(0)
+
+    assert ImagePoolService.estimate_pixel_bytes(buffer) == 40 * 30 * 3
+
+
+def test_scratch_cache_downloads_once_and_evicts_lru(tmp_path: Any) -> None:
+    def download(file_key: str, file_path: str) -> None:
+        with open(file_path, "wb") as f:
+            f.write(b"x" * 100)
+
+    cache = ScratchCacheService(directory=str(tmp_path), max_bytes=250)
+    with patch("app.services.scratch_cache_service.storage_service") as storage:
+        storage.download_to_file.side_effect = download
+
+        first = cache.fetch("properties/a.jpg")
+        assert cache.fetch("properties/a.jpg") == first
+        assert storage.download_to_file.call_count == 1
+
+        os.utime(first, (1, 1))
+        cache.fetch("properties/b.jpg")
+        cache.fetch("properties/c.jpg")
+
+    assert not os.path.exists(first)
+    assert os.path.exists(cache.path_for("properties/c.jpg"))
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        os.path.basename(cache.path_for(key))
+        for key in ("properties/b.jpg", "properties/c.jpg")
+    )
+
+
+def test_scratch_cache_keeps_pinned_batch(tmp_path: Any) -> None:
+    def download(file_key: str, file_path: str) -> None:
+        with open(file_path, "wb") as f:
+            f.write(b"x" * 100)
+
+    cache = ScratchCacheService(directory=str(tmp_path), max_bytes=250)
+    with patch("app.services.scratch_cache_service.storage_service") as storage:
+        storage.download_to_file.side_effect = download
+
+        batch: list[str] = []
+        for key in ("properties/a.jpg", "properties/b.jpg", "properties/c.jpg"):
+            batch.append(cache.fetch(key, batch))
+        # Over budget, but nothing of the batch is evicted under it
+        assert all(os.path.exists(path) for path in batch)
+
+        for age, path in enumerate(batch, start=1):
+            os.utime(path, (age, age))
+        cache.fetch("properties/d.jpg")
+
+    assert not os.path.exists(batch[0])
+    assert not os.path.exists(batch[1])
+    assert os.path.exists(batch[2])
@@ -4,19 +4,47 @@ from typing import Any
 from unittest.mock import patch
 
 import pytest
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
+from app.core.config import settings
 from app.models.photo import QCStatus
+from app.services.image_service import ImageService
 from app.tasks.image_processing import process_photo
 
 
 @pytest.fixture
 def mock_image_service() -> Generator[Any, None, None]:
     with patch("app.tasks.image_processing.image_service") as mock:
+        # Undecodable by default, so no duplicate lookup happens
+        mock.dhash.return_value = None
+        mock.hamming_distance.side_effect = ImageService.hamming_distance
         yield mock
 
-def test_process_photo_success(db: Session, mock_image_service: Any) -> None:
+
+@pytest.fixture
+def mock_storage(tmp_path: Any) -> Generator[Any, None, None]:
+    cached_file = tmp_path / "photo.jpg"
+    cached_file.write_bytes(b"cached photo bytes")
+    with (
+        patch("app.tasks.image_processing.scratch_cache_service") as mock_cache,
+        patch("app.tasks.image_processing.storage_service") as mock_storage,
+    ):
+        mock_cache.fetch.return_value = str(cached_file)
+        yield mock_storage
+
+
+def _get_photos(db: Session, photo_ids: list[uuid.UUID]) -> list[models.PropertyPhoto]:
+    photos = [crud.photo.get(db, id=photo_id) for photo_id in photo_ids]
+    found = [photo for photo in photos if photo is not None]
+    assert len(found) == len(photo_ids)
+    return found
+
+
+def test_process_photo_success(
+    db: Session, mock_image_service: Any, mock_storage: Any
+) -> None:
     # 1. Create a user and property
     phone = f"+1{str(uuid.uuid4().int)[:10]}"
     user_in = schemas.UserCreate(phone=phone, name="Task User", password="password")
@@ -58,13 +86,26 @@ def test_process_photo_success(db: Session, mock_image_service: Any) -> None:
         "blur_score": 50.0,
         "brightness_score": 120.0,
     }
+    mock_image_service.render_renditions.return_value = {
+        "thumb": {
+            "data": b"thumb bytes",
+            "format": "WEBP",
+            "content_type": "image/webp",
+            "width": 320,
+            "height": 240,
+        }
+    }
+    mock_storage.upload_file.return_value = "http://mock-s3/test_key_thumb.webp"
 
     # 4. Run the task (synchronously for testing)
     with patch("app.tasks.image_processing.SessionLocal", return_value=db):
-        result = process_photo(str(photo.id), photo.s3_url)
+        result = process_photo(str(photo.id), photo.s3_key)
 
     # 5. Verify results
     assert result["status"] == "completed"
+    mock_storage.upload_file.assert_called_once_with(
+        b"thumb bytes", "test_key_thumb.webp", content_type="image/webp"
+    )
 
     # Re-fetch from DB since task closed its own session
     db.expire_all()
@@ -76,8 +117,20 @@ def test_process_photo_success(db: Session, mock_image_service: Any) -> None:
     assert photo_db.gps_lng == 56.78
     assert photo_db.qc_notes is not None
     assert "QC results" in photo_db.qc_notes
+    assert photo_db.renditions == {
+        "thumb": {
+            "key": "test_key_thumb.webp",
+            "url": "http://mock-s3/test_key_thumb.webp",
+            "format": "WEBP",
+            "width": 320,
+            "height": 240,
+            "size_bytes": len(b"thumb bytes"),
+        }
+    }
 
-def test_process_photo_failure_qc(db: Session, mock_image_service: Any) -> None:
+def test_process_photo_failure_qc(
+    db: Session, mock_image_service: Any, mock_storage: Any
+) -> None:
     # 1. Create a user and property
     phone = f"+1{str(uuid.uuid4().int)[:10]}"
     user_in = schemas.UserCreate(
@@ -116,7 +169,7 @@ def test_process_photo_failure_qc(db: Session, mock_image_service: Any) -> None:
 
     # 4. Run the task
     with patch("app.tasks.image_processing.SessionLocal", return_value=db):
-        process_photo(str(photo.id), photo.s3_url)
+        process_photo(str(photo.id), photo.s3_key)
 
     # 5. Verify results
     db.expire_all()
@@ -129,3 +182,267 @@ def test_process_photo_not_found(db: Session) -> None:
     with patch("app.tasks.image_processing.SessionLocal", return_value=db):
         result = process_photo(str(uuid.uuid4()), "http://mock-s3/none.jpg")
     assert result["error"] == "Photo not found"
+
+def test_process_photo_batch(
+    db: Session, mock_image_service: Any, mock_storage: Any
+) -> None:
+    from datetime import UTC, datetime
+
+    from app.tasks.image_processing import process_photo_batch
+
+    phone = f"+1{str(uuid.uuid4().int)[:10]}"
+    user_in = schemas.UserCreate(phone=phone, name="Batch User", password="password")
+    user = crud.user.create(db, obj_in=user_in)
+
+    prop_in = schemas.PropertyCreate(
+        address="789 Batch St",
+        city="Batch City",
+        state="TS",
+        pincode="67890",
+        property_type=models.PropertyType.APARTMENT,
+        area_sqft=900.0,
+    )
+    prop = crud.property.create_with_owner(db, obj_in=prop_in, user_id=user.id)
+
+    photos = [
+        crud.photo.create_with_property(
+            db,
+            obj_in=schemas.PropertyPhotoCreate(
+                property_id=prop.id,
+                s3_key=f"batch_{i}.jpg",
+                s3_url=f"http://mock-s3/batch_{i}.jpg",
+                sequence=i,
+            ),
+        )
+        for i in range(3)
+    ]
+
+    photo_ids = [photo.id for photo in photos]
+
+    mock_image_service.get_exif_data.return_value = {
+        "captured_at": datetime.now(UTC),
+        "device_model": "Pixel 8",
+        "gps_lat": 12.9,
+        "gps_lng": 77.6,
+    }
+    mock_image_service.perform_qc_checks.side_effect = [
+        {"is_blurry": False, "is_too_dark": False, "is_too_bright": False},
+        {"is_blurry": True, "is_too_dark": False, "is_too_bright": False},
+        {"is_blurry": False, "is_too_dark": False, "is_too_bright": False},
+    ]
+
+    statements: list[str] = []
+
+    def record(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        with patch("app.tasks.image_processing.SessionLocal", return_value=db):
+            result = process_photo_batch(str(prop.id))
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert result["status"] == "completed"
+    assert result["photo_ids"] == [str(photo_id) for photo_id in photo_ids]
+    assert set(result["timings"][str(photo_ids[0])]) == {
+        "download",
+        "hash",
+        "exif",
+        "encode",
+        "qc",
+        "upload",
+    }
+    # One bulk UPDATE for the whole photo set
+    assert len(statements) == 3
+    assert statements[-1].startswith("UPDATE propertyphoto")
+
+    db.expire_all()
+    photos_db = _get_photos(db, photo_ids)
+    assert [photo.qc_status for photo in photos_db] == [
+        QCStatus.APPROVED,
+        QCStatus.REJECTED,
+        QCStatus.APPROVED,
+    ]
+    assert photos_db[0].device_model == "Pixel 8"
+
+
+def test_process_photo_batch_reuses_qc_for_near_duplicates(
+    db: Session, mock_image_service: Any, mock_storage: Any
+) -> None:
+    from datetime import UTC, datetime
+
+    from app.tasks.image_processing import process_photo_batch
+
+    user = crud.user.create(
+        db,
+        obj_in=schemas.UserCreate(
+            phone=f"+1{str(uuid.uuid4().int)[:10]}", name="Dup User", password="pw"
+        ),
+    )
+    props = [
+        crud.property.create_with_owner(
+            db,
+            obj_in=schemas.PropertyCreate(
+                address=f"{i} Dup St",
+                city="Dup City",
+                state="TS",
+                pincode="11111",
+                property_type=models.PropertyType.HOUSE,
+                area_sqft=1000.0,
+            ),
+            user_id=user.id,
+        )
+        for i in range(2)
+    ]
+
+    # A photo already processed on another property
+    stored_hash = 0xF0F0_0000_1234_ABCD
+    stored = crud.photo.create_with_property(
+        db,
+        obj_in=schemas.PropertyPhotoCreate(
+            property_id=props[0].id, s3_key="stored.jpg", s3_url="http://mock-s3/s"
+        ),
+    )
+    crud.photo.update_many(
+        db,
+        updates=[
+            {
+                "id": stored.id,
+                "qc_status": QCStatus.APPROVED,
+                "qc_notes": "stored QC",
+                **crud.photo.hash_fields(stored_hash),
+            }
+        ],
+    )
+
+    photos = [
+        crud.photo.create_with_property(
+            db,
+            obj_in=schemas.PropertyPhotoCreate(
+                property_id=props[1].id,
+                s3_key=f"dup_{i}.jpg",
+                s3_url=f"http://mock-s3/dup_{i}.jpg",
+                sequence=i,
+            ),
+        )
+        for i in range(3)
+    ]
+    photo_ids = [photo.id for photo in photos]
+    stored_id = stored.id
+
+    fresh_hash = 0x0123_4567_89AB_CDEF
+    mock_image_service.dhash.side_effect = [
+        fresh_hash,
+        fresh_hash ^ 0b101,  # Re-upload of the first photo in this batch
+        stored_hash ^ (1 << 63),  # Reuse of the other property's photo
+    ]
+    mock_image_service.get_exif_data.return_value = {
+        "captured_at": datetime.now(UTC),
+        "device_model": "Pixel 8",
+        "gps_lat": 12.9,
+        "gps_lng": 77.6,
+    }
+    mock_image_service.perform_qc_checks.return_value = {
+        "is_blurry": True,
+        "is_too_dark": False,
+        "is_too_bright": False,
+    }
+
+    with patch("app.tasks.image_processing.SessionLocal", return_value=db):
+        result = process_photo_batch(str(props[1].id))
+
+    assert result["status"] == "completed"
+    # Only the first photo was analyzed
+    mock_image_service.perform_qc_checks.assert_called_once()
+
+    db.expire_all()
+    first, rerun, reused = _get_photos(db, photo_ids)
+    assert first.duplicate_of_id is None
+    assert not first.flagged_for_review
+    assert first.qc_status == QCStatus.REJECTED
+
+    assert rerun.duplicate_of_id == photo_ids[0]
+    assert rerun.flagged_for_review
+    assert rerun.qc_status == QCStatus.REJECTED
+
+    assert reused.duplicate_of_id == stored_id
+    assert reused.flagged_for_review
+    assert reused.qc_status == QCStatus.APPROVED
+    assert reused.qc_notes is not None and "stored QC" in reused.qc_notes
+
+    # Stored hashes round-trip through the signed BIGINT column
+    match = crud.photo.find_duplicate(db, phash=fresh_hash, max_distance=0)
+    assert match is not None and match.id == photo_ids[0]
+
+
+def test_find_duplicate_prefers_candidates_sharing_more_bands(db: Session) -> None:
+    from datetime import UTC, datetime, timedelta
+
+    user = crud.user.create(
+        db,
+        obj_in=schemas.UserCreate(
+            phone=f"+1{str(uuid.uuid4().int)[:10]}", name="Band User", password="pw"
+        ),
+    )
+    prop = crud.property.create_with_owner(
+        db,
+        obj_in=schemas.PropertyCreate(
+            address="1 Band St",
+            city="Band City",
+            state="TS",
+            pincode="11111",
+            property_type=models.PropertyType.HOUSE,
+            area_sqft=1000.0,
+        ),
+        user_id=user.id,
+    )
+    photos = [
+        crud.photo.create_with_property(
+            db,
+            obj_in=schemas.PropertyPhotoCreate(
+                property_id=prop.id, s3_key=f"band_{i}.jpg", s3_url="http://mock-s3/b"
+            ),
+        )
+        for i in range(4)
+    ]
+
+    target = 0x5A5A_3C3C_9696_0F0F
+    # Older photos sharing only the lowest band, then a real near-duplicate
+    unrelated = target ^ 0xFFFF_FFFF_FFFF_0000
+    hashes = [unrelated, unrelated, unrelated, target ^ 0b11]
+    now = datetime.now(UTC)
+    crud.photo.update_many(
+        db,
+        updates=[
+            {
+                "id": photo.id,
+                "created_at": now - timedelta(days=len(photos) - i),
+                **crud.photo.hash_fields(phash),
+            }
+            for i, (photo, phash) in enumerate(zip(photos, hashes, strict=True))
+        ],
+    )
+
+    with patch.object(settings, "PHOTO_DUPLICATE_MAX_CANDIDATES", 2):
+        match = crud.photo.find_duplicate(db, phash=target, max_distance=3)
+    assert match is not None and match.id == photos[-1].id
+
+
+def test_process_photo_batch_property_not_found(db: Session) -> None:
+    from app.tasks.image_processing import process_photo_batch
+
+    with patch("app.tasks.image_processing.SessionLocal", return_value=db):
+        result = process_photo_batch(str(uuid.uuid4()))
+    assert result["error"] == "Property not found"
+
+
+def test_beat_tasks_are_registered() -> None:
+    from app.celery_app import celery_app
+
+    # What a worker imports at startup
+    celery_app.loader.import_default_modules()
+    scheduled = {entry["task"] for entry in celery_app.conf.beat_schedule.values()}
+    assert scheduled
+    assert scheduled <= set(celery_app.tasks)
@@ -1,13 +1,18 @@
+import random
 import uuid
-from datetime import datetime
+from datetime import UTC, datetime, timedelta
+from typing import Any
 
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
 from app import crud
 from app.core.config import settings
-from app.models.property import PropertyStatus
+from app.crud.crud_price_grid import geohash_cell, months_since, pincode_cell
+from app.models.comp import Comparable
+from app.models.property import PropertyStatus, PropertyType
 from app.models.user import UserRole
+from app.schemas.property import PropertyCreate
 from app.schemas.user import UserCreate
 
 
@@ -173,3 +178,122 @@ def test_read_valuations(client: TestClient, db: Session) -> None:
     )
     assert response.status_code == 200
     assert isinstance(response.json(), list)
+
+
+def test_suggest_valuation(client: TestClient, db: Session) -> None:
+    valuer_phone = f"+1{str(uuid.uuid4().int)[:10]}"
+    valuer = crud.user.create(
+        db,
+        obj_in=UserCreate(
+            phone=valuer_phone, name="Valuer", password="password", role=UserRole.VALUER
+        ),
+    )
+    response = client.post(
+        f"{settings.API_V1_STR}/auth/login/access-token",
+        data={"username": valuer_phone, "password": "password"},
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    # Somewhere no other test puts comparables, selling around 8000 per sqft
+    lat, lng = -38.0, 176.0
+    rng = random.Random(11)
+    now = datetime.now(UTC)
+    db.add_all(
+        Comparable(
+            address=f"{i} Grid Rd",
+            city="City",
+            state="State",
+            pincode="765432",
+            lat=lat + rng.uniform(-0.01, 0.01),
+            lng=lng + rng.uniform(-0.01, 0.01),
+            area_sqft=area,
+            sale_price=area * 8000 * rng.uniform(0.9, 1.1),
+            sale_date=now - timedelta(days=rng.randint(0, 600)),
+        )
+        for i, area in enumerate(rng.uniform(800, 1200) for _ in range(60))
+    )
+    db.commit()
+
+    assert crud.price_grid.refresh(db) > 0
+    cells = crud.price_grid.get_cells(
+        db, [geohash_cell(lat, lng, 5), pincode_cell("765432")]
+    )
+    assert len(cells) == 2
+    # Sales may straddle geohash cells, but all share the pincode
+    assert cells[pincode_cell("765432")].comp_count == 60
+    for cell in cells.values():
+        assert cell.ppsf_p25 < cell.ppsf_median < cell.ppsf_p75
+        assert 7600 < cell.ppsf_median < 8400
+
+    def create_property(area_sqft: float = 1000.0, **fields: Any) -> str:
+        prop = crud.property.create_with_owner(
+            db,
+            obj_in=PropertyCreate(
+                property_type=PropertyType.APARTMENT,
+                address="1 Suggest Rd",
+                city="City",
+                state="State",
+                area_sqft=area_sqft,
+                **fields,
+            ),
+            user_id=valuer.id,
+        )
+        return str(prop.id)
+
+    property_id = create_property(pincode="765432", lat=lat, lng=lng)
+    response = client.get(
+        f"{settings.API_V1_STR}/valuations/suggest",
+        params={"property_id": property_id},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["property_id"] == property_id
+    assert 7_000_000 < data["estimated_value"] < 9_000_000
+    assert data["value_low"] < data["estimated_value"] < data["value_high"]
+    assert 0 < data["confidence_score"] <= 1
+    assert data["grid_cell"].startswith("gh")
+    assert len(data["comps"]) == settings.VALUATION_COMPS
+
+    # Without a location only the pincode grid is left
+    unlocated = client.get(
+        f"{settings.API_V1_STR}/valuations/suggest",
+        params={"property_id": create_property(pincode="765432")},
+        headers=headers,
+    ).json()
+    assert unlocated["grid_cell"] == pincode_cell("765432")
+    assert unlocated["comps"] == []
+    assert unlocated["confidence_score"] < data["confidence_score"]
+
+    # Older apartments are worth less
+    aged = client.get(
+        f"{settings.API_V1_STR}/valuations/suggest",
+        params={
+            "property_id": create_property(pincode="765432", lat=lat, lng=lng, age=30)
+        },
+        headers=headers,
+    ).json()
+    assert aged["estimated_value"] < data["estimated_value"]
+
+    response = client.get(
+        f"{settings.API_V1_STR}/valuations/suggest",
+        params={"property_id": create_property(pincode="000001")},
+        headers=headers,
+    )
+    assert response.status_code == 404
+
+    # Nothing to scale a price per sqft by
+    response = client.get(
+        f"{settings.API_V1_STR}/valuations/suggest",
+        params={"property_id": create_property(area_sqft=0.0, pincode="765432")},
+        headers=headers,
+    )
+    assert response.status_code == 422
+
+
+def test_months_since_ignores_future_sales() -> None:
+    now = datetime.now(UTC)
+    assert months_since(now - timedelta(days=365.25), now) == 12.0
+    assert months_since(now + timedelta(days=30), now) == 0.0
+    # Naive timestamps are UTC
+    assert months_since(now.replace(tzinfo=None), now) == 0.0
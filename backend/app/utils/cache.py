@@ -1,88 +1,210 @@
 import asyncio
 import functools
+import hashlib
 import json
 import logging
-from collections.abc import Callable
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Any, ParamSpec, TypeVar, cast
 
 from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
 
-from app.core.redis import redis_client
+from app.core.redis import async_redis_client, redis_client
 
 logger = logging.getLogger(__name__)
 
+GENERATION_PREFIX = "cache:gen"
 
-def cache_response(expire: int = 600, key_prefix: str = "cache"):
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+class CacheMetrics:
+    """In-process hit, miss, error and latency counters per key prefix."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: defaultdict[str, dict[str, float]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0, "errors": 0, "redis_seconds": 0.0}
+        )
+
+    def record(self, prefix: str, outcome: str, seconds: float = 0.0) -> None:
+        with self._lock:
+            counters = self._counters[prefix]
+            counters[outcome] += 1
+            counters["redis_seconds"] += seconds
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            counters = {prefix: dict(c) for prefix, c in self._counters.items()}
+        result = {}
+        for prefix, c in counters.items():
+            lookups = c["hits"] + c["misses"]
+            result[prefix] = {
+                "hits": int(c["hits"]),
+                "misses": int(c["misses"]),
+                "errors": int(c["errors"]),
+                "hit_rate": round(c["hits"] / lookups * 100, 1) if lookups else None,
+                "avg_redis_ms": round(c["redis_seconds"] / lookups * 1000, 2)
+                if lookups
+                else None,
+            }
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+
+cache_metrics = CacheMetrics()
+
+
+def _generation_keys(tags: Sequence[str]) -> list[str]:
+    return [f"{GENERATION_PREFIX}:{tag}" for tag in tags]
+
+
+def _principal(kwargs: dict[str, Any]) -> str:
+    # Responses depend on who asks, so each user gets their own entries
+    user = kwargs.get("current_user")
+    return "anon" if user is None else f"user-{user.id}"
+
+
+def _gen_key(
+    func: Callable[..., Any],
+    key_prefix: str,
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+    generations: Sequence[str | None],
+) -> str:
+    filtered_kwargs = {
+        k: v for k, v in kwargs.items() if k not in ["db", "current_user"]
+    }
+    args_str = ":".join([str(a) for a in args])
+    kwargs_str = ":".join([f"{k}={v}" for k, v in sorted(filtered_kwargs.items())])
+    digest = hashlib.blake2b(
+        f"{args_str}|{kwargs_str}".encode(), digest_size=16
+    ).hexdigest()
+    generation = ".".join(g or "0" for g in generations)
+    return f"{key_prefix}:{func.__name__}:g{generation}:{_principal(kwargs)}:{digest}"
+
+
+def _serialize(result: Any, adapter: TypeAdapter[Any] | None = None) -> str:
+    if adapter is not None:
+        value = adapter.validate_python(result, from_attributes=True)
+        return adapter.dump_json(value).decode()
+    return json.dumps(jsonable_encoder(result), default=str)
+
+
+def cache_response(
+    expire: int = 600,
+    key_prefix: str = "cache",
+    tags: Sequence[str] = (),
+    response_model: Any = None,
+) -> Callable[[Callable[P, R]], Callable[P, R]]:
     """
-    Decorator to cache function responses in Redis.
-    Supports both sync and async functions.
+    Decorator to cache function responses in Redis, per current_user.
+    Supports both sync and async functions; async ones use the async client.
+
+    Keys embed the generation of key_prefix and of each tag, so
+    invalidate_cache() of any of them orphans the entries at once. They
+    are never looked up again and expire on their own.
+
+    Pass the endpoint's response_model when the function returns ORM
+    objects: results are then cached as that schema serializes them, with
+    relationships loaded, so hits answer the same as misses.
     """
+    generation_keys = _generation_keys([key_prefix, *tags])
+    adapter = None if response_model is None else TypeAdapter(response_model)
 
-    def decorator(func: Callable):
+    def decorator(func: Callable[P, R]) -> Callable[P, R]:
         @functools.wraps(func)
-        async def async_wrapper(*args, **kwargs):
-            cache_key = _gen_key(func, key_prefix, args, kwargs)
+        async def async_wrapper(*args: P.args, **kwargs: P.kwargs) -> Any:
+            call = cast(Callable[P, Awaitable[Any]], func)
+            start = time.perf_counter()
             try:
-                cached_val = redis_client.get(cache_key)
-                if cached_val:
-                    logger.debug(f"Cache hit for key: {cache_key}")
-                    return json.loads(cached_val)
+                generations = await async_redis_client.mget(generation_keys)
+                cache_key = _gen_key(func, key_prefix, args, kwargs, generations)
+                cached_val = await async_redis_client.get(cache_key)
             except Exception as e:
                 logger.warning(f"Redis get error: {e}")
+                cache_metrics.record(key_prefix, "errors")
+                return await call(*args, **kwargs)
 
-            result = await func(*args, **kwargs)
-            _set_cache(cache_key, result, expire)
+            if cached_val:
+                cache_metrics.record(key_prefix, "hits", time.perf_counter() - start)
+                logger.debug(f"Cache hit for key: {cache_key}")
+                return json.loads(cached_val)
+            cache_metrics.record(key_prefix, "misses", time.perf_counter() - start)
+
+            result = await call(*args, **kwargs)
+            try:
+                await async_redis_client.setex(
+                    cache_key, expire, _serialize(result, adapter)
+                )
+            except Exception as e:
+                logger.warning(f"Redis set error: {e}")
+                cache_metrics.record(key_prefix, "errors")
             return result
 
         @functools.wraps(func)
-        def sync_wrapper(*args, **kwargs):
-            cache_key = _gen_key(func, key_prefix, args, kwargs)
+        def sync_wrapper(*args: P.args, **kwargs: P.kwargs) -> Any:
+            start = time.perf_counter()
             try:
-                cached_val = redis_client.get(cache_key)
-                if cached_val:
-                    logger.debug(f"Cache hit for key: {cache_key}")
-                    return json.loads(cached_val)
+                # The sync client's stubs type every reply as maybe-awaitable
+                generations = cast(list[str | None], redis_client.mget(generation_keys))
+                cache_key = _gen_key(func, key_prefix, args, kwargs, generations)
+                cached_val = cast(str | None, redis_client.get(cache_key))
             except Exception as e:
                 logger.warning(f"Redis get error: {e}")
+                cache_metrics.record(key_prefix, "errors")
+                return func(*args, **kwargs)
+
+            if cached_val:
+                cache_metrics.record(key_prefix, "hits", time.perf_counter() - start)
+                logger.debug(f"Cache hit for key: {cache_key}")
+                return json.loads(cached_val)
+            cache_metrics.record(key_prefix, "misses", time.perf_counter() - start)
 
             result = func(*args, **kwargs)
-            _set_cache(cache_key, result, expire)
+            try:
+                redis_client.setex(cache_key, expire, _serialize(result, adapter))
+            except Exception as e:
+                logger.warning(f"Redis set error: {e}")
+                cache_metrics.record(key_prefix, "errors")
             return result
 
         if asyncio.iscoroutinefunction(func):
-            return async_wrapper
-        return sync_wrapper
+            return cast(Callable[P, R], async_wrapper)
+        return cast(Callable[P, R], sync_wrapper)
 
     return decorator
 
 
-def _gen_key(func, key_prefix, args, kwargs):
-    filtered_kwargs = {
-        k: v for k, v in kwargs.items() if k not in ["db", "current_user"]
-    }
-    args_str = ":".join([str(a) for a in args])
-    kwargs_str = ":".join([f"{k}={v}" for k, v in sorted(filtered_kwargs.items())])
-    return f"{key_prefix}:{func.__name__}:{args_str}:{kwargs_str}"
-
-
-def _set_cache(cache_key, result, expire):
+def invalidate_cache(*tags: str) -> None:
+    """
+    Invalidate every entry cached under these key prefixes or tags by
+    bumping their generation. O(1) per tag, no key scan or delete.
+    """
     try:
-        serializable_result = jsonable_encoder(result)
-        redis_client.setex(
-            cache_key, expire, json.dumps(serializable_result, default=str)
-        )
-        logger.debug(f"Cached result for key: {cache_key}")
+        pipe = redis_client.pipeline(transaction=False)
+        for key in _generation_keys(tags):
+            pipe.incr(key)
+        pipe.execute()  # type: ignore[no-untyped-call]
+        logger.info(f"Invalidated cache tags: {', '.join(tags)}")
     except Exception as e:
-        logger.warning(f"Redis set error: {e}")
+        logger.warning(f"Redis invalidate error: {e}")
 
 
-def invalidate_cache(key_pattern: str):
-    """
-    Invalidate cache keys matching a pattern.
-    """
+async def ainvalidate_cache(*tags: str) -> None:
+    """invalidate_cache() for async callers."""
     try:
-        keys = redis_client.keys(key_pattern)
-        if keys:
-            redis_client.delete(*keys)
-            logger.info(f"Invalidated {len(keys)} keys with pattern: {key_pattern}")
+        pipe = async_redis_client.pipeline(transaction=False)
+        for key in _generation_keys(tags):
+            pipe.incr(key)
+        await pipe.execute()
+        logger.info(f"Invalidated cache tags: {', '.join(tags)}")
     except Exception as e:
-        logger.warning(f"Redis delete error: {e}")
+        logger.warning(f"Redis invalidate error: {e}")
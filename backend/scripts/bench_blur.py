@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+PropFlow Blur Check Benchmark
+
+Compares per-image latency of the vectorized Laplacian in
+ImageQCService.check_blur against the original per-pixel Python loop on
+synthetic 1, 4 and 12 MP photos.
+
+The loop is O(pixels), so above --loop-max-mp its latency is extrapolated
+linearly from the largest size it was actually run on.
+
+Usage:
+    python scripts/bench_blur.py
+    python scripts/bench_blur.py --repeat 5 --loop-max-mp 4 --max-dimension 1024
+"""
+
+import argparse
+import io
+import time
+from collections.abc import Callable
+from functools import partial
+
+import numpy as np
+from PIL import Image
+
+from app.services.image_qc_service import ImageQCService
+
+SIZES = {
+    1: (1152, 864),
+    4: (2304, 1728),
+    12: (4000, 3000),
+}
+
+
+def make_photo(size: tuple[int, int]) -> bytes:
+    img = Image.effect_noise(size, 40).convert("RGB")
+    output = io.BytesIO()
+    img.save(output, format="JPEG", quality=85)
+    return output.getvalue()
+
+
+def loop_blur_score(image_data: bytes) -> float:
+    """The per-pixel Laplacian loop check_blur used before vectorization."""
+    img_array = np.array(Image.open(io.BytesIO(image_data)).convert("L"))
+    laplacian_kernel = np.array([[0, 1, 0], [1, -4, 1], [0, 1, 0]])
+
+    rows, cols = img_array.shape
+    laplacian = np.zeros_like(img_array, dtype=np.float64)
+    for i in range(1, rows - 1):
+        for j in range(1, cols - 1):
+            region = img_array[i - 1 : i + 2, j - 1 : j + 2]
+            laplacian[i, j] = np.sum(region * laplacian_kernel)
+    return float(laplacian.var())
+
+
+def time_call(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--loop-max-mp", type=int, default=1)
+    parser.add_argument("--max-dimension", type=int, default=1024)
+    args = parser.parse_args()
+
+    service = ImageQCService()
+    loop_ms_per_mp: float | None = None
+
+    print(
+        f"{'MP':>4} {'loop ms':>12} {'vector ms':>10} "
+        f"{'vector@' + str(args.max_dimension) + ' ms':>16} {'speedup':>9}"
+    )
+    for megapixels, size in SIZES.items():
+        photo = make_photo(size)
+
+        vector_ms = time_call(partial(service.check_blur, photo), args.repeat)
+        scaled_ms = time_call(
+            partial(service.check_blur, photo, max_dimension=args.max_dimension),
+            args.repeat,
+        )
+
+        if megapixels <= args.loop_max_mp:
+            loop_ms = time_call(partial(loop_blur_score, photo), 1)
+            loop_ms_per_mp = loop_ms / megapixels
+            loop_label = f"{loop_ms:.0f}"
+        elif loop_ms_per_mp is not None:
+            loop_ms = loop_ms_per_mp * megapixels
+            loop_label = f"~{loop_ms:.0f}"
+        else:
+            loop_ms = float("nan")
+            loop_label = "n/a"
+
+        print(
+            f"{megapixels:>4} {loop_label:>12} {vector_ms:>10.1f} "
+            f"{scaled_ms:>16.1f} {loop_ms / vector_ms:>8.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+PropFlow Image Decode Benchmark
+
+Measures latency and peak memory of the image decode paths used by photo
+processing on synthetic 12 MP and 48 MP phone captures:
+
+- full:  full-resolution grayscale decode (the previous QC path)
+- draft: JPEG draft() decode at the QC analysis size
+- qc:    ImageQCService.run_qc_checks at the analysis size
+- exif:  ImageService.get_exif_data (header only)
+
+Captures are generated and each case is run in a fresh process so peak
+RSS (which Linux carries across fork/exec) is attributable to that case.
+
+Usage:
+    python scripts/bench_decode.py
+    python scripts/bench_decode.py --repeat 5 --analysis-size 512
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+import piexif
+from PIL import Image
+
+from app.services.image_qc_service import ImageQCService
+from app.services.image_service import ImageService
+
+CAPTURES = {
+    "12MP": (4000, 3000),
+    "48MP": (8000, 6000),
+}
+
+
+def make_capture(size: tuple[int, int], path: str) -> None:
+    exif_bytes = piexif.dump(
+        {
+            "0th": {piexif.ImageIFD.Model: "Benchmark Phone"},
+            "Exif": {piexif.ExifIFD.DateTimeOriginal: "2024:01:01 12:00:00"},
+        }
+    )
+    img = Image.effect_noise(size, 40).convert("RGB")
+    img.save(path, format="JPEG", quality=90, exif=exif_bytes)
+
+
+def run_case(case: str, path: str, analysis_size: int) -> None:
+    if case == "full":
+        Image.open(path).convert("L").load()
+    elif case == "draft":
+        ImageService.draft_decode(
+            Image.open(path), (analysis_size, analysis_size), "L"
+        ).convert("L").load()
+    elif case == "qc":
+        ImageQCService().run_qc_checks(path, max_dimension=analysis_size)
+    elif case == "exif":
+        ImageService.get_exif_data(path)
+
+
+def measure(
+    case: str,
+    path: str,
+    analysis_size: int,
+    repeat: int,
+    queue: "multiprocessing.Queue[tuple[float, float]]",
+) -> None:
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_case(case, path, analysis_size)
+        best = min(best, time.perf_counter() - start)
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((best * 1000, (peak_kb - baseline_kb) / 1024))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--analysis-size", type=int, default=256)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    print(f"{'capture':>8} {'case':>6} {'ms':>10} {'peak MB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, size in CAPTURES.items():
+            path = os.path.join(tmp, f"{label}.jpg")
+            proc = ctx.Process(target=make_capture, args=(size, path))
+            proc.start()
+            proc.join()
+            for case in ("full", "draft", "qc", "exif"):
+                queue: multiprocessing.Queue[tuple[float, float]] = ctx.Queue()
+                proc = ctx.Process(
+                    target=measure,
+                    args=(case, path, args.analysis_size, args.repeat, queue),
+                )
+                proc.start()
+                ms, peak_mb = queue.get()
+                proc.join()
+                print(f"{label:>8} {case:>6} {ms:>10.1f} {peak_mb:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
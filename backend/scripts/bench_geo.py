@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+PropFlow Geo Distance Benchmark
+
+Compares distance throughput in points per second: the scalar
+haversine_km in a Python loop against the vectorized one-to-many and
+many-to-many haversine and equirectangular kernels of app.utils.geo.
+
+Usage:
+    python scripts/bench_geo.py
+    python scripts/bench_geo.py --points 1000000 --sources 200 --repeat 5
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+
+from app.utils import geo
+
+
+def best_seconds(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, default=200_000)
+    parser.add_argument("--sources", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    lats = rng.uniform(8, 35, args.points)
+    lngs = rng.uniform(68, 97, args.points)
+    source_lats = rng.uniform(8, 35, args.sources)
+    source_lngs = rng.uniform(68, 97, args.sources)
+    lat, lng = 19.076, 72.8777
+    # The scalar loop is slow; time it on a slice
+    loop_points = min(args.points, 50_000)
+    loop_lats, loop_lngs = lats[:loop_points].tolist(), lngs[:loop_points].tolist()
+
+    cases: list[tuple[str, int, Callable[[], Any]]] = [
+        (
+            "scalar loop",
+            loop_points,
+            lambda: [
+                geo.haversine_km(lat, lng, p_lat, p_lng)
+                for p_lat, p_lng in zip(loop_lats, loop_lngs, strict=True)
+            ],
+        ),
+        (
+            "haversine 1:n",
+            args.points,
+            lambda: geo.haversine_many(lat, lng, lats, lngs),
+        ),
+        (
+            "equirect 1:n",
+            args.points,
+            lambda: geo.equirectangular_many(lat, lng, lats, lngs),
+        ),
+        (
+            "haversine m:n",
+            args.points * args.sources,
+            lambda: geo.haversine_matrix(source_lats, source_lngs, lats, lngs),
+        ),
+        (
+            "equirect m:n",
+            args.points * args.sources,
+            lambda: geo.equirectangular_matrix(source_lats, source_lngs, lats, lngs),
+        ),
+        (
+            "box prefilter",
+            args.points,
+            lambda: geo.within_box(lat, lng, 5.0, lats, lngs),
+        ),
+    ]
+
+    print(f"{'kernel':>14} {'pairs':>12} {'ms':>10} {'points/s':>14}")
+    for label, pairs, fn in cases:
+        seconds = best_seconds(fn, args.repeat)
+        print(
+            f"{label:>14} {pairs:>12,} {seconds * 1000:>10.1f} "
+            f"{pairs / seconds:>14,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()